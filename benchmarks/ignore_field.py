@@ -0,0 +1,135 @@
+"""
+Counts the file system calls made while collecting the files of a synthetic
+project and generating the ``ignore`` field of the coafile from them, the
+way the command line does. ``get_project_files`` and ``generate_ignore_field``
+are compared with their previous implementations, which collected all
+project files with coala's globbing and then the files of every ignore glob
+again.
+
+Run it from the repository root with ``python3 benchmarks/ignore_field.py``.
+"""
+import logging
+import os
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from pyprint.NullPrinter import NullPrinter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from coalib.collecting.Collectors import collect_files  # noqa: E402
+from coalib.parsing.Globbing import glob_escape  # noqa: E402
+from coala_quickstart.generation.FileGlobs import (  # noqa: E402
+    get_project_files)
+from coala_quickstart.generation.Settings import (  # noqa: E402
+    generate_ignore_field)
+from coala_quickstart.generation.Utilities import (  # noqa: E402
+    get_gitignore_glob)
+
+COUNTED_CALLS = ("stat", "lstat", "scandir", "listdir")
+GITIGNORE = "build\nnode_modules\n*.pyc\n/dist\n__pycache__\n"
+
+
+def previous_get_project_files(project_dir):
+    ignore_globs = list(get_gitignore_glob(project_dir))
+    escaped_project_dir = glob_escape(project_dir)
+    ignore_path_globs = ignore_globs + [
+        os.path.join(escaped_project_dir, ".git/**")]
+    file_paths = collect_files([os.path.join(escaped_project_dir, "**")],
+                               None,
+                               ignored_file_paths=ignore_path_globs)
+    return file_paths, ignore_globs
+
+
+def previous_generate_ignore_field(project_dir, ignore_globs):
+    all_files = set(collect_files("**", None,
+                                  ignored_file_paths=ignore_globs))
+
+    ignores = []
+    for glob in ignore_globs:
+        gitignore_files = {file for file in collect_files([glob], None)}
+        ignores.append(os.path.relpath(glob, project_dir))
+
+    return ", ".join(ignores)
+
+
+def previous_pipeline(project_dir):
+    file_paths, ignore_globs = previous_get_project_files(project_dir)
+    return previous_generate_ignore_field(project_dir, ignore_globs)
+
+
+def pipeline(project_dir):
+    file_paths, ignore_globs = get_project_files(None,
+                                                 NullPrinter(),
+                                                 project_dir,
+                                                 None,
+                                                 non_interactive=True)
+    return generate_ignore_field(project_dir, [], {}, ignore_globs)
+
+
+def create_project(project_dir, packages=20, files_per_package=25):
+    with open(os.path.join(project_dir, ".gitignore"), "w") as file:
+        file.write(GITIGNORE)
+    for package in range(packages):
+        for subdir in ("src", "build", "node_modules", "__pycache__"):
+            directory = os.path.join(project_dir, "pkg%d" % package, subdir)
+            os.makedirs(directory)
+            for index in range(files_per_package):
+                open(os.path.join(directory, "file%d.py" % index),
+                     "w").close()
+
+
+def count_calls(function, *args):
+    """
+    :return: A tuple of the ``Counter`` of the calls made by the function,
+             its result and the seconds it took.
+    """
+    counter = Counter()
+    with ExitStack() as stack:
+        for name in COUNTED_CALLS:
+            original = getattr(os, name)
+
+            def counted(*args, _name=name, _original=original, **kwargs):
+                counter[_name] += 1
+                return _original(*args, **kwargs)
+
+            stack.enter_context(patch.object(os, name, counted))
+        start = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - start
+    return counter, result, elapsed
+
+
+def main():
+    # collect_files warns about every glob without matches
+    logging.disable(logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as project_dir:
+        create_project(project_dir)
+
+        orig_cwd = os.getcwd()
+        os.chdir(project_dir)
+        try:
+            before, before_field, before_time = count_calls(
+                previous_pipeline, project_dir)
+            after, after_field, after_time = count_calls(
+                pipeline, project_dir)
+        finally:
+            os.chdir(orig_cwd)
+
+    print("{:>10} {:>10} {:>10}".format("call", "before", "after"))
+    for name in COUNTED_CALLS:
+        print("{:>10} {:>10} {:>10}".format(name, before[name], after[name]))
+    print("{:>10} {:>10.3f} {:>10.3f}".format("seconds", before_time,
+                                              after_time))
+    print("ignore field before: " + before_field)
+    print("ignore field after:  " + after_field)
+
+
+if __name__ == "__main__":
+    main()
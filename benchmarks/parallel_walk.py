@@ -0,0 +1,63 @@
+"""
+Measures the time needed to walk a synthetic project with ``walk_files`` and
+``parallel_walk_files``, adding a fixed delay to every directory listing to
+simulate the round trips of a network file system.
+
+Run it from the repository root with ``python3 benchmarks/parallel_walk.py``.
+"""
+import os
+import sys
+import tempfile
+import time
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(
+    __file__))))
+
+from coala_quickstart.generation.FileWalker import (  # noqa: E402
+    parallel_walk_files, walk_files)
+
+LATENCY = 0.002
+
+
+def create_project(project_dir, packages=20, depth=3, files_per_dir=5):
+    for package in range(packages):
+        directory = os.path.join(project_dir, "pkg%d" % package)
+        for level in range(depth):
+            for subdir in ("src", "tests"):
+                path = os.path.join(directory, subdir)
+                os.makedirs(path)
+                for index in range(files_per_dir):
+                    open(os.path.join(path, "file%d.py" % index),
+                         "w").close()
+            directory = os.path.join(directory, "src")
+
+
+def timed(function, *args, **kwargs):
+    original = os.scandir
+
+    def slow_scandir(path):
+        time.sleep(LATENCY)
+        return original(path)
+
+    with patch.object(os, "scandir", slow_scandir):
+        start = time.perf_counter()
+        files = list(function(*args, **kwargs))
+        return time.perf_counter() - start, files
+
+
+def main():
+    with tempfile.TemporaryDirectory() as project_dir:
+        create_project(project_dir)
+        serial_time, expected = timed(walk_files, project_dir)
+        print("{:>10} {:>10}".format("jobs", "seconds"))
+        print("{:>10} {:>10.3f}".format("serial", serial_time))
+        for jobs in (2, 4, 8, 16):
+            seconds, files = timed(parallel_walk_files, project_dir,
+                                   jobs=jobs)
+            assert files == expected
+            print("{:>10} {:>10.3f}".format(jobs, seconds))
+
+
+if __name__ == "__main__":
+    main()
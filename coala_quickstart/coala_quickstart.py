@@ -9,10 +9,22 @@ from coala_utils.FilePathCompleter import FilePathCompleter
 from coala_utils.Question import ask_question
 
 from coala_quickstart.interaction.Logo import print_welcome_message
-from coala_quickstart.generation.InfoCollector import collect_info
+from coala_quickstart.generation.InfoCollector import (
+    collect_info, collect_subproject_info)
 from coala_quickstart.generation.Project import (
-    valid_path, get_used_languages, print_used_languages)
-from coala_quickstart.generation.FileGlobs import get_project_files
+    valid_path, print_excluded_files, print_used_languages)
+from coala_quickstart.generation.ProjectIndex import (
+    ProjectIndex, WEIGHTINGS)
+from coala_quickstart.generation.FileGlobs import iter_project_files
+from coala_quickstart.generation.ContentDetection import ContentDetector
+from coala_quickstart.generation.GeneratedFiles import (
+    GeneratedFileClassifier)
+from coala_quickstart.generation.LargeFiles import parse_size
+from coala_quickstart.generation.Prerequisites import (
+    get_prerequisite_checker)
+from coala_quickstart.generation.Snapshot import WalkSnapshot
+from coala_quickstart.generation.Subprojects import (
+    find_subprojects, print_subprojects)
 from coala_quickstart.generation.Bears import (
     filter_relevant_bears,
     print_relevant_bears,
@@ -23,6 +35,9 @@ from coala_quickstart.generation.Settings import (
     generate_settings, write_coafile)
 
 
+DEFAULT_SAMPLE_MARGIN = 2.0
+
+
 def _get_arg_parser():
     description = """
 coala-quickstart automatically creates a .coafile for use by coala.
@@ -54,12 +69,134 @@ coala-quickstart automatically creates a .coafile for use by coala.
         dest='no_filter_by_capabilities', const=True,
         help='disable filtering of bears by their capabilties.')
 
+    arg_parser.add_argument(
+        '--git-index', action='store_const', dest='git_index', const=True,
+        help='read the files tracked in the git index instead of walking '
+             'the project directory, which leaves untracked files out')
+
+    arg_parser.add_argument(
+        '--include-environments', action='store_const',
+        dest='include_environments', const=True,
+        help='walk the directories of virtual environments and installed '
+             'dependencies, like node_modules, instead of ignoring them')
+
+    arg_parser.add_argument(
+        '--max-depth', type=int, metavar='DEPTH',
+        help='only use the files up to DEPTH directory levels below the '
+             'project directory, 0 for the files in it')
+
+    arg_parser.add_argument(
+        '--include-subtree', action='append', dest='subtrees',
+        metavar='DIR',
+        help='only use the files in this directory of the project, can be '
+             'given several times')
+
+    arg_parser.add_argument(
+        '--follow-symlinks', action='store_const', dest='follow_symlinks',
+        const=True,
+        help='walk the files and directories symbolic links point to, '
+             'every one of them once, instead of leaving the links out')
+
+    arg_parser.add_argument(
+        '--snapshot', action='store_const', dest='snapshot', const=True,
+        help='keep the listings of the project directories between runs, '
+             'so walking it again only lists the directories changed since, '
+             'not used with --git-index')
+
+    arg_parser.add_argument(
+        '--walk-jobs', type=int, default=1, metavar='JOBS',
+        help='number of directories to list at the same time when walking '
+             'the project directory, useful on network file systems')
+
+    arg_parser.add_argument(
+        '--weight-by', choices=WEIGHTINGS, default='files',
+        help='weight the files by their count, size or number of lines to '
+             'detect the languages used most')
+
+    arg_parser.add_argument(
+        '--detect-content', action='store_const', dest='detect_content',
+        const=True,
+        help='detect the language of files without extension by their '
+             'name, shebang or modeline')
+
+    arg_parser.add_argument(
+        '--exclude-generated', action='store_const',
+        dest='exclude_generated', const=True,
+        help='leave vendored, generated and minified files out of the '
+             'detected languages and ignore them in the coafile')
+
+    arg_parser.add_argument(
+        '--max-file-size', type=parse_size, default=0, metavar='SIZE',
+        help='ignore files larger than SIZE bytes, or kibibytes, mebibytes '
+             'or gibibytes with a K, M or G suffix, as the bears can\'t '
+             'handle large files well; 0 keeps all files (default)')
+
+    arg_parser.add_argument(
+        '--sample', type=float, nargs='?', const=DEFAULT_SAMPLE_MARGIN,
+        metavar='MARGIN',
+        help='estimate the languages used from a random sample of the '
+             'files, until the 95%% confidence intervals of the percentages '
+             'are within MARGIN percentage points (default {}). Only the '
+             '.gitignore files of the directories walked are used.'
+             .format(DEFAULT_SAMPLE_MARGIN))
+
+    arg_parser.add_argument(
+        '--rooted-file-globs', action='store_const',
+        dest='rooted_file_globs', const=True,
+        help='generate `files` globs rooted at the directories containing '
+             'the files of a section, instead of globs for the whole '
+             'project')
+
+    arg_parser.add_argument(
+        '--subprojects', action='store_const', dest='subprojects',
+        const=True,
+        help='give the projects nested in the project directory, found by '
+             'files like package.json or setup.py, sections of their own '
+             'using the settings extracted from their files')
+
     return arg_parser
 
 
+def _get_subtrees(arg_parser, project_dir, paths):
+    """
+    Resolves the directories given with ``--include-subtree``.
+
+    :return: A sorted list of the directories relative to the project
+             directory, leaving out the ones inside other ones.
+    """
+    subtrees = set()
+    for path in paths:
+        relpath = os.path.relpath(os.path.join(project_dir, path),
+                                  project_dir)
+        if (relpath == os.pardir or relpath.startswith(os.pardir + os.sep) or
+                not os.path.isdir(os.path.join(project_dir, relpath))):
+            arg_parser.error('{} is not a directory of the project.'
+                             .format(path))
+        if relpath == os.curdir:
+            return None
+        subtrees.add(os.path.normcase(relpath))
+
+    return sorted(subtree for subtree in subtrees
+                  if not any(subtree.startswith(os.path.join(other, ""))
+                             for other in subtrees))
+
+
 def main():
     arg_parser = _get_arg_parser()
     args = arg_parser.parse_args()
+    if args.sample is not None and args.rooted_file_globs:
+        arg_parser.error('--sample needs all files and can\'t be used with '
+                         '--rooted-file-globs')
+    if args.max_depth is not None and args.rooted_file_globs:
+        arg_parser.error('--max-depth can\'t be used with '
+                         '--rooted-file-globs')
+    if args.sample is not None and args.subprojects:
+        arg_parser.error('--sample needs all files and can\'t be used with '
+                         '--subprojects')
+    if args.max_depth is not None and args.subprojects:
+        arg_parser.error('--max-depth can\'t be used with --subprojects')
+    if args.max_depth is not None and args.max_depth < 0:
+        arg_parser.error('--max-depth can\'t be negative')
 
     logging.basicConfig(stream=sys.stdout)
     printer = ConsolePrinter()
@@ -78,21 +215,70 @@ def main():
             typecast=valid_path)
         fpc.deactivate()
 
-    project_files, ignore_globs = get_project_files(
+    subtrees = None
+    if args.subtrees:
+        subtrees = _get_subtrees(arg_parser, project_dir, args.subtrees)
+
+    snapshot = WalkSnapshot.load(project_dir) if args.snapshot else None
+    project_files, ignore_globs = iter_project_files(
         None,
         printer,
         project_dir,
         fpc,
-        args.non_interactive)
+        args.non_interactive,
+        use_git_index=bool(args.git_index),
+        walk_jobs=args.walk_jobs,
+        with_sizes=args.weight_by == 'bytes' or bool(args.max_file_size),
+        sample=args.sample is not None,
+        exclude_environments=not args.include_environments,
+        snapshot=snapshot,
+        follow_symlinks=bool(args.follow_symlinks),
+        subtrees=subtrees,
+        max_depth=args.max_depth)
 
-    used_languages = list(get_used_languages(project_files))
-    print_used_languages(printer, used_languages)
+    # The languages are detected while the files are discovered, the paths
+    # are only kept when needed for the rooted globs or the subprojects.
+    detector = (ContentDetector.load(snapshot=snapshot)
+                if args.detect_content else None)
+    classifier = (GeneratedFileClassifier(project_dir)
+                  if args.exclude_generated else None)
+    project_index = ProjectIndex(keep_paths=bool(args.rooted_file_globs or
+                                                 args.subprojects),
+                                 weighting=args.weight_by,
+                                 detector=detector,
+                                 classifier=classifier,
+                                 max_file_size=args.max_file_size or None)
+    error_bounds = None
+    if args.sample is not None:
+        project_index.add_until_confident(project_files, args.sample)
+        project_files.close()
+        error_bounds = project_index.get_error_bounds()
+    else:
+        project_index.add_all(project_files)
 
-    extracted_information = collect_info(project_dir)
+    used_languages = project_index.get_used_languages()
+    print_used_languages(printer, used_languages, error_bounds)
+    print_excluded_files(printer, project_index.excluded_counts)
+    if detector is not None:
+        detector.save()
+    if snapshot is not None:
+        snapshot.save()
+
+    subprojects = subproject_info = None
+    if args.subprojects:
+        subprojects = find_subprojects(
+            os.path.relpath(path, project_dir)
+            for path in project_index.get_files())
+        print_subprojects(printer, subprojects)
+        extracted_information, subproject_info = collect_subproject_info(
+            project_dir, subprojects, subtrees)
+    else:
+        extracted_information = collect_info(project_dir, subtrees)
 
     relevant_bears = filter_relevant_bears(
         used_languages, printer, arg_parser, extracted_information)
 
+    get_prerequisite_checker().save()
     print_relevant_bears(printer, relevant_bears)
 
     if args.non_interactive and not args.incomplete_sections:
@@ -102,10 +288,16 @@ def main():
 
     settings = generate_settings(
         project_dir,
-        project_files,
+        None,
         ignore_globs,
         relevant_bears,
         extracted_information,
-        args.incomplete_sections)
+        args.incomplete_sections,
+        rooted_file_globs=args.rooted_file_globs,
+        project_index=project_index,
+        subtrees=subtrees,
+        max_depth=args.max_depth,
+        subprojects=subprojects,
+        subproject_info=subproject_info)
 
     write_coafile(printer, project_dir, settings)
@@ -0,0 +1,421 @@
+import os
+import sys
+from collections import namedtuple
+
+import pkg_resources
+
+from coalib import __version__ as coala_version
+from coalib.bearlib.abstractions.LinterClass import LinterClass
+from coalib.collecting.Collectors import collect_all_bears_from_sections
+from coalib.collecting.Dependencies import resolve
+from coalib.collecting.Importers import import_objects
+from coalib.misc.CachingUtilities import pickle_dump, pickle_load
+from coalib.misc.DictUtilities import inverse_dicts
+from coalib.parsing.Globbing import iglob
+from coalib.settings.ConfigurationGathering import load_configuration
+from coala_quickstart.generation.ExecutableResolver import (
+    get_executable_resolver)
+
+CACHE_IDENTIFIER = "coala_quickstart_bear_catalog"
+# Changed whenever the stored metadata changes, so old catalogs are rebuilt
+CATALOG_VERSION = 4
+# The coala versions whose linter bears keep their options where
+# _get_linter_options reads them
+SUPPORTED_COALA_VERSIONS = ((0, 12),)
+
+Requirement = namedtuple("Requirement", ["type", "package", "version"])
+
+
+def get_coala_version():
+    """
+    :return: A tuple of the major and minor version of the installed coala.
+    """
+    return tuple(int(part) for part in coala_version.split(".")[:2])
+
+
+def _get_linter_options(bear):
+    """
+    Reads the options a linter bear was created with.
+
+    coala doesn't expose them, they are only kept in the closure of the
+    ``check_prerequisites`` method ``_create_linter`` generates. That
+    layout is only relied on for the coala versions in
+    ``SUPPORTED_COALA_VERSIONS``, which ``BearCatalogTest`` checks against
+    the installed coala.
+
+    :param bear: A bear class.
+    :return:     The dict of options, or None if the bear doesn't use the
+                 generated ``check_prerequisites`` method or the coala
+                 version isn't supported.
+    """
+    if (get_coala_version() not in SUPPORTED_COALA_VERSIONS or
+            not issubclass(bear, LinterClass)):
+        return None
+    function = getattr(bear.check_prerequisites, "__func__", None)
+    code = getattr(function, "__code__", None)
+    if (code is None or not function.__closure__ or
+            not function.__qualname__.startswith("_create_linter.") or
+            "options" not in code.co_freevars):
+        return None
+    options = function.__closure__[
+        code.co_freevars.index("options")].cell_contents
+    return options if isinstance(options, dict) else None
+
+
+def get_executable_check(bear):
+    """
+    Finds out whether checking the prerequisites of a linter bear only
+    checks that its executable is on the ``PATH``, which is the case unless
+    it has a ``prerequisite_check_command`` or checks them itself. The
+    options of the linter are only used if they are the ones of the bear's
+    executable, otherwise the bear is checked the usual way.
+
+    :param bear: A bear class.
+    :return:     The ``executable_check_fail_info`` of the linter if that's
+                 all it checks, otherwise None.
+    """
+    options = _get_linter_options(bear)
+    if (options is None or
+            options.get("executable") != bear.get_executable() or
+            "prerequisite_check_command" not in options or
+            options["prerequisite_check_command"]):
+        return None
+    return options.get("executable_check_fail_info") or ""
+
+
+class BearInfo:
+    """
+    The metadata of a bear needed to select it, kept in the ``BearCatalog``.
+    It stands in for the bear class in the functions selecting the bears,
+    so only the bears used are imported. Like the class, it has the name of
+    the module coala imports the bear as, the name of its file.
+
+    >>> info = BearInfo("SomeBear", "/bears/SomeBear.py", {"Python"},
+    ...                 can_detect={"Syntax"},
+    ...                 non_optional_settings={"max_line_length": "help"})
+    >>> info.name, sorted(info.LANGUAGES), sorted(info.CAN_DETECT)
+    ('SomeBear', ['Python'], ['Syntax'])
+    >>> info.__module__
+    'SomeBear'
+    >>> info.get_non_optional_settings()
+    {'max_line_length': 'help'}
+    """
+
+    def __init__(self,
+                 name,
+                 module_path,
+                 languages,
+                 can_detect=(),
+                 can_fix=(),
+                 requirements=(),
+                 non_optional_settings=None,
+                 executable=None,
+                 bear_deps=(),
+                 executable_check=None):
+        """
+        :param name:                  The name of the bear class.
+        :param module_path:           The path of the file defining it.
+        :param languages:             The languages the bear supports.
+        :param can_detect:            The capabilities it can detect.
+        :param can_fix:               The capabilities it can fix.
+        :param requirements:          ``Requirement`` tuples of the
+                                      packages it needs.
+        :param non_optional_settings: A dict with the names of the settings
+                                      the bear needs a value for as keys
+                                      and their help texts as values.
+        :param executable:            The executable wrapped by a linter
+                                      bear.
+        :param bear_deps:             The ``BearInfo`` objects of the bears
+                                      it depends on.
+        :param executable_check:      The text added to the message about
+                                      the missing executable if checking
+                                      the prerequisites only checks that
+                                      the executable is there, otherwise
+                                      None.
+        """
+        self.name = self.__name__ = name
+        self.module_path = module_path
+        self.__module__ = os.path.splitext(os.path.basename(module_path))[0]
+        self.LANGUAGES = frozenset(languages)
+        self.CAN_DETECT = frozenset(can_detect)
+        self.CAN_FIX = frozenset(can_fix)
+        self.REQUIREMENTS = frozenset(requirements)
+        self.non_optional_settings = dict(non_optional_settings or {})
+        self.executable = executable
+        self.BEAR_DEPS = frozenset(bear_deps)
+        self.executable_check = executable_check
+        self._bear = None
+
+    @classmethod
+    def from_bear(cls, bear, bear_infos=None):
+        """
+        Collects the metadata of a bear class.
+
+        :param bear:       The bear class.
+        :param bear_infos: A dict with the bear classes converted already as
+                           keys and their ``BearInfo`` objects as values,
+                           reused for the dependencies of the bear and
+                           updated.
+        :return:           The ``BearInfo`` object.
+        """
+        if bear_infos is None:
+            bear_infos = {}
+        if bear in bear_infos:
+            return bear_infos[bear]
+
+        bear_infos[bear] = info = cls(
+            bear.name,
+            sys.modules[bear.__module__].__file__,
+            bear.LANGUAGES,
+            bear.CAN_DETECT,
+            bear.CAN_FIX,
+            [Requirement(req.type, req.package, req.version)
+             for req in bear.REQUIREMENTS],
+            {setting: help_text
+             for setting, (help_text, _) in
+             bear.get_non_optional_settings().items()},
+            (bear.get_executable()
+             if issubclass(bear, LinterClass) else None),
+            executable_check=get_executable_check(bear))
+        info.BEAR_DEPS = frozenset(cls.from_bear(dep, bear_infos)
+                                   for dep in bear.BEAR_DEPS)
+        return info
+
+    def get_non_optional_settings(self):
+        """
+        :return: A dict with the names of the settings the bear needs a
+                 value for as keys and their help texts as values.
+        """
+        return dict(self.non_optional_settings)
+
+    def get_executable(self):
+        """
+        :return: The executable wrapped by the bear, or None if it isn't a
+                 linter bear.
+        """
+        return self.executable
+
+    def load(self):
+        """
+        Imports the bear class, once.
+
+        :return: The bear class.
+        :raises ImportError:
+            If the bear isn't defined in its file anymore.
+        """
+        if self._bear is None:
+            bears = import_objects(self.module_path, names=self.name,
+                                   attributes="kind")
+            if not bears:
+                raise ImportError("{} isn't defined in {}.".format(
+                    self.name, self.module_path))
+            self._bear = bears[0]
+        return self._bear
+
+    def checks_executable_only(self):
+        """
+        :return: True if checking the prerequisites of the bear only checks
+                 that its executable is on the ``PATH``.
+        """
+        return (self.executable is not None and
+                self.executable_check is not None)
+
+    def check_executable(self, resolver=None):
+        """
+        Checks that the executable of the bear is on the ``PATH``, with the
+        message of the linter bear if it isn't.
+
+        :param resolver: The ``ExecutableResolver`` to use, by default the
+                         one shared by the process.
+        :return:         True if it is, or a string describing the missing
+                         executable.
+        """
+        if resolver is None:
+            resolver = get_executable_resolver()
+        if resolver.has_executable(self.executable):
+            return True
+        return (repr(self.executable) + " is not installed." +
+                (" " + self.executable_check if self.executable_check
+                 else ""))
+
+    def check_prerequisites(self):
+        """
+        Checks the prerequisites of the bear. Only the bears checking more
+        than the presence of their executable are imported.
+
+        :return: True if they are met, or a string describing the missing
+                 prerequisites.
+        """
+        if self.checks_executable_only():
+            return self.check_executable()
+        return self.load().check_prerequisites()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_bear"] = None
+        return state
+
+    def __eq__(self, other):
+        return (isinstance(other, BearInfo) and
+                (self.name, self.module_path) ==
+                (other.name, other.module_path))
+
+    def __hash__(self):
+        return hash((self.name, self.module_path))
+
+    def __repr__(self):
+        return "<BearInfo {}>".format(self.name)
+
+
+def load_bears(bears):
+    """
+    Imports the bears given by their ``BearInfo`` objects and the bears
+    they depend on.
+
+    :param bears: A collection of ``BearInfo`` objects or bear classes.
+    :return:      A list of bear classes, the dependencies first.
+    """
+    return resolve([bear.load() if isinstance(bear, BearInfo) else bear
+                    for bear in bears])
+
+
+def get_catalog_key(sections):
+    """
+    Computes the key the catalog of the bears in the bear directories of
+    the given sections is valid for: the versions of the distributions
+    registering bears and the modification times of the bear files.
+
+    :param sections: A dict with the sections of the configuration, as
+                     returned by ``load_configuration``.
+    :return:         A hashable key.
+    """
+    bear_dirs = sorted({bear_dir
+                        for section in sections.values()
+                        for bear_dir in section.bear_dirs()})
+    files = set()
+    for bear_dir in bear_dirs:
+        for path in iglob(bear_dir):
+            if path.endswith(".py"):
+                try:
+                    files.add((path, os.stat(path).st_mtime_ns))
+                except OSError:
+                    pass
+
+    distributions = sorted(
+        str(getattr(entry_point, "dist", None))
+        for entry_point in pkg_resources.iter_entry_points("coalabears"))
+    return CATALOG_VERSION, tuple(distributions), tuple(sorted(files))
+
+
+class BearCatalog:
+    """
+    Keeps the metadata of all available bears between runs, so the bears
+    are only imported again when bears are installed, updated or changed.
+
+    >>> catalog = BearCatalog([BearInfo("PythonBear", "", {"Python"}),
+    ...                        BearInfo("TextBear", "", {"All"}),
+    ...                        BearInfo("CBear", "", {"C"})])
+    >>> sorted(bear.name for bear in catalog.get_bears(["python"]))
+    ['PythonBear', 'TextBear']
+    """
+
+    def __init__(self, bears, key=None):
+        """
+        :param bears: The ``BearInfo`` objects of the bears.
+        :param key:   The key the catalog is valid for, as computed by
+                      ``get_catalog_key``.
+        """
+        self.bears = list(bears)
+        self.key = key
+
+    @classmethod
+    def from_bears(cls, bears, key=None):
+        """
+        Creates a catalog from bear classes.
+        """
+        bear_infos = {}
+        return cls([BearInfo.from_bear(bear, bear_infos) for bear in bears],
+                   key)
+
+    @classmethod
+    def load(cls, arg_parser=None, log_printer=None):
+        """
+        Loads the catalog saved by the last run, if the bears didn't
+        change since. Otherwise all bears are imported to build the
+        catalog, which is saved.
+
+        :param arg_parser:  An ``argparse.ArgumentParser`` object used to
+                            load the configuration with the bear
+                            directories.
+        :param log_printer: The log printer for logging.
+        :return:            The ``BearCatalog`` object.
+        """
+        sections, _ = load_configuration(arg_list=None,
+                                         arg_parser=arg_parser,
+                                         silent=True)
+        key = get_catalog_key(sections)
+        catalog = pickle_load(log_printer, CACHE_IDENTIFIER)
+        if isinstance(catalog, cls) and catalog.key == key:
+            return catalog
+
+        local_bears, global_bears = collect_all_bears_from_sections(sections)
+        catalog = cls.from_bears(
+            sorted(inverse_dicts(local_bears, global_bears),
+                   key=lambda bear: bear.name),
+            key)
+        catalog.save(log_printer)
+        return catalog
+
+    def save(self, log_printer=None):
+        """
+        :return: True if the catalog was saved.
+        """
+        return pickle_dump(log_printer, CACHE_IDENTIFIER, self)
+
+    def get_bears_by_language(self, languages):
+        """
+        Partitions the bears by the languages they support in a single
+        pass over the catalog.
+
+        >>> catalog = BearCatalog([BearInfo("PythonBear", "", {"Python"}),
+        ...                        BearInfo("TextBear", "", {"All"}),
+        ...                        BearInfo("CBear", "", {"C", "C++"})])
+        >>> bears = catalog.get_bears_by_language(["C", "Python", "C++"])
+        >>> sorted((lang, sorted(bear.name for bear in lang_bears))
+        ...        for lang, lang_bears in bears.items())
+        ... # doctest: +NORMALIZE_WHITESPACE
+        [('All', ['TextBear']), ('C', ['CBear']), ('C++', ['CBear']),
+         ('Python', ['PythonBear'])]
+
+        :param languages: A list of language names.
+        :return:          A dict with the language names as keys and the
+                          sets of the ``BearInfo`` objects of the bears
+                          supporting them as values. The bears supporting
+                          all languages are only in the set of ``All``.
+        """
+        lang_map = {language.lower(): language for language in languages}
+        bears_by_lang = {language: set()
+                         for language in list(languages) + ["All"]}
+        for bear in self.bears:
+            bear_languages = {language.lower()
+                              for language in bear.LANGUAGES}
+            if "all" in bear_languages:
+                bears_by_lang["All"].add(bear)
+                continue
+            for language in bear_languages & set(lang_map):
+                bears_by_lang[lang_map[language]].add(bear)
+        return bears_by_lang
+
+    def get_bears(self, languages):
+        """
+        Filters the bears by the languages they support, like
+        ``get_filtered_bears``.
+
+        :param languages: A list of language names.
+        :return:          A set of the ``BearInfo`` objects of the bears
+                          supporting any of the languages or all languages.
+        """
+        languages = {language.lower() for language in languages} | {"all"}
+        return {bear for bear in self.bears
+                if {language.lower() for language in bear.LANGUAGES} &
+                languages}
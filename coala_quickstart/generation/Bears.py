@@ -7,10 +7,11 @@ from collections import defaultdict
 from coala_quickstart.Constants import (
     IMPORTANT_BEAR_LIST, ALL_CAPABILITIES, DEFAULT_CAPABILTIES)
 from coala_quickstart.Strings import BEAR_HELP
+from coala_quickstart.generation.BearCatalog import BearCatalog
+from coala_quickstart.generation.Capabilities import CAPABILITY_INDEX
+from coala_quickstart.generation.Prerequisites import (
+    get_prerequisite_checker)
 from coala_quickstart.generation.SettingsFilling import is_autofill_possible
-from coalib.bearlib.abstractions.LinterClass import LinterClass
-from coalib.settings.ConfigurationGathering import get_filtered_bears
-from coalib.misc.DictUtilities import inverse_dicts
 
 
 def filter_relevant_bears(used_languages,
@@ -33,25 +34,17 @@ def filter_relevant_bears(used_languages,
     :param extracted_info:
         list of information extracted from ``InfoExtractor`` classes.
     :return:
-        A dict with language name as key and bear classes as value.
+        A dict with language name as key and the ``BearInfo`` objects of
+        the bears from the ``BearCatalog`` as value. The bears aren't
+        imported, except to check the prerequisites of some.
     """
     args = arg_parser.parse_args() if arg_parser else None
     used_languages.append(("All", 100))
 
-    bears_by_lang = {
-        lang: set(inverse_dicts(*get_filtered_bears([lang],
-                                                    log_printer,
-                                                    arg_parser,
-                                                    silent=True)).keys())
-        for lang, _ in used_languages
-    }
-
-    # Each language would also have the language independent bears. We remove
-    # those and put them in the "All" category.
-    all_lang_bears = bears_by_lang["All"]
-    bears_by_lang = {lang: bears_by_lang[lang] - bears_by_lang["All"]
-                     for lang, _ in used_languages}
-    bears_by_lang["All"] = all_lang_bears
+    # The language independent bears are only in the "All" category.
+    bears_by_lang = BearCatalog.load(
+        arg_parser, log_printer).get_bears_by_language(
+            [lang for lang, _ in used_languages if lang != "All"])
 
     selected_bears = {}
     candidate_bears = copy.copy(bears_by_lang)
@@ -133,18 +126,17 @@ def filter_relevant_bears(used_languages,
                 selected_bears[lang].add(bear)
 
     if not args.no_filter_by_capabilities:
-        # capabilities satisfied till now
-        satisfied_capabilities = get_bears_capabilties(selected_bears)
-        remaining_capabilities = {
-            lang: [cap for cap in desired_capabilities
-                   if lang in satisfied_capabilities and
-                   cap not in satisfied_capabilities[lang]]
-            for lang in candidate_bears}
+        desired_mask = CAPABILITY_INDEX.get_mask(desired_capabilities)
 
         filtered_bears = {}
         for lang, lang_bears in candidate_bears.items():
-            filtered_bears[lang] = get_bears_with_given_capabilities(
-                lang_bears, remaining_capabilities[lang])
+            # capabilities not satisfied till now
+            remaining_mask = 0
+            if lang in selected_bears:
+                remaining_mask = desired_mask & ~(
+                    CAPABILITY_INDEX.get_bears_mask(selected_bears[lang]))
+            filtered_bears[lang] = _get_bears_with_mask(lang_bears,
+                                                        remaining_mask)
 
         # Remove overlapping capabilty bears
         filtered_bears = remove_bears_with_conflicting_capabilties(
@@ -311,7 +303,7 @@ def get_matching_linter_bears(bears, lint_tasks_info):
     that match the dependency requirements.
 
     :param bears:
-        list of Bears
+        list of ``BearInfo`` objects.
     :param dependency_info:
         list of ``LintTasksInfo`` instances.
     :return:
@@ -321,8 +313,7 @@ def get_matching_linter_bears(bears, lint_tasks_info):
     matched_bears = set()
     for task in lint_tasks_info:
         for bear in bears:
-            if (issubclass(bear, LinterClass) and
-                    bear.get_executable() == task.value):
+            if bear.get_executable() == task.value:
                 matched_bears.add(bear)
                 break
             for req in bear.REQUIREMENTS:
@@ -333,6 +324,11 @@ def get_matching_linter_bears(bears, lint_tasks_info):
     return matched_bears
 
 
+def _get_bears_with_mask(bears, mask):
+    return {bear for bear in bears
+            if CAPABILITY_INDEX.get_bear_mask(bear) & mask}
+
+
 def get_bears_with_given_capabilities(bears, capabilities):
     """
     Returns a list of bears which contain at least one on the
@@ -342,18 +338,8 @@ def get_bears_with_given_capabilities(bears, capabilities):
     :param capabilities: A list of bear capabilities that coala
                          supports
     """
-    result = set()
-    for bear in bears:
-        can_detect_caps = [c for c in list(bear.CAN_DETECT)]
-        can_fix_caps = [c for c in list(bear.CAN_FIX)]
-        eligible = False
-        for cap in capabilities:
-            if cap in can_fix_caps or cap in can_detect_caps:
-                eligible = True
-        if eligible:
-            result.add(bear)
-
-    return result
+    return _get_bears_with_mask(bears,
+                                CAPABILITY_INDEX.get_mask(capabilities))
 
 
 def get_bears_capabilties(bears_by_lang):
@@ -365,13 +351,9 @@ def get_bears_capabilties(bears_by_lang):
                           and the list of bears as values.
     :returns:             dict of capabilities by language.
     """
-    result = {}
-    for lang, lang_bears in bears_by_lang.items():
-        result[lang] = set()
-        for bear in lang_bears:
-            for cap in bear.CAN_FIX | bear.CAN_DETECT:
-                result[lang].add(cap)
-    return result
+    return {lang: CAPABILITY_INDEX.get_capabilities(
+                CAPABILITY_INDEX.get_bears_mask(lang_bears))
+            for lang, lang_bears in bears_by_lang.items()}
 
 
 def generate_capabilties_map(bears_by_lang):
@@ -396,20 +378,29 @@ def generate_capabilties_map(bears_by_lang):
 
     # collectiong the capabilities meta-data
     for lang, bears in bears_by_lang.items():
-        can_detect_meta = inverse_dicts(
-            *[{bear: list(bear.CAN_DETECT)} for bear in bears])
-        can_fix_meta = inverse_dicts(
-            *[{bear: list(bear.CAN_FIX)} for bear in bears])
+        for bit in CAPABILITY_INDEX.iter_bits(
+                CAPABILITY_INDEX.get_bears_mask(bears)):
+            capability, = CAPABILITY_INDEX.get_capabilities(bit)
+            for kind, bit_bears in zip(
+                    ("DETECT", "FIX"), _get_bears_by_kind(bears, bit)):
+                if bit_bears:
+                    capabilities_meta[capability][lang][kind] = bit_bears
+    return capabilities_meta
 
-        for capability, bears in can_detect_meta.items():
-            capabilities_meta[capability][lang]["DETECT"] = bears
 
-        for capability, bears in can_fix_meta.items():
-            capabilities_meta[capability][lang]["FIX"] = bears
-    return capabilities_meta
+def _get_bears_by_kind(bears, bit):
+    detect_bears, fix_bears = [], []
+    for bear in sorted(bears, key=lambda bear: bear.name):
+        detect_mask, fix_mask = CAPABILITY_INDEX.get_bear_masks(bear)
+        if detect_mask & bit:
+            detect_bears.append(bear)
+        if fix_mask & bit:
+            fix_bears.append(bear)
+    return detect_bears, fix_bears
 
 
-def remove_bears_with_conflicting_capabilties(bears_by_lang):
+def remove_bears_with_conflicting_capabilties(bears_by_lang,
+                                              prerequisite_checker=None):
     """
     Eliminate bears having no unique capabilities among the other
     bears present in the list.
@@ -417,36 +408,44 @@ def remove_bears_with_conflicting_capabilties(bears_by_lang):
     - The bears already having dependencies installed.
     - Bears that can fix the capability rather that just detecting it.
 
-    :param bears_by_lang: dict with language names as keys
-                          and the list of bears as values.
+    :param bears_by_lang:        dict with language names as keys
+                                 and the list of bears as values.
+    :param prerequisite_checker: The ``PrerequisiteChecker`` checking
+                                 whether the dependencies of the bears are
+                                 installed, by default the one shared by
+                                 the process.
     """
-    result = {}
+    if prerequisite_checker is None:
+        prerequisite_checker = get_prerequisite_checker()
+
+    candidate_bears = {}
     for lang, bears in bears_by_lang.items():
+        for bit in CAPABILITY_INDEX.iter_bits(
+                CAPABILITY_INDEX.get_bears_mask(bears)):
+            detect_bears, fix_bears = _get_bears_by_kind(bears, bit)
+            # Bears that can fix the capabilitiy, or else the bears that
+            # can detect it
+            candidate_bears[lang] = fix_bears or detect_bears
+            break
+
+    # The prerequisites of all candidates are checked at once
+    installed = prerequisite_checker.check_all(
+        {bear for bears in candidate_bears.values() for bear in bears})
+
+    result = {}
+    for lang in bears_by_lang:
         lang_result = set()
-        capabilities_map = generate_capabilties_map({lang: bears})
-        for cap in capabilities_map.keys():
-            # bears that can fix the ``cap`` capabilitiy
-            fix_bears = capabilities_map[cap][lang].get("FIX")
-            if fix_bears:
-                for bear in fix_bears:
-                    if bear.check_prerequisites() is True:
-                        # The dependecies for bear are already installed,
-                        # so select it.
-                        lang_result.add(bear)
-                        break
-                # None of the bear has it's dependency installed, select
-                # a random bear.
-                lang_result.add(random.choice(fix_bears))
-                break
-            # There were no bears to fix the capability
-            detect_bears = capabilities_map[cap][lang].get("DETECT")
-            if detect_bears:
-                for bear in detect_bears:
-                    if bear.check_prerequisites() is True:
-                        lang_result.add(bear)
-                        break
-                lang_result.add(random.choice(detect_bears))
-                break
+        bears = candidate_bears.get(lang)
+        if bears:
+            for bear in bears:
+                if installed[bear] is True:
+                    # The dependecies for bear are already installed,
+                    # so select it.
+                    lang_result.add(bear)
+                    break
+            # None of the bear has it's dependency installed, select
+            # a random bear.
+            lang_result.add(random.choice(bears))
         result[lang] = lang_result
 
     return result
@@ -0,0 +1,102 @@
+from coala_quickstart.Constants import ALL_CAPABILITIES
+
+
+class CapabilityIndex:
+    """
+    Maps the capabilities of bears to bits, so sets of capabilities are
+    integer masks and filtering bears by their capabilities is done with
+    bitwise operations. The masks of the bears are computed once.
+
+    The capabilities in ``ALL_CAPABILITIES`` get the lowest bits in sorted
+    order, other capabilities of custom bears get the next bits when they
+    are first seen.
+
+    >>> index = CapabilityIndex(["Smell", "Syntax"])
+    >>> index.get_mask(["Syntax"])
+    2
+    >>> index.get_mask(["Syntax", "Spelling"])
+    6
+    >>> sorted(index.get_capabilities(5))
+    ['Smell', 'Spelling']
+    """
+
+    def __init__(self, capabilities=ALL_CAPABILITIES):
+        """
+        :param capabilities: The capabilities getting the lowest bits.
+        """
+        self.bits = {capability: 1 << position
+                     for position, capability in
+                     enumerate(sorted(capabilities))}
+        self._bear_masks = {}
+
+    def get_bit(self, capability):
+        """
+        :return: The bit of a capability.
+        """
+        bit = self.bits.get(capability)
+        if bit is None:
+            bit = self.bits[capability] = 1 << len(self.bits)
+        return bit
+
+    def get_mask(self, capabilities):
+        """
+        :param capabilities: A collection of capabilities.
+        :return:             The mask of the capabilities.
+        """
+        mask = 0
+        for capability in capabilities:
+            mask |= self.get_bit(capability)
+        return mask
+
+    def get_capabilities(self, mask):
+        """
+        :param mask: A mask of capabilities.
+        :return:     The set of the capabilities in the mask.
+        """
+        return {capability for capability, bit in self.bits.items()
+                if mask & bit}
+
+    def iter_bits(self, mask):
+        """
+        Yields the bits set in a mask, the lowest first.
+        """
+        while mask:
+            bit = mask & -mask
+            yield bit
+            mask ^= bit
+
+    def get_bear_masks(self, bear):
+        """
+        :param bear: A bear class or ``BearInfo`` object.
+        :return:     A tuple of the masks of the capabilities the bear can
+                     detect and fix.
+        """
+        masks = self._bear_masks.get(bear)
+        if masks is None:
+            masks = self._bear_masks[bear] = (self.get_mask(bear.CAN_DETECT),
+                                              self.get_mask(bear.CAN_FIX))
+        return masks
+
+    def get_bear_mask(self, bear):
+        """
+        :param bear: A bear class or ``BearInfo`` object.
+        :return:     The mask of the capabilities the bear can detect or
+                     fix.
+        """
+        detect_mask, fix_mask = self.get_bear_masks(bear)
+        return detect_mask | fix_mask
+
+    def get_bears_mask(self, bears):
+        """
+        :param bears: A collection of bears.
+        :return:      The mask of the capabilities any of the bears can
+                      detect or fix.
+        """
+        mask = 0
+        for bear in bears:
+            mask |= self.get_bear_mask(bear)
+        return mask
+
+
+# The index shared by the functions filtering the bears
+CAPABILITY_INDEX = CapabilityIndex()
@@ -0,0 +1,273 @@
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from coalib.misc.CachingUtilities import pickle_dump, pickle_load
+
+# The number of bytes read from the start of a file to detect its language
+MAX_READ_SIZE = 512
+DEFAULT_BATCH_SIZE = 64
+CACHE_IDENTIFIER = "coala_quickstart_content_languages"
+
+FILENAME_LANGUAGES = {
+    "Dockerfile": "Dockerfile",
+    "Gemfile": "Ruby",
+    "Rakefile": "Ruby",
+    "Vagrantfile": "Ruby",
+    "Podfile": "Ruby",
+    "Guardfile": "Ruby",
+    "Capfile": "Ruby",
+    "Berksfile": "Ruby",
+    "Jakefile": "JavaScript",
+    "SConstruct": "Python",
+    "SConscript": "Python",
+    "Snakefile": "Python",
+    "Makefile": "Makefile",
+    "GNUmakefile": "Makefile",
+    "makefile": "Makefile",
+    ".bashrc": "bash",
+    ".bash_profile": "bash",
+    ".profile": "sh",
+}
+
+INTERPRETER_LANGUAGES = {
+    "python": "Python",
+    "pypy": "Python",
+    "ruby": "Ruby",
+    "perl": "Perl",
+    "node": "JavaScript",
+    "nodejs": "JavaScript",
+    "php": "PHP",
+    "lua": "Lua",
+    "Rscript": "R",
+    "julia": "Julia",
+    "sh": "sh",
+    "bash": "bash",
+    "dash": "dash",
+    "ksh": "ksh",
+}
+
+MODELINE_LANGUAGES = {
+    "python": "Python",
+    "ruby": "Ruby",
+    "perl": "Perl",
+    "javascript": "JavaScript",
+    "js": "JavaScript",
+    "php": "PHP",
+    "lua": "Lua",
+    "sh": "sh",
+    "shell-script": "sh",
+    "bash": "bash",
+    "c": "C",
+    "cpp": "C++",
+    "c++": "C++",
+    "java": "Java",
+    "go": "Go",
+    "html": "HTML",
+    "xml": "XML",
+    "yaml": "YAML",
+    "json": "JSON",
+    "markdown": "Markdown",
+    "rst": "reStructuredText",
+    "tex": "TeX",
+    "cmake": "CMake",
+    "make": "Makefile",
+    "makefile": "Makefile",
+    "dockerfile": "Dockerfile",
+}
+
+_VIM_MODELINE = re.compile(
+    r"(?:^|\s)(?:vi|vim|ex)(?:[<=>]?\d+)?:.*?"
+    r"\b(?:ft|filetype|syntax)=([\w+-]+)")
+_EMACS_MODELINE = re.compile(r"-\*-(.*?)-\*-")
+_EMACS_MODE = re.compile(r"(?:^|;)\s*mode:\s*([\w+-]+)", re.IGNORECASE)
+_VERSION_SUFFIX = re.compile(r"[\d.]+$")
+
+
+def detect_shebang(line):
+    """
+    Detects the language of a script from its shebang line.
+
+    >>> detect_shebang("#!/usr/bin/env python3")
+    'Python'
+    >>> detect_shebang("#! /bin/bash -e")
+    'bash'
+    >>> detect_shebang("#!/usr/bin/env -S node --harmony")
+    'JavaScript'
+    >>> detect_shebang("# Not a shebang")
+
+    :param line: The first line of the file.
+    :return:     The language, or None if it's unknown.
+    """
+    if not line.startswith("#!"):
+        return None
+
+    words = line[2:].split()
+    if words and os.path.basename(words[0]) == "env":
+        # Skip the options of env, like -S
+        words = [word for word in words[1:] if not word.startswith("-")]
+    if not words:
+        return None
+
+    interpreter = _VERSION_SUFFIX.sub("", os.path.basename(words[0]))
+    return INTERPRETER_LANGUAGES.get(interpreter)
+
+
+def detect_modeline(text):
+    """
+    Detects the language of a file from a Vim or Emacs modeline.
+
+    >>> detect_modeline("# vim: set ft=python ts=4 :")
+    'Python'
+    >>> detect_modeline("# -*- mode: ruby; coding: utf-8 -*-")
+    'Ruby'
+    >>> detect_modeline("// -*- C++ -*-")
+    'C++'
+
+    :param text: The start of the file.
+    :return:     The language, or None if it's unknown.
+    """
+    for line in text.splitlines():
+        match = _VIM_MODELINE.search(line)
+        if match:
+            return MODELINE_LANGUAGES.get(match.group(1).lower())
+
+        match = _EMACS_MODELINE.search(line)
+        if match:
+            content = match.group(1)
+            mode = _EMACS_MODE.search(content)
+            name = mode.group(1) if mode else content.strip()
+            return MODELINE_LANGUAGES.get(name.lower())
+    return None
+
+
+def detect_content(data):
+    """
+    Detects the language of a file from the start of its contents.
+
+    :param data: The first bytes of the file.
+    :return:     The language, or None if it's unknown.
+    """
+    text = data.decode("latin-1")
+    return (detect_shebang(text.partition("\n")[0].strip()) or
+            detect_modeline(text))
+
+
+def map_batches(function, items, jobs, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Applies a function to every item of a list, in batches on a thread pool.
+    Small lists are handled without starting any threads.
+
+    >>> map_batches(len, ["a", "bb", "ccc"], jobs=2, batch_size=2)
+    [1, 2, 3]
+
+    :param function:   The function to apply.
+    :param items:      A list of items.
+    :param jobs:       The maximum number of threads.
+    :param batch_size: The number of items handled by a thread at once.
+    :return:           A list of the results, in the order of the items.
+    """
+    def apply(batch):
+        return [function(item) for item in batch]
+
+    batches = [items[index:index + batch_size]
+               for index in range(0, len(items), batch_size)]
+    if len(batches) <= 1:
+        return apply(items)
+
+    with ThreadPoolExecutor(min(jobs, len(batches))) as executor:
+        return [result
+                for batch in executor.map(apply, batches)
+                for result in batch]
+
+
+class ContentDetector:
+    """
+    Detects the language of files without a known extension by their name
+    or by the shebang or modeline at the start of their contents. At most
+    ``MAX_READ_SIZE`` bytes are read from every file.
+
+    The results for files read are cached by their device, inode,
+    modification time and size, so the cache can be kept between runs with
+    ``load`` and ``save``. Given a ``WalkSnapshot``, the results are kept in
+    it as well, and taken from it without accessing the files.
+    """
+
+    def __init__(self,
+                 cache=None,
+                 jobs=None,
+                 batch_size=DEFAULT_BATCH_SIZE,
+                 snapshot=None):
+        """
+        :param cache:      A dict with the results of a previous run.
+        :param jobs:       The number of threads reading files, by default
+                           the number of CPUs.
+        :param batch_size: The number of files handled by a thread at once.
+        :param snapshot:   The ``WalkSnapshot`` object the files were
+                           listed with.
+        """
+        self.cache = {} if cache is None else cache
+        self.jobs = jobs or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.snapshot = snapshot
+        # The cache entries of the files seen in this run
+        self.used_cache = {}
+
+    @classmethod
+    def load(cls, **kwargs):
+        """
+        Creates a detector using the cache saved by the last run.
+        """
+        return cls(pickle_load(None, CACHE_IDENTIFIER, {}), **kwargs)
+
+    def save(self):
+        """
+        Saves the cache entries of the files seen in this run, so entries of
+        removed files don't accumulate.
+
+        :return: True if the cache was saved.
+        """
+        return pickle_dump(None, CACHE_IDENTIFIER, self.used_cache)
+
+    def detect(self, path):
+        """
+        Detects the language of a single file.
+
+        :param path: The path of the file.
+        :return:     The language, or None if it's unknown or the file can't
+                     be read.
+        """
+        language = FILENAME_LANGUAGES.get(os.path.basename(path))
+        if language is not None:
+            return language
+
+        if self.snapshot is not None:
+            known, language = self.snapshot.get_language(path)
+            if known:
+                return language
+
+        try:
+            stat = os.stat(path)
+            key = (stat.st_dev, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            try:
+                language = self.cache[key]
+            except KeyError:
+                with open(path, "rb") as file:
+                    language = detect_content(file.read(MAX_READ_SIZE))
+        except OSError:
+            return None
+
+        self.used_cache[key] = language
+        if self.snapshot is not None:
+            self.snapshot.set_language(path, language)
+        return language
+
+    def detect_all(self, paths):
+        """
+        Detects the languages of files in batches on a thread pool.
+
+        :param paths: A list of file paths.
+        :return:      A list of the languages of the files, None for unknown
+                      ones.
+        """
+        return map_batches(self.detect, paths, self.jobs, self.batch_size)
@@ -0,0 +1,125 @@
+import os
+import threading
+
+from coalib.parsing.Globbing import glob_escape
+
+# Directories always holding installed dependencies or generated files
+ENVIRONMENT_DIRECTORIES = frozenset((
+    "node_modules",
+    "bower_components",
+    ".tox",
+    ".nox",
+    "__pycache__",
+    ".eggs",
+))
+
+# Directories with dependencies identified by their parent as well
+ENVIRONMENT_PATHS = (
+    ("vendor", "bundle"),
+)
+
+# Entries marking the directory containing them as an environment, like
+# the configuration of a virtualenv
+ENVIRONMENT_MARKERS = frozenset((
+    "pyvenv.cfg",
+    "conda-meta",
+))
+
+
+def get_marker_entries(relpaths):
+    """
+    Finds the marker entries among the paths of files known without
+    listing their directories, like the files tracked in the git index.
+    Marker directories are found by the files inside them.
+
+    >>> get_marker_entries(["env/pyvenv.cfg", "env/lib/six.py",
+    ...                     "conda/conda-meta/history", "src/main.py"])
+    {'conda': ['conda-meta'], 'env': ['pyvenv.cfg']}
+
+    :param relpaths: An iterable of ``/`` separated file paths relative to
+                     the project directory.
+    :return:         A dict with the ``/`` separated paths of the
+                     directories containing marker entries as keys and
+                     sorted lists of the names of their marker entries as
+                     values.
+    """
+    entries = {}
+    for relpath in relpaths:
+        components = relpath.split("/")
+        for index in range(1, len(components)):
+            if components[index] in ENVIRONMENT_MARKERS:
+                entries.setdefault("/".join(components[:index]),
+                                   set()).add(components[index])
+    return {directory: sorted(names)
+            for directory, names in sorted(entries.items())}
+
+
+class EnvironmentDetector:
+    """
+    Recognizes the directories of virtual environments and installed
+    dependencies, so the walkers can skip them even if they aren't ignored
+    by a ``.gitignore`` file. The directories found are recorded, relative
+    to the project directory.
+
+    Most directories are recognized by their name, before they are listed.
+    Virtual environments are recognized by their marker files, like
+    ``pyvenv.cfg``, when they are listed, without descending into them.
+
+    >>> detector = EnvironmentDetector()
+    >>> detector.match_path(os.path.join("web", "node_modules"))
+    True
+    >>> detector.match_entries("env", ["bin", "lib", "pyvenv.cfg"])
+    True
+    >>> detector.match_path("src")
+    False
+    >>> sorted(detector.found) == ["env", os.path.join("web", "node_modules")]
+    True
+    """
+
+    def __init__(self):
+        self.found = set()
+        # The walkers may check directories from several threads
+        self._lock = threading.Lock()
+
+    def _add(self, relpath):
+        with self._lock:
+            self.found.add(relpath)
+        return True
+
+    def match_path(self, relpath):
+        """
+        Checks whether a directory is an environment by its path.
+
+        :param relpath: The path of the directory relative to the project
+                        directory.
+        :return:        True if the directory is an environment.
+        """
+        components = relpath.split(os.sep)
+        if components[-1] in ENVIRONMENT_DIRECTORIES:
+            return self._add(relpath)
+        for path in ENVIRONMENT_PATHS:
+            if tuple(components[-len(path):]) == path:
+                return self._add(relpath)
+        return False
+
+    def match_entries(self, relpath, names):
+        """
+        Checks whether a directory is an environment by its entries.
+
+        :param relpath: The path of the directory relative to the project
+                        directory.
+        :param names:   The names of the entries of the directory.
+        :return:        True if the directory is an environment.
+        """
+        if not ENVIRONMENT_MARKERS.isdisjoint(names):
+            return self._add(relpath)
+        return False
+
+    def get_globs(self, root):
+        """
+        :param root: The project directory.
+        :return:     A sorted list of absolute globs matching everything
+                     inside the directories found.
+        """
+        return [os.path.join(glob_escape(root), glob_escape(relpath), "**")
+                for relpath in sorted(self.found)]
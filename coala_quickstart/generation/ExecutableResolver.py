@@ -0,0 +1,148 @@
+import os
+
+_resolver = None
+
+
+def _get_path_extensions():
+    """
+    :return: The lower case extensions making files executable on Windows,
+             or an empty tuple on other platforms.
+    """
+    if os.name != "nt":
+        return ()
+    return tuple(extension.lower()
+                 for extension in os.environ.get(
+                     "PATHEXT", ".COM;.EXE;.BAT;.CMD").split(os.pathsep)
+                 if extension)
+
+
+class ExecutableResolver:
+    """
+    Answers whether executables are on the ``PATH`` like ``shutil.which``,
+    from an index of the names of the files in the ``PATH`` directories.
+    Every directory is scanned once and only scanned again when its
+    modification time changes, which ``update`` checks, or when the
+    ``PATH`` changes.
+
+    >>> resolver = ExecutableResolver(path="")
+    >>> resolver.has_executable("python")
+    False
+    """
+
+    def __init__(self, path=None):
+        """
+        :param path: The ``PATH`` to resolve executables in, by default the
+                     one of the environment, which is followed when it
+                     changes.
+        """
+        self.fixed_path = path
+        self.path = None
+        self.directories = {}
+        self._index = {}
+        self._found = {}
+
+    def _get_path(self):
+        if self.fixed_path is not None:
+            return self.fixed_path
+        return os.environ.get("PATH", os.defpath)
+
+    def _scan(self, directory):
+        """
+        :return: A dict with the names of the files in the directory as keys
+                 and their paths as values. On Windows the names are lower
+                 case and also given without an executable extension.
+        """
+        extensions = _get_path_extensions()
+        names = {}
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return names
+        for entry in entries:
+            try:
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            name = os.path.normcase(entry.name)
+            names.setdefault(name, entry.path)
+            stem, extension = os.path.splitext(name)
+            if extension in extensions:
+                names.setdefault(stem, entry.path)
+        return names
+
+    def update(self):
+        """
+        Scans the ``PATH`` directories which changed since the last update,
+        or all of them if the ``PATH`` changed.
+
+        :return: True if the index changed.
+        """
+        path = self._get_path()
+        directories = [directory for directory in path.split(os.pathsep)
+                       if directory]
+        changed = path != self.path
+        scanned = {}
+        for directory in directories:
+            if directory in scanned:
+                continue
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except OSError:
+                mtime = None
+            old = self.directories.get(directory)
+            if old is not None and old[0] == mtime:
+                scanned[directory] = old
+            else:
+                scanned[directory] = (
+                    mtime, self._scan(directory) if mtime is not None else {})
+                changed = True
+        changed = changed or set(scanned) != set(self.directories)
+        self.path = path
+        self.directories = scanned
+        if changed:
+            index = {}
+            for directory in directories:
+                for name, file_path in scanned[directory][1].items():
+                    index.setdefault(name, []).append(file_path)
+            self._index = index
+            self._found = {}
+        return changed
+
+    def find_executable(self, name):
+        """
+        :param name: The name of an executable or the path to it.
+        :return:     The path of the first executable file of that name on
+                     the ``PATH``, or None if there isn't any.
+        """
+        if os.path.dirname(name):
+            return (name if os.path.isfile(name) and os.access(name, os.X_OK)
+                    else None)
+        if self._get_path() != self.path:
+            self.update()
+
+        name = os.path.normcase(name)
+        if name not in self._found:
+            self._found[name] = next(
+                (file_path for file_path in self._index.get(name, ())
+                 if os.access(file_path, os.X_OK)),
+                None)
+        return self._found[name]
+
+    def has_executable(self, name):
+        """
+        :param name: The name of an executable or the path to it.
+        :return:     True if the executable is on the ``PATH``.
+        """
+        return self.find_executable(name) is not None
+
+
+def get_executable_resolver():
+    """
+    :return: The ``ExecutableResolver`` shared by the process, updated.
+    """
+    global _resolver
+    if _resolver is None:
+        _resolver = ExecutableResolver()
+    _resolver.update()
+    return _resolver
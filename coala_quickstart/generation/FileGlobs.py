@@ -1,20 +1,100 @@
 import os
+import random
+import stat
 
 from coalib.parsing.Globbing import glob_escape
 from coala_quickstart.generation.Utilities import get_gitignore_glob
 from coala_utils.Question import ask_question
 from coala_quickstart.Strings import GLOB_HELP
-from coalib.collecting.Collectors import collect_files
+from coala_quickstart.generation.FileWalker import (
+    filter_files, parallel_walk_files, sample_walk_files, walk_files)
+from coala_quickstart.generation.EnvironmentDirs import EnvironmentDetector
+from coala_quickstart.generation.GitIndex import get_tracked_files
+from coala_quickstart.generation.IgnoreMatcher import IgnoreResolver
+
+
+def print_environment_dirs(printer, directories):
+    """
+    Prints the directories of virtual environments and dependencies that
+    were skipped.
+
+    :param printer:     A ``ConsolePrinter`` object.
+    :param directories: The paths of the directories relative to the
+                        project directory.
+    """
+    if not directories:
+        return
+    printer.print("The following environment and dependency directories "
+                  "will be automatically ignored:", color="green")
+    for directory in sorted(directories):
+        printer.print("    " + directory)
+    printer.print()
+
+
+def print_negated_patterns(printer, negated_patterns):
+    """
+    Warns about the negated patterns of the ``.gitignore`` files, which
+    can't be used in the coafile.
+
+    :param printer:          A ``ConsolePrinter`` object.
+    :param negated_patterns: A list of tuples of the paths of the
+                             ``.gitignore`` files relative to the project
+                             directory and their negated patterns.
+    """
+    if not negated_patterns:
+        return
+    printer.print("The following negated patterns of your .gitignore files "
+                  "are not supported in the coafile. The files they include "
+                  "again will still be ignored by coala:", color="yellow")
+    for path, pattern in negated_patterns:
+        printer.print("    {}: {}".format(path, pattern))
+    printer.print()
 
 
 def get_project_files(log_printer,
                       printer,
                       project_dir,
                       file_path_completer,
-                      non_interactive=False):
+                      non_interactive=False,
+                      use_git_index=False,
+                      walk_jobs=1):
     """
     Gets the list of files matching files in the user's project directory
-    after prompting for glob expressions.
+    after prompting for glob expressions. See ``iter_project_files`` for
+    the parameters.
+
+    :return:
+        A tuple of the list of file paths matching the files and the list
+        of ignore globs.
+    """
+    file_paths, ignore_globs = iter_project_files(log_printer,
+                                                  printer,
+                                                  project_dir,
+                                                  file_path_completer,
+                                                  non_interactive,
+                                                  use_git_index,
+                                                  walk_jobs)
+    return list(file_paths), ignore_globs
+
+
+def iter_project_files(log_printer,
+                       printer,
+                       project_dir,
+                       file_path_completer,
+                       non_interactive=False,
+                       use_git_index=False,
+                       walk_jobs=1,
+                       with_sizes=False,
+                       sample=False,
+                       exclude_environments=True,
+                       snapshot=None,
+                       follow_symlinks=False,
+                       subtrees=None,
+                       max_depth=None):
+    """
+    Prompts for glob expressions and returns a generator of the files in
+    the user's project directory, which are discovered as the generator is
+    consumed.
 
     :param log_printer:
         A ``LogPrinter`` object.
@@ -24,17 +104,56 @@ def get_project_files(log_printer,
         A ``file_path_completer`` object.
     :param non_interactive
         Whether coala-quickstart is in non-interactive mode
+    :param use_git_index:
+        Whether to list the files tracked in the git index instead of
+        walking the project directory, if it is the root of a git work tree.
+        Untracked files which aren't ignored are left out then.
+    :param walk_jobs:
+        The number of directories listed at the same time when walking the
+        project directory. With more than one job ``parallel_walk_files``
+        is used.
+    :param with_sizes:
+        Whether to generate tuples of the file paths and the sizes of the
+        files, taken from the git index or the directory entries.
+    :param sample:
+        Whether to generate random draws of the files instead, as tuples
+        of the path, the size or None without ``with_sizes`` and the
+        probability of the draw, so the files generated first are a sample
+        of the whole project, see ``ProjectIndex.add_until_confident``.
+        The files tracked in the git index are shuffled and all equally
+        likely, otherwise they are drawn by ``sample_walk_files``.
+    :param exclude_environments:
+        Whether to skip the directories of virtual environments and
+        installed dependencies, recognized by an ``EnvironmentDetector``.
+        The directories skipped are printed and ignored in the coafile.
+    :param snapshot:
+        A ``WalkSnapshot`` object used when walking the project directory,
+        so only the directories changed since the last run are listed. It
+        isn't used for the files tracked in the git index.
+    :param follow_symlinks:
+        Whether to follow symbolic links when walking the project
+        directory, see ``walk_files``. Symbolic links tracked in the git
+        index are always left out, as git doesn't follow them and their
+        targets inside the project are tracked themselves.
+    :param subtrees:
+        A list of directories relative to ``project_dir``. If given, only
+        the files inside them are generated.
+    :param max_depth:
+        The maximum number of directory levels below ``project_dir`` the
+        files can be in.
     :return:
-        A list of file paths matching the files.
+        A tuple of a generator of the file paths matching the files and the
+        list of ignore globs. The globs of the ``.gitignore`` files found
+        are added to the list once the generator is exhausted or closed.
+        If it is closed early, only the ``.gitignore`` files of the
+        directories walked so far are included.
     """
-    file_globs = ["**"]
-
     ignore_globs = None
     if os.path.isfile(os.path.join(project_dir, ".gitignore")):
         printer.print("The contents of your .gitignore file for the project "
                       "will be automatically loaded as the files to ignore.",
                       color="green")
-        ignore_globs = get_gitignore_glob(project_dir)
+        ignore_globs = []
     if non_interactive and not ignore_globs:
         ignore_globs = []
 
@@ -51,16 +170,98 @@ def get_project_files(log_printer,
 
     ignore_globs = list(ignore_globs)
     escaped_project_dir = glob_escape(project_dir)
-    file_path_globs = [os.path.join(
-        escaped_project_dir, glob_exp) for glob_exp in file_globs]
     ignore_path_globs = [os.path.join(
         escaped_project_dir, glob_exp) for glob_exp in ignore_globs]
 
     ignore_path_globs.append(os.path.join(escaped_project_dir, ".git/**"))
 
-    file_paths = collect_files(
-        file_path_globs,
-        log_printer,
-        ignored_file_paths=ignore_path_globs)
+    ignore_resolver = IgnoreResolver(project_dir)
+    environment_detector = (EnvironmentDetector() if exclude_environments
+                            else None)
+
+    def generate_file_paths():
+        tracked_files = (get_tracked_files(project_dir)
+                         if use_git_index else None)
+        if tracked_files is not None:
+            printer.print("Only the files tracked in the git index are "
+                          "used, untracked files are left out.",
+                          color="yellow")
+            if snapshot is not None:
+                printer.print("The snapshot is only used when walking the "
+                              "project directory, not for the files "
+                              "tracked in the git index.", color="yellow")
+            if sample:
+                random.shuffle(tracked_files)
+            files = filter_files(project_dir,
+                                 ((entry.path, entry.size)
+                                  if with_sizes else entry.path
+                                  for entry in tracked_files
+                                  if not stat.S_ISLNK(entry.mode)),
+                                 ignore_path_globs,
+                                 ignore_resolver,
+                                 with_sizes,
+                                 environment_detector,
+                                 subtrees,
+                                 max_depth)
+            if not sample:
+                yield from files
+                return
+            probability = 1 / max(len(tracked_files), 1)
+            for file in files:
+                path, size = file if with_sizes else (file, None)
+                yield path, size, probability
+        elif sample:
+            yield from sample_walk_files(
+                project_dir,
+                ignore_path_globs,
+                ignore_resolver,
+                with_sizes,
+                environment_detector=environment_detector,
+                snapshot=snapshot,
+                follow_symlinks=follow_symlinks,
+                subtrees=subtrees,
+                max_depth=max_depth,
+                with_probabilities=True)
+        elif walk_jobs > 1:
+            yield from parallel_walk_files(project_dir,
+                                           ignore_path_globs,
+                                           ignore_resolver,
+                                           walk_jobs,
+                                           with_sizes,
+                                           environment_detector,
+                                           snapshot,
+                                           follow_symlinks,
+                                           subtrees,
+                                           max_depth)
+        else:
+            yield from walk_files(project_dir,
+                                  ignore_path_globs,
+                                  ignore_resolver,
+                                  with_sizes,
+                                  environment_detector,
+                                  snapshot,
+                                  follow_symlinks,
+                                  subtrees,
+                                  max_depth)
+
+    def generate_and_add_ignore_globs():
+        try:
+            yield from generate_file_paths()
+        finally:
+            # The walk loaded the .gitignore files of all the directories it
+            # entered, their globs are needed for the generated coafile.
+            negated_patterns = []
+            for directory, filename in ignore_resolver.get_ignore_files():
+                negated = []
+                ignore_globs.extend(get_gitignore_glob(directory, filename,
+                                                       negated))
+                path = os.path.relpath(os.path.join(directory, filename),
+                                       project_dir)
+                negated_patterns += [(path, pattern) for pattern in negated]
+            print_negated_patterns(printer, negated_patterns)
+            if environment_detector is not None:
+                print_environment_dirs(printer, environment_detector.found)
+                ignore_globs.extend(
+                    environment_detector.get_globs(project_dir))
 
-    return file_paths, ignore_globs
+    return generate_and_add_ignore_globs(), ignore_globs
@@ -0,0 +1,672 @@
+import heapq
+import os
+import random
+import threading
+from collections import deque
+
+from coala_quickstart.generation.EnvironmentDirs import get_marker_entries
+from coala_quickstart.generation.IgnoreMatcher import compile_globs
+
+DEFAULT_WALK_JOBS = 8
+
+
+def get_pruning_globs(ignore_globs):
+    """
+    Selects the ignore globs that can be used to skip whole directories.
+
+    A glob ending with ``**`` that matches ``dir/`` matches every path below
+    ``dir`` as well, as the trailing ``**`` can swallow the rest of the path.
+    Such directories can therefore be skipped without listing them.
+
+    >>> get_pruning_globs(['/repo/build/**', '/repo/**.pyc', '/repo/**'])
+    ['/repo/build/**', '/repo/**']
+
+    :param ignore_globs: A list of absolute glob expressions.
+    :return:             The globs which are safe to check against directories.
+    """
+    return [glob for glob in ignore_globs if glob.endswith("**")]
+
+
+def get_scope_check(subtrees=None, max_depth=None):
+    """
+    Builds the function deciding whether a path is outside the part of a
+    project to walk. The parents of the subtrees are inside, so the
+    subtrees can be reached, but their files are not.
+
+    >>> is_outside = get_scope_check(["src/lib"], max_depth=3)
+    >>> is_outside("src", is_dir=True), is_outside("src/main.c")
+    (False, True)
+    >>> is_outside("src/lib/a/b", is_dir=True), is_outside("docs", True)
+    (True, True)
+
+    :param subtrees:  A list of directories relative to the root, to walk
+                      instead of the whole project.
+    :param max_depth: The maximum number of directory levels below the root
+                      to walk, 0 walking the root only.
+    :return:          A function taking a path relative to the root and
+                      whether it is a directory, and returning True if the
+                      path is outside. None if the whole project is walked.
+    """
+    if not subtrees and max_depth is None:
+        return None
+    prefixes = (tuple(os.path.join(subtree, "") for subtree in subtrees)
+                if subtrees else None)
+
+    def is_outside(relpath, is_dir=False):
+        if (is_dir and max_depth is not None and
+                relpath.count(os.sep) >= max_depth):
+            return True
+        if prefixes is None:
+            return False
+        if not is_dir:
+            return not relpath.startswith(prefixes)
+        relpath = os.path.join(relpath, "")
+        return not (relpath.startswith(prefixes) or
+                    any(prefix.startswith(relpath) for prefix in prefixes))
+
+    return is_outside
+
+
+def _get_ignore_checks(root,
+                       ignore_globs,
+                       ignore_matcher,
+                       environment_detector=None,
+                       subtrees=None,
+                       max_depth=None):
+    """
+    Builds the functions deciding whether a directory or file is ignored.
+    Directories recognized by the ``environment_detector`` by their path
+    and paths outside the ``subtrees`` or deeper than ``max_depth`` (see
+    ``get_scope_check``) are ignored as well.
+
+    :return: A tuple of two functions taking the absolute and the relative
+             path, the first one for directories, the second one for files.
+    """
+    is_glob_ignored = compile_globs(ignore_globs)
+    is_glob_pruned = compile_globs(get_pruning_globs(ignore_globs))
+    is_outside = get_scope_check(subtrees, max_depth)
+
+    def is_dir_ignored(path, relpath):
+        return bool((is_outside and is_outside(relpath, is_dir=True)) or
+                    (is_glob_pruned and is_glob_pruned(path + os.sep)) or
+                    (ignore_matcher and
+                     ignore_matcher.match(relpath, is_dir=True)) or
+                    (environment_detector and
+                     environment_detector.match_path(relpath)))
+
+    def is_file_ignored(path, relpath):
+        return bool((is_outside and is_outside(relpath)) or
+                    (is_glob_ignored and is_glob_ignored(path)) or
+                    (ignore_matcher and ignore_matcher.match(relpath)))
+
+    return is_dir_ignored, is_file_ignored
+
+
+def _get_size(entry):
+    try:
+        return entry.stat().st_size
+    except OSError:
+        return 0
+
+
+def list_directory(directory, with_sizes=False, follow_symlinks=False):
+    """
+    Lists the files and subdirectories of a directory, without filtering
+    them.
+
+    :param directory:       The path of the directory.
+    :param with_sizes:      Whether to take the sizes of the files from the
+                            directory entries.
+    :param follow_symlinks: Whether to list symbolic links as the files or
+                            directories they point to. Otherwise they are
+                            left out.
+    :return:                A tuple of a list of tuples of the names and
+                            sizes of the files, the sizes being None without
+                            ``with_sizes``, and a list of the names of the
+                            subdirectories, both sorted by name. None if the
+                            directory can't be listed.
+    """
+    try:
+        entries = sorted(os.scandir(directory), key=lambda e: e.name)
+    except OSError:
+        return None
+
+    files, subdirs = [], []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir(follow_symlinks=follow_symlinks)
+        except OSError:
+            continue
+
+        if is_dir:
+            subdirs.append(entry.name)
+        elif entry.is_file(follow_symlinks=follow_symlinks):
+            files.append((entry.name,
+                          _get_size(entry) if with_sizes else None))
+    return files, subdirs
+
+
+def _get_scanner(root,
+                 ignore_globs,
+                 ignore_matcher,
+                 with_sizes=False,
+                 environment_detector=None,
+                 snapshot=None,
+                 follow_symlinks=False,
+                 subtrees=None,
+                 max_depth=None):
+    """
+    Builds the function listing a single directory for the walkers.
+
+    Symbolic links are left out unless ``follow_symlinks`` is set. Then the
+    device and inode of every directory and file is recorded, and every
+    directory is only listed through the first path it's found through, so
+    link loops end and a directory linked from several places is listed
+    once. Files found through several paths are listed every time. Once the
+    walk is done, ``get_canonical_files`` rewrites the paths and removes
+    the duplicates.
+
+    :return: A tuple of the function taking the absolute path of a
+             directory and returning a tuple of the files and the
+             subdirectories to walk, both sorted by name, a dict with the
+             paths of the files found as keys and tuples of their device and
+             inode, whether the file is a link and the directory it was
+             found in as values, and the ``get_canonical_files`` function,
+             both only used while following links. With ``with_sizes`` the
+             files are tuples of the path and the size. Nothing is returned
+             for directories the ``environment_detector`` recognizes by
+             their entries. The listings are taken from the ``snapshot`` if
+             one is given.
+    """
+    is_dir_ignored, is_file_ignored = _get_ignore_checks(
+        root, list(ignore_globs), ignore_matcher, environment_detector,
+        subtrees, max_depth)
+    prefix_length = len(os.path.join(root, ""))
+    # The path every directory is listed through by its device and inode,
+    # the directories found in every directory listed, whether or not they
+    # are listed through that path, and the files found, shared by the
+    # threads of the walker
+    directory_paths = {}
+    directory_links = {}
+    file_ids = {}
+
+    def get_key(path):
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_dev, stat.st_ino
+
+    def add_directory(path, parent, name):
+        key = get_key(path)
+        if key is None:
+            return False
+        directory_links.setdefault(parent, []).append(
+            (name, key, os.path.islink(path)))
+        # setdefault is atomic, so only one thread lists the directory
+        return directory_paths.setdefault(key, path) == path
+
+    def add_file(path, parent):
+        key = get_key(path)
+        if key is None:
+            return False
+        file_ids[path] = key, os.path.islink(path), parent
+        return True
+
+    if follow_symlinks:
+        directory_paths[get_key(root)] = root
+
+    def scan(directory):
+        files, subdirs = [], []
+        listing = (snapshot.list_directory(directory, follow_symlinks)
+                   if snapshot is not None
+                   else list_directory(directory, with_sizes, follow_symlinks))
+        if listing is None:
+            return files, subdirs
+        file_entries, dir_names = listing
+
+        if (environment_detector is not None and directory != root and
+                environment_detector.match_entries(
+                    directory[prefix_length:],
+                    [name for name, _ in file_entries] + dir_names)):
+            return files, subdirs
+
+        for name in dir_names:
+            path = os.path.join(directory, name)
+            if (not is_dir_ignored(path, path[prefix_length:]) and
+                    not (follow_symlinks and
+                         not add_directory(path, directory, name))):
+                subdirs.append(path)
+        for name, size in file_entries:
+            path = os.path.join(directory, name)
+            if (not is_file_ignored(path, path[prefix_length:]) and
+                    not (follow_symlinks and not add_file(path, directory))):
+                files.append((path, size) if with_sizes else path)
+        return files, subdirs
+
+    def get_canonical_directories():
+        """
+        Chooses the canonical path of every directory listed among all the
+        paths it was found through: a path not going through a link if
+        there is one, else the one with the fewest components, else the
+        first one in sorted order. The choices are made from the root
+        down, like a shortest path search, as the paths of a directory
+        depend on the ones of its parents.
+
+        :return: A dict with the paths the directories were listed through
+                 as keys and tuples of their canonical path and whether it
+                 goes through a link as values.
+        """
+        canonical = {}
+        queue = [(False, 0, (), root)]
+        while queue:
+            linked, depth, names, directory = heapq.heappop(queue)
+            if directory in canonical:
+                continue
+            canonical[directory] = os.path.join(root, *names), linked
+            for name, key, is_link in directory_links.get(directory, ()):
+                subdir = directory_paths.get(key)
+                if subdir is not None and subdir not in canonical:
+                    heapq.heappush(queue, (linked or is_link, depth + 1,
+                                           names + (name,), subdir))
+        return canonical
+
+    def get_canonical_files(files):
+        """
+        Rewrites the paths of the files found while following links to the
+        canonical paths of their directories, and keeps one path of every
+        file found through several paths, chosen like the ones of the
+        directories.
+
+        :param files: The files found, tuples of the path and the size with
+                      ``with_sizes``.
+        :return:      A list of the files kept, in the order ``walk_files``
+                      yields them without following links.
+        """
+        directories = get_canonical_directories()
+        kept = {}
+        for file in files:
+            path, size = file if with_sizes else (file, None)
+            key, is_link, directory = file_ids[path]
+            directory, linked = directories[directory]
+            path = os.path.join(directory, os.path.basename(path))
+            names = path[prefix_length:].split(os.sep)
+            rank = linked or is_link, len(names), path
+            if key not in kept or rank < kept[key][0]:
+                kept[key] = rank, names, (path, size) if with_sizes else path
+        # Every directory lists its files before its subdirectories
+        return [file for _, _, file in sorted(
+            (tuple((1, name) for name in names[:-1]) + ((0, names[-1]),),
+             rank, file)
+            for rank, names, file in kept.values())]
+
+    return scan, file_ids, get_canonical_files
+
+
+def walk_files(root,
+               ignore_globs=(),
+               ignore_matcher=None,
+               with_sizes=False,
+               environment_detector=None,
+               snapshot=None,
+               follow_symlinks=False,
+               subtrees=None,
+               max_depth=None):
+    """
+    Walks ``root`` recursively using ``os.scandir`` and yields the path of
+    every file not matched by ``ignore_globs`` or ``ignore_matcher``.
+    Directories matched by a pruning glob (see ``get_pruning_globs``) or by
+    ``ignore_matcher`` are never listed.
+
+    The paths yielded are the same as the ones ``collect_files`` returns for
+    ``root/**`` with the same ignore globs, but sorted per directory.
+
+    :param root:           The directory to walk.
+    :param ignore_globs:   A list of absolute glob expressions matching the
+                           paths to ignore.
+    :param ignore_matcher: An ``IgnoreMatcher`` or ``IgnoreResolver`` object
+                           checked against the paths relative to ``root``.
+    :param with_sizes:     Whether to yield tuples of the path and the size
+                           of the files, taken from the directory entries.
+    :param environment_detector:
+        An ``EnvironmentDetector`` object recognizing the directories of
+        virtual environments and dependencies, which aren't walked.
+    :param snapshot:
+        A ``WalkSnapshot`` object the listings of the directories are taken
+        from, so only the directories changed since it was taken are
+        listed again.
+    :param follow_symlinks:
+        Whether to walk the directories and files symbolic links point to.
+        Every directory is only listed once and every file only yielded
+        once, even if several links point to it or to one of its parents,
+        through a path not going through a link if there is one, else the
+        shortest one. The paths are chosen once the whole directory is
+        walked, so the files are only yielded then. Otherwise links are
+        left out.
+    :param subtrees:
+        A list of directories relative to ``root`` to walk instead of the
+        whole directory. Only their parents are listed outside of them.
+    :param max_depth:
+        The maximum number of directory levels below ``root`` to walk.
+    :return:               A generator of absolute file paths.
+    """
+    root = os.path.normcase(root)
+    scan, file_ids, get_canonical_files = _get_scanner(
+        root, ignore_globs, ignore_matcher, with_sizes, environment_detector,
+        snapshot, follow_symlinks, subtrees, max_depth)
+
+    found = []
+    pending = [root]
+    while pending:
+        files, subdirs = scan(pending.pop())
+        if follow_symlinks:
+            found.extend(files)
+        else:
+            yield from files
+        # Reversed, so the directories are popped in sorted order
+        pending.extend(reversed(subdirs))
+    yield from get_canonical_files(found)
+
+
+def parallel_walk_files(root,
+                        ignore_globs=(),
+                        ignore_matcher=None,
+                        jobs=DEFAULT_WALK_JOBS,
+                        with_sizes=False,
+                        environment_detector=None,
+                        snapshot=None,
+                        follow_symlinks=False,
+                        subtrees=None,
+                        max_depth=None):
+    """
+    Walks ``root`` like ``walk_files``, but lists up to ``jobs`` directories
+    at the same time. This helps on file systems where every listing has a
+    high latency, like network file systems.
+
+    Every thread keeps its own queue of directories to list, taking the
+    most recently found directory from it. Threads running out of work
+    take the oldest directory from the queue of another thread, which
+    usually is the root of a large subtree.
+
+    The same paths as with ``walk_files`` are yielded in the same order,
+    once the whole directory has been listed.
+
+    :param root:           The directory to walk.
+    :param ignore_globs:   A list of absolute glob expressions matching the
+                           paths to ignore.
+    :param ignore_matcher: An ``IgnoreMatcher`` or ``IgnoreResolver`` object
+                           checked against the paths relative to ``root``.
+    :param jobs:           The maximum number of directories listed at the
+                           same time.
+    :param with_sizes:     Whether to yield tuples of the path and the size
+                           of the files, taken from the directory entries.
+    :param environment_detector:
+        An ``EnvironmentDetector`` object, see ``walk_files``.
+    :param snapshot:
+        A ``WalkSnapshot`` object, see ``walk_files``.
+    :param follow_symlinks:
+        Whether to follow symbolic links, see ``walk_files``.
+    :param subtrees:
+        A list of directories to walk, see ``walk_files``.
+    :param max_depth:
+        The maximum number of directory levels to walk.
+    :return:               A generator of absolute file paths.
+    """
+    root = os.path.normcase(root)
+    scan, file_ids, get_canonical_files = _get_scanner(
+        root, ignore_globs, ignore_matcher, with_sizes, environment_detector,
+        snapshot, follow_symlinks, subtrees, max_depth)
+
+    listings = {}
+    queues = [deque() for _ in range(max(jobs, 1))]
+    queues[0].append(root)
+    # The number of directories queued or being listed, and the exceptions
+    # raised by the threads
+    state = {"pending": 1, "errors": []}
+    work = threading.Condition()
+
+    def get_directory(queue):
+        try:
+            return queue.pop()
+        except IndexError:
+            pass
+        for other in queues:
+            try:
+                return other.popleft()
+            except IndexError:
+                pass
+        return None
+
+    def worker(queue):
+        while True:
+            directory = get_directory(queue)
+            if directory is None:
+                with work:
+                    while (state["pending"] and not state["errors"] and
+                           not any(queues)):
+                        work.wait()
+                    if not state["pending"] or state["errors"]:
+                        return
+                continue
+
+            try:
+                files, subdirs = scan(directory)
+            except BaseException as exception:
+                with work:
+                    state["errors"].append(exception)
+                    work.notify_all()
+                return
+
+            listings[directory] = files, subdirs
+            with work:
+                queue.extend(reversed(subdirs))
+                state["pending"] += len(subdirs) - 1
+                work.notify_all()
+
+    threads = [threading.Thread(target=worker, args=(queue,), daemon=True)
+               for queue in queues]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    if state["errors"]:
+        raise state["errors"][0]
+
+    found = []
+    pending = [root]
+    while pending:
+        files, subdirs = listings[pending.pop()]
+        found.extend(files)
+        pending.extend(reversed(subdirs))
+    if follow_symlinks:
+        found = get_canonical_files(found)
+    yield from found
+
+
+def sample_walk_files(root,
+                      ignore_globs=(),
+                      ignore_matcher=None,
+                      with_sizes=False,
+                      rng=None,
+                      environment_detector=None,
+                      snapshot=None,
+                      follow_symlinks=False,
+                      subtrees=None,
+                      max_depth=None,
+                      with_probabilities=False):
+    """
+    Draws random files of ``root``, filtered like ``walk_files``, so that
+    the files drawn first are a sample of the whole project with known
+    probabilities.
+
+    Every draw descends from ``root``: at every directory either its files
+    or one of its subdirectories is chosen, with equal probability, and a
+    file is chosen from the files at the end. The directories are listed
+    when they are first reached, and empty ones are left out of later
+    draws. The probability of a draw is the product of the probabilities
+    of its choices, so the draws can be weighted by their inverse to
+    estimate totals of the whole project, see ``ProjectIndex``. Directories
+    containing many files therefore can't dominate the sample, but files
+    in small directories are drawn more often.
+
+    Files are drawn with replacement. The draws stop once every directory
+    was listed and every file drawn.
+
+    :param root:            The directory to walk.
+    :param ignore_globs:    A list of absolute glob expressions matching the
+                            paths to ignore.
+    :param ignore_matcher:  An ``IgnoreMatcher`` or ``IgnoreResolver``
+                            object checked against the paths relative to
+                            ``root``.
+    :param with_sizes:      Whether to yield tuples of the path and the size
+                            of the files, taken from the directory entries.
+    :param rng:             The ``random.Random`` object to use.
+    :param environment_detector:
+        An ``EnvironmentDetector`` object, see ``walk_files``.
+    :param snapshot:
+        A ``WalkSnapshot`` object, see ``walk_files``.
+    :param follow_symlinks:
+        Whether to follow symbolic links, see ``walk_files``. As the files
+        are drawn before the walk is done, the path listed first is kept of
+        the files found through several paths.
+    :param subtrees:
+        A list of directories to walk, see ``walk_files``.
+    :param max_depth:
+        The maximum number of directory levels to walk.
+    :param with_probabilities:
+        Whether to yield every draw as a tuple of the path, the size or
+        None without ``with_sizes``, and the probability of the draw.
+        Otherwise every file is yielded once, when it is first drawn.
+    :return:                A generator of absolute file paths.
+    """
+    root = os.path.normcase(root)
+    scan, file_ids, _ = _get_scanner(
+        root, ignore_globs, ignore_matcher, with_sizes, environment_detector,
+        snapshot, follow_symlinks, subtrees, max_depth)
+    rng = rng or random.Random()
+    found = set()
+
+    def is_new(file):
+        key, _, _ = file_ids[file[0] if with_sizes else file]
+        if key in found:
+            return False
+        found.add(key)
+        return True
+
+    # The files and the subdirectories not known to be empty of the
+    # directories listed
+    listings = {}
+    state = {"unlisted": 1, "files": 0}
+    drawn = set()
+    while state["unlisted"] or len(drawn) < state["files"]:
+        directory, parents, probability = root, [], 1.0
+        while True:
+            if directory not in listings:
+                files, subdirs = scan(directory)
+                if follow_symlinks:
+                    files = [file for file in files if is_new(file)]
+                listings[directory] = files, subdirs
+                state["unlisted"] += len(subdirs) - 1
+                state["files"] += len(files)
+            files, subdirs = listings[directory]
+
+            choices = len(subdirs) + bool(files)
+            if not choices:
+                if not parents:
+                    return
+                # An empty directory doesn't change the estimates, the
+                # draw is done again without it
+                while parents and not choices:
+                    parent = parents.pop()
+                    siblings = listings[parent][1]
+                    siblings.remove(directory)
+                    directory = parent
+                    choices = len(siblings) + bool(listings[parent][0])
+                break
+
+            choice = rng.randrange(choices)
+            probability /= choices
+            if choice < len(subdirs):
+                parents.append(directory)
+                directory = subdirs[choice]
+                continue
+
+            file = files[rng.randrange(len(files))]
+            probability /= len(files)
+            path, size = file if with_sizes else (file, None)
+            if with_probabilities:
+                yield path, size, probability
+            elif path not in drawn:
+                yield file
+            drawn.add(path)
+            break
+
+
+def filter_files(root,
+                 relpaths,
+                 ignore_globs=(),
+                 ignore_matcher=None,
+                 with_sizes=False,
+                 environment_detector=None,
+                 subtrees=None,
+                 max_depth=None):
+    """
+    Filters a list of known files the same way ``walk_files`` filters the
+    files it finds, without accessing the file system. The result for every
+    directory is cached, so the parents of a file are only checked once.
+    Environment directories are recognized by their path, and by the
+    marker entries among the paths, see ``get_marker_entries``. All paths
+    are read before the first file is yielded then.
+
+    :param root:           The directory the paths are relative to.
+    :param relpaths:       An iterable of ``/`` separated relative paths.
+    :param ignore_globs:   A list of absolute glob expressions matching the
+                           paths to ignore.
+    :param ignore_matcher: An ``IgnoreMatcher`` or ``IgnoreResolver`` object
+                           checked against the paths relative to ``root``.
+    :param with_sizes:     Whether ``relpaths`` contains tuples of the path
+                           and the size of the files, which are yielded with
+                           the absolute path instead of the relative one.
+    :param environment_detector:
+        An ``EnvironmentDetector`` object, see ``walk_files``.
+    :param subtrees:
+        A list of directories the files need to be in, see ``walk_files``.
+    :param max_depth:
+        The maximum number of directory levels the files can be below
+        ``root``.
+    :return:               A generator of absolute file paths.
+    """
+    root = os.path.normcase(root)
+    is_dir_ignored, is_file_ignored = _get_ignore_checks(
+        root, list(ignore_globs), ignore_matcher, environment_detector,
+        subtrees, max_depth)
+    ignored_dirs = {"": False}
+    marker_entries = {}
+    if environment_detector is not None:
+        relpaths = list(relpaths)
+        marker_entries = get_marker_entries(
+            relpath[0] if with_sizes else relpath for relpath in relpaths)
+
+    def is_parent_ignored(reldir):
+        try:
+            return ignored_dirs[reldir]
+        except KeyError:
+            parent = reldir.rpartition("/")[0]
+            relpath = reldir.replace("/", os.sep)
+            ignored = (is_parent_ignored(parent) or
+                       is_dir_ignored(os.path.join(root, relpath), relpath) or
+                       (reldir in marker_entries and
+                        environment_detector.match_entries(
+                            relpath, marker_entries[reldir])))
+            ignored_dirs[reldir] = ignored
+            return ignored
+
+    for relpath in relpaths:
+        if with_sizes:
+            relpath, size = relpath
+        if is_parent_ignored(relpath.rpartition("/")[0]):
+            continue
+        relpath = relpath.replace("/", os.sep)
+        path = os.path.join(root, relpath)
+        if not is_file_ignored(path, relpath):
+            yield (path, size) if with_sizes else path
@@ -0,0 +1,192 @@
+import fnmatch
+import os
+import re
+
+from coalib.parsing.Globbing import glob_escape
+from coala_quickstart.generation.ContentDetection import (
+    DEFAULT_BATCH_SIZE, map_batches)
+
+VENDORED = "vendored"
+GENERATED = "generated"
+MINIFIED = "minified"
+
+# Directories holding code copied from other projects
+VENDORED_DIRECTORIES = frozenset((
+    "vendor",
+    "vendors",
+    "third_party",
+    "third-party",
+    "thirdparty",
+    "bower_components",
+))
+
+# The names of files generated by tools, with the reason they are ignored
+GENERATED_FILE_PATTERNS = (
+    ("*.min.js", MINIFIED),
+    ("*-min.js", MINIFIED),
+    ("*.min.css", MINIFIED),
+    ("*.bundle.js", GENERATED),
+    ("*_pb2.py", GENERATED),
+    ("*_pb2_grpc.py", GENERATED),
+    ("*.pb.go", GENERATED),
+    ("*.pb.cc", GENERATED),
+    ("*.pb.h", GENERATED),
+    ("*.generated.*", GENERATED),
+)
+
+# The number of bytes read from the start of a file to classify it
+MAX_READ_SIZE = 4096
+# The number of lines at the start of a file searched for a marker
+HEADER_LINES = 20
+# A file is minified if its longest line and its average line length in the
+# bytes read are at least as long as these
+MINIFIED_LINE_LENGTH = 1000
+MINIFIED_AVERAGE_LENGTH = 200
+
+_GENERATED_MARKER = re.compile(
+    r"\bDO NOT EDIT\b|@generated\b|"
+    r"Generated by the protocol buffer compiler")
+_GENERATED_STATEMENT = re.compile(
+    r"this (?:file|code) (?:is|was|has been) "
+    r"(?:auto-?generated|automatically generated|generated)",
+    re.IGNORECASE)
+
+
+def is_generated(text):
+    """
+    Checks the header of a file for the markers left by code generators.
+
+    >>> is_generated("// Code generated by stringer. DO NOT EDIT.\\n")
+    True
+    >>> is_generated("# This file was automatically generated by Sphinx\\n")
+    True
+    >>> is_generated("def generate():\\n    pass\\n")
+    False
+
+    :param text: The start of the file.
+    :return:     True if one of the first ``HEADER_LINES`` lines contains a
+                 marker.
+    """
+    header = "\n".join(text.split("\n", HEADER_LINES)[:HEADER_LINES])
+    return bool(_GENERATED_MARKER.search(header) or
+                _GENERATED_STATEMENT.search(header))
+
+
+def is_minified(text):
+    """
+    Checks whether a file is minified by the length of its lines.
+
+    >>> is_minified("var a=1;" * 200)
+    True
+    >>> is_minified(("var a = 1;\\n" * 200) + "x" * 1000)
+    False
+
+    :param text: The start of the file.
+    :return:     True if the lines are very long on average and at least one
+                 of them is longer than ``MINIFIED_LINE_LENGTH``.
+    """
+    lines = text.split("\n")
+    return (max(len(line) for line in lines) >= MINIFIED_LINE_LENGTH and
+            len(text) / len(lines) >= MINIFIED_AVERAGE_LENGTH)
+
+
+def classify_content(data):
+    """
+    Classifies a file by the start of its contents.
+
+    :param data: The first bytes of the file.
+    :return:     ``GENERATED``, ``MINIFIED`` or None for other files.
+    """
+    text = data.decode("latin-1")
+    if is_generated(text):
+        return GENERATED
+    if is_minified(text):
+        return MINIFIED
+    return None
+
+
+class GeneratedFileClassifier:
+    """
+    Finds the files of a project which aren't written by its authors:
+    vendored code, files generated by tools and minified files. Such files
+    shouldn't count for the languages of the project, and shouldn't be
+    linted.
+
+    Vendored directories and the names of generated files are recognized by
+    their path alone. The contents of other files are classified by reading
+    at most ``MAX_READ_SIZE`` bytes from their start.
+
+    >>> classifier = GeneratedFileClassifier("/repo")
+    >>> classifier.classify_path("/repo/lib/vendor/six.py")
+    ('/repo/lib/vendor/**', 'vendored')
+    >>> classifier.classify_path("/repo/static/jquery.min.js")
+    ('/repo/**.min.js', 'minified')
+    >>> classifier.classify_path("/repo/src/vendor.py")
+    """
+
+    def __init__(self, root, jobs=None, batch_size=DEFAULT_BATCH_SIZE):
+        """
+        :param root:       The project directory, the paths below it are
+                           classified relative to it.
+        :param jobs:       The number of threads reading files, by default
+                           the number of CPUs.
+        :param batch_size: The number of files handled by a thread at once.
+        """
+        self.root = root
+        self.prefix = os.path.join(root, "")
+        self.escaped_root = glob_escape(root)
+        self.jobs = jobs or os.cpu_count() or 1
+        self.batch_size = batch_size
+        self.patterns = [(re.compile(fnmatch.translate(pattern)).match,
+                          pattern, reason)
+                         for pattern, reason in GENERATED_FILE_PATTERNS]
+
+    def classify_path(self, path):
+        """
+        Classifies a file by its path, without accessing it.
+
+        :param path: The path of a file below the project directory.
+        :return:     A tuple of an absolute glob matching the file, and the
+                     files like it, and the reason, or None if the path
+                     doesn't tell.
+        """
+        relpath = (path[len(self.prefix):] if path.startswith(self.prefix)
+                   else path)
+        components = relpath.split(os.sep)
+        for index, component in enumerate(components[:-1]):
+            if component in VENDORED_DIRECTORIES:
+                parts = [glob_escape(part)
+                         for part in components[:index + 1]] + ["**"]
+                return os.path.join(self.escaped_root, *parts), VENDORED
+
+        for match, pattern, reason in self.patterns:
+            if match(components[-1]):
+                # The leading * of the patterns becomes **, so files in all
+                # directories are matched
+                return os.path.join(self.escaped_root, "*" + pattern), reason
+        return None
+
+    def classify(self, path):
+        """
+        Classifies a file by its contents.
+
+        :param path: The path of the file.
+        :return:     ``GENERATED``, ``MINIFIED`` or None for other files and
+                     files that can't be read.
+        """
+        try:
+            with open(path, "rb") as file:
+                data = file.read(MAX_READ_SIZE)
+        except OSError:
+            return None
+        return classify_content(data) if data else None
+
+    def classify_all(self, paths):
+        """
+        Classifies files by their contents in batches on a thread pool.
+
+        :param paths: A list of file paths.
+        :return:      A list of the reasons, None for files that aren't
+                      generated or minified.
+        """
+        return map_batches(self.classify, paths, self.jobs, self.batch_size)
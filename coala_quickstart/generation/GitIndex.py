@@ -0,0 +1,171 @@
+import os
+import stat
+import struct
+from collections import namedtuple
+
+IndexEntry = namedtuple("IndexEntry", "path mode size mtime")
+
+SUPPORTED_VERSIONS = (2, 3, 4)
+
+_HEADER = struct.Struct(">4sII")
+# ctime, ctime nsec, mtime, mtime nsec, dev, ino, mode, uid, gid, size,
+# object name and flags
+_ENTRY = struct.Struct(">IIIIIIIIII20sH")
+_EXTENDED_FLAGS = struct.Struct(">H")
+_EXTENSION = struct.Struct(">4sI")
+
+_EXTENDED_FLAG = 0x4000
+_STAGE_MASK = 0x3000
+_SKIP_WORKTREE_FLAG = 0x4000
+_CHECKSUM_SIZE = 20
+_GITLINK_MODE = 0o160000
+
+
+def _read_offset(data, offset):
+    """
+    Reads a variable length integer as used for the path prefix lengths of
+    version 4 indexes.
+
+    >>> _read_offset(bytes([0x05]), 0)
+    (5, 1)
+    >>> _read_offset(bytes([0x80, 0x00]), 0)
+    (128, 2)
+
+    :param data:   The index data.
+    :param offset: The position of the integer.
+    :return:       A tuple of the integer and the position after it.
+    """
+    byte = data[offset]
+    offset += 1
+    value = byte & 0x7f
+    while byte & 0x80:
+        byte = data[offset]
+        offset += 1
+        value = ((value + 1) << 7) | (byte & 0x7f)
+    return value, offset
+
+
+def parse_git_index(data):
+    """
+    Parses the contents of a git index file of version 2, 3 or 4.
+
+    Entries of submodules, sparse directories and files marked as
+    skip-worktree are left out, as they are not files in the work tree.
+    Conflicting files are listed once.
+
+    :param data: The contents of the index file as ``bytes``.
+    :return:     A list of ``IndexEntry`` tuples with ``/`` separated paths
+                 relative to the work tree.
+    :raises ValueError:
+        If the data is not a git index or uses an unsupported version or
+        extension.
+    """
+    try:
+        signature, version, count = _HEADER.unpack_from(data, 0)
+    except struct.error:
+        raise ValueError("The git index is truncated.")
+    if signature != b"DIRC":
+        raise ValueError("The file is not a git index.")
+    if version not in SUPPORTED_VERSIONS:
+        raise ValueError("Git index version {} is not supported."
+                         .format(version))
+
+    entries = []
+    offset = _HEADER.size
+    previous_name = b""
+    try:
+        for _ in range(count):
+            entry_start = offset
+            fields = _ENTRY.unpack_from(data, offset)
+            mtime, mtime_nsec, mode, size, flags = (
+                fields[2], fields[3], fields[6], fields[9], fields[11])
+            offset += _ENTRY.size
+
+            extended_flags = 0
+            if version >= 3 and flags & _EXTENDED_FLAG:
+                extended_flags, = _EXTENDED_FLAGS.unpack_from(data, offset)
+                offset += _EXTENDED_FLAGS.size
+
+            if version == 4:
+                # The path is stored as the number of bytes to remove from
+                # the previous path, followed by the new suffix.
+                strip_length, offset = _read_offset(data, offset)
+                end = data.index(b"\0", offset)
+                name = (previous_name[:len(previous_name) - strip_length] +
+                        data[offset:end])
+                offset = end + 1
+            else:
+                end = data.index(b"\0", offset)
+                name = data[offset:end]
+                # Entries are padded with 1 to 8 NUL bytes to a multiple of 8
+                offset = entry_start + ((end - entry_start + 8) & ~7)
+
+            if (name == previous_name and flags & _STAGE_MASK or
+                    extended_flags & _SKIP_WORKTREE_FLAG or
+                    mode == _GITLINK_MODE or stat.S_ISDIR(mode)):
+                previous_name = name
+                continue
+            previous_name = name
+
+            entries.append(IndexEntry(
+                name.decode("utf-8", "surrogateescape"),
+                mode,
+                size,
+                mtime + mtime_nsec / 1e9))
+
+        while offset + _EXTENSION.size <= len(data) - _CHECKSUM_SIZE:
+            signature, extension_size = _EXTENSION.unpack_from(data, offset)
+            if signature == b"link":
+                # The entries are spread over a shared index file
+                raise ValueError("Split git indexes are not supported.")
+            offset += _EXTENSION.size + extension_size
+    except (struct.error, IndexError):
+        raise ValueError("The git index is truncated.")
+
+    return entries
+
+
+def get_git_dir(project_dir):
+    """
+    Finds the git directory of a project whose root is a git work tree.
+
+    :param project_dir: The project directory.
+    :return:            The path to the git directory, or None if
+                        ``project_dir`` is not the root of a work tree.
+    """
+    dot_git = os.path.join(project_dir, ".git")
+    if os.path.isdir(dot_git):
+        return dot_git
+
+    # Linked work trees and submodules use a file pointing to the git dir
+    try:
+        with open(dot_git, "r") as file:
+            content = file.read().strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+    if not content.startswith("gitdir:"):
+        return None
+    git_dir = os.path.join(project_dir, content[len("gitdir:"):].strip())
+    return git_dir if os.path.isdir(git_dir) else None
+
+
+def get_tracked_files(project_dir):
+    """
+    Lists the files tracked by git by reading the index of the work tree,
+    without walking the project directory.
+
+    :param project_dir: The project directory.
+    :return:            A list of ``IndexEntry`` tuples with ``/`` separated
+                        paths relative to ``project_dir``, or None if
+                        ``project_dir`` is not the root of a git work tree or
+                        its index can't be read.
+    """
+    git_dir = get_git_dir(project_dir)
+    if git_dir is None:
+        return None
+
+    try:
+        with open(os.path.join(git_dir, "index"), "rb") as file:
+            return parse_git_index(file.read())
+    except (OSError, ValueError):
+        return None
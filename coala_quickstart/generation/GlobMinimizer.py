@@ -0,0 +1,528 @@
+import os
+import re
+from collections import OrderedDict, defaultdict
+
+from coalib.parsing.Globbing import _iter_alternatives, glob_escape
+
+# Placeholders for the wildcards of a glob tested for being covered by
+# another glob, see ``covers``.
+_ANY = "\x01"
+_STAR = "\x02"
+_CHAR = "\x03"
+
+_LITERAL = r"[^*?\[\]()|]+"
+_LITERAL_COMPONENT = re.compile("^" + _LITERAL + "$")
+_LITERAL_ALTERNATIVES = re.compile(
+    r"^\((" + _LITERAL + r"(\|" + _LITERAL + r")+)\)$")
+
+# The cost of an additional glob in the ``files`` setting, in the number of
+# directory entries coala could list instead when collecting the files.
+DEFAULT_GLOB_COST = 20
+
+
+def _placeholder_string(glob):
+    return glob.replace("**", _ANY).replace("*", _STAR).replace("?", _CHAR)
+
+
+def _placeholder_regex(glob):
+    regex = ""
+    index, length = 0, len(glob)
+    while index < length:
+        char = glob[index]
+        index += 1
+        if char == "*":
+            if index < length and glob[index] == "*":
+                index += 1
+                regex += ".*"
+            else:
+                # A ``*`` can stand in for a ``*`` of the other glob, but not
+                # for a ``**`` or ``?``, which may match a separator.
+                regex += "[^" + re.escape(os.sep) + _ANY + _CHAR + "]*"
+        elif char == "?":
+            regex += "[^" + _ANY + _STAR + "]"
+        else:
+            regex += re.escape(char)
+    return re.compile("(?s)" + regex + "\\Z")
+
+
+def covers(glob, other):
+    """
+    Checks whether every path matched by ``other`` is matched by ``glob``.
+
+    The check is done by matching ``glob`` against the text of ``other``,
+    where the wildcards of ``other`` may only be matched by wildcards of
+    ``glob`` at least as permissive. Globs containing character sets are
+    never considered covered.
+
+    >>> covers("**.pyc", "src/**/*.pyc")
+    True
+    >>> covers("src/*", "src/**")
+    False
+    >>> covers("(build|dist)/**", "dist/main.c")
+    True
+
+    :param glob:  A glob expression.
+    :param other: Another glob expression.
+    :return:      True if ``glob`` is known to cover ``other``.
+    """
+    text = _get_text(other)
+    return text is not None and any(
+        regex.match(text) for regex, _ in _get_patterns(glob))
+
+
+def _get_text(glob):
+    """
+    :return: The text a glob is matched as by ``covers``, or None if it is
+             never covered.
+    """
+    if any(char in glob for char in "[]()|"):
+        return None
+    return _placeholder_string(glob)
+
+
+def _get_extension(component):
+    index = component.rfind(".")
+    return component[index:] if index != -1 else None
+
+
+def _get_text_keys(text):
+    """
+    :return: The keys of the text of a glob for ``_get_pattern_keys``: its
+             path components and the extension of the last one.
+    """
+    components = text.split(os.sep)
+    keys = {("component", component) for component in components}
+    extension = _get_extension(components[-1])
+    if extension is not None:
+        keys.add(("extension", extension))
+    return keys
+
+
+def _get_pattern_keys(pattern):
+    """
+    :return: The keys every text matched by an alternative of a glob has:
+             its components without wildcards and the extension it ends
+             with, if any.
+    """
+    components = pattern.split(os.sep)
+    keys = {("component", component) for component in components
+            if not any(char in component for char in "*?")}
+    last = components[-1]
+    tail = last[max(last.rfind("*"), last.rfind("?")) + 1:]
+    extension = _get_extension(tail)
+    if extension is not None:
+        keys.add(("extension", extension))
+    return keys
+
+
+def _get_patterns(glob):
+    """
+    :return: A list of the compiled alternatives of a glob which can cover
+             other globs, with their keys.
+    """
+    return [(_placeholder_regex(pattern), _get_pattern_keys(pattern))
+            for pattern in _iter_alternatives(glob)
+            if "[" not in pattern]
+
+
+def _split_components(glob):
+    """
+    Splits a glob at the separators outside of alternatives.
+    """
+    components = [""]
+    depth = 0
+    for char in glob:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == os.sep and depth == 0:
+            components.append("")
+        else:
+            components[-1] += char
+    return components
+
+
+def _literal_choices(component):
+    if _LITERAL_COMPONENT.match(component):
+        return (component,)
+    match = _LITERAL_ALTERNATIVES.match(component)
+    if match:
+        return tuple(match.group(1).split("|"))
+    return None
+
+
+def _get_covering(globs, texts):
+    """
+    Finds the globs covering the texts of other globs.
+
+    :param globs: A list of glob expressions.
+    :param texts: A dict with indices as keys and the texts of globs, as
+                  returned by ``_get_text``, as values.
+    :return:      A dict with the indices of the texts as keys and the sets
+                  of the indices of the globs covering them as values.
+    """
+    # The texts are indexed by their keys, so every pattern is only
+    # matched against the texts having all of its keys. Alternatives
+    # without wildcards only cover the same text and are looked up.
+    indices_by_key = defaultdict(set)
+    indices_by_text = defaultdict(list)
+    for index, text in texts.items():
+        indices_by_text[text].append(index)
+        for key in _get_text_keys(text):
+            indices_by_key[key].add(index)
+
+    covering = defaultdict(set)
+    for index, glob in enumerate(globs):
+        for pattern in _iter_alternatives(glob):
+            if "[" in pattern:
+                continue
+            if not any(char in pattern for char in "*?"):
+                for text_index in indices_by_text.get(pattern, ()):
+                    covering[text_index].add(index)
+                continue
+            regex = _placeholder_regex(pattern)
+            keys = _get_pattern_keys(pattern)
+            candidates = (min((indices_by_key[key] for key in keys), key=len)
+                          if keys else texts)
+            for text_index in candidates:
+                if regex.match(texts[text_index]):
+                    covering[text_index].add(index)
+    return covering
+
+
+def covers_all(globs, others):
+    """
+    Checks whether every path matched by the ``others`` is matched by the
+    ``globs``. Every alternative of the ``others`` must be an alternative
+    of the ``globs`` or be covered by one of them, see ``covers``.
+
+    >>> covers_all(["(build|dist)/**", "**.pyc"], ["dist/**", "src/*.pyc"])
+    True
+    >>> covers_all(["(build|dist)/**"], ["(dist|docs)/**"])
+    False
+
+    :param globs:  A list of glob expressions.
+    :param others: Another list of glob expressions.
+    :return:       True if the ``globs`` are known to cover the ``others``.
+    """
+    alternatives = set(alternative for glob in globs
+                       for alternative in _iter_alternatives(glob))
+    texts = {}
+    for other in others:
+        for alternative in _iter_alternatives(other):
+            if alternative not in alternatives:
+                text = _get_text(alternative)
+                if text is None:
+                    return False
+                texts[len(texts)] = text
+
+    if not texts:
+        return True
+    covering = _get_covering(globs, texts)
+    return all(covering[index] for index in texts)
+
+
+def remove_covered_globs(globs):
+    """
+    Removes the globs covered by another glob of the list. Of globs
+    covering each other only the first one is kept.
+
+    >>> remove_covered_globs(["src/*.pyc", "**.pyc", "**/*.pyc", "build"])
+    ['**.pyc', 'build']
+
+    :param globs: A list of glob expressions.
+    :return:      A list of glob expressions matching the same paths.
+    """
+    globs = list(OrderedDict.fromkeys(globs))
+
+    texts = {}
+    for index, glob in enumerate(globs):
+        text = _get_text(glob)
+        if text is not None:
+            texts[index] = text
+
+    covering = _get_covering(globs, texts)
+    for index in texts:
+        covering[index].discard(index)
+
+    return [glob for index, glob in enumerate(globs)
+            if not any(index not in covering[other_index] or
+                       other_index < index
+                       for other_index in covering[index])]
+
+
+def _get_sibling_groups(globs):
+    """
+    :return: An ``OrderedDict`` with the keys of the groups of globs
+             differing only in one literal path component as keys and
+             lists of tuples of the globs and their choices for that
+             component as values.
+    """
+    groups = OrderedDict()
+    for glob in globs:
+        components = _split_components(glob)
+        for index, component in enumerate(components):
+            choices = _literal_choices(component)
+            if choices is not None:
+                key = (index,
+                       tuple(components[:index]),
+                       tuple(components[index + 1:]))
+                groups.setdefault(key, []).append((glob, choices))
+    return groups
+
+
+def merge_sibling_globs(globs):
+    """
+    Merges globs differing only in one literal path component into
+    alternatives.
+
+    The groups of siblings are built once per round and every glob is
+    merged within the largest group it belongs to. The merged globs are
+    merged again in the next round, until no group is left.
+
+    >>> merge_sibling_globs(["**/build/**", "**/dist/**", "*.pyc"])
+    ['**/(build|dist)/**', '*.pyc']
+
+    :param globs: A list of glob expressions.
+    :return:      A list of glob expressions matching the same paths.
+    """
+    globs = list(OrderedDict.fromkeys(globs))
+    while True:
+        groups = _get_sibling_groups(globs)
+
+        # Larger groups are preferred, then the group found first
+        rank = {key: (-len(group), position)
+                for position, (key, group) in enumerate(groups.items())}
+        chosen = {}
+        for key, group in groups.items():
+            for glob, _ in group:
+                if glob not in chosen or rank[key] < rank[chosen[glob]]:
+                    chosen[glob] = key
+
+        merged = {}
+        for key, group in groups.items():
+            choices = [glob_choices for glob, glob_choices in group
+                       if chosen[glob] == key]
+            if len(choices) >= 2:
+                index, prefix, suffix = key
+                choices = sorted(set(choice for glob_choices in choices
+                                     for choice in glob_choices))
+                merged[key] = os.sep.join(
+                    prefix + ("(" + "|".join(choices) + ")",) + suffix)
+        if not merged:
+            return globs
+
+        # The merged globs take the place of their first glob
+        globs = list(OrderedDict.fromkeys(
+            merged.get(chosen.get(glob), glob) for glob in globs))
+
+
+def merge_optional_parts(globs):
+    """
+    Merges pairs of globs where one glob is the other one with a leading
+    ``**/`` or a trailing ``/**``, as ``.gitignore`` entries are expanded to
+    such pairs.
+
+    >>> merge_optional_parts(["**/build/**", "**/build", "build", "build/**"])
+    ['(**/|)build(/**|)']
+
+    :param globs: A list of glob expressions.
+    :return:      A list of glob expressions matching the same paths.
+    """
+    any_prefix = "**" + os.sep
+    any_suffix = os.sep + "**"
+
+    def strip_suffix(glob):
+        return glob[:-len(any_suffix)] if glob.endswith(any_suffix) else None
+
+    def strip_prefix(glob):
+        return glob[len(any_prefix):] if glob.startswith(any_prefix) else None
+
+    globs = list(OrderedDict.fromkeys(globs))
+    for strip, combine in (
+            (strip_suffix, lambda short: short + "(" + any_suffix + "|)"),
+            (strip_prefix, lambda short: "(" + any_prefix + "|)" + short)):
+        globs_set = set(globs)
+        pairs = OrderedDict((glob, strip(glob)) for glob in globs
+                            if strip(glob) in globs_set)
+        shorts = set(pairs.values())
+        globs = list(OrderedDict.fromkeys(
+            combine(pairs[glob]) if glob in pairs else glob
+            for glob in globs
+            if glob in pairs or glob not in shorts))
+
+    return globs
+
+
+def minimize_globs(globs):
+    """
+    Computes a smaller list of globs matching the same paths: duplicates
+    and globs covered by broader ones are removed, and the rest is merged
+    into alternatives. The minimized globs are checked to cover the
+    original ones and the other way round with ``covers_all``, and the
+    original globs without duplicates are returned otherwise.
+
+    >>> minimize_globs([
+    ...     '**/build/**', '**/build', 'build', 'build/**',
+    ...     '**/dist/**', '**/dist', 'dist', 'dist/**',
+    ...     '**/*.pyc', '*.pyc', '**.pyc'])
+    ['(**/|)(build|dist)(/**|)', '**.pyc']
+
+    :param globs: A list of glob expressions.
+    :return:      A list of glob expressions.
+    """
+    globs = list(OrderedDict.fromkeys(globs))
+    minimized = remove_covered_globs(globs)
+    minimized = merge_sibling_globs(minimized)
+    minimized = merge_optional_parts(minimized)
+    minimized = merge_sibling_globs(minimized)
+
+    if not (covers_all(minimized, globs) and covers_all(globs, minimized)):
+        return globs
+    return minimized
+
+
+def _parent(path):
+    index = path.rfind(os.sep)
+    return path[:index] if index != -1 else ""
+
+
+def _ancestors(directory):
+    while directory:
+        yield directory
+        directory = _parent(directory)
+    yield ""
+
+
+def count_project_files(project_files):
+    """
+    Counts the files below and directly inside every directory of a
+    project, for ``get_rooted_file_globs``.
+
+    >>> scope, direct_count = count_project_files(["a.py", "src/b.py"])
+    >>> scope["src"], scope[""], direct_count[""]
+    (1, 2, 1)
+
+    :param project_files: All files of the project, relative to the
+                          project directory.
+    :return:              A tuple of two dicts with the directories as keys
+                          and the number of files below them and directly
+                          inside them as values.
+    """
+    scope = defaultdict(int)
+    direct_count = defaultdict(int)
+    for path in project_files:
+        directory = _parent(path)
+        direct_count[directory] += 1
+        for ancestor in _ancestors(directory):
+            scope[ancestor] += 1
+    return dict(scope), dict(direct_count)
+
+
+def get_rooted_file_globs(file_paths,
+                          project_files,
+                          extensions,
+                          glob_cost=DEFAULT_GLOB_COST,
+                          excluded_files=(),
+                          excluded_dirs=(),
+                          project_counts=None):
+    """
+    Computes globs for the ``files`` setting of a section that match the
+    given files, rooted at the directories containing them instead of the
+    project directory, so coala only walks these directories to collect
+    them.
+
+    Every directory either gets a recursive glob like ``src/**.py``, or
+    a glob like ``src/*.py`` for the files directly inside it and its
+    subdirectories are handled separately. The choice minimizes the
+    number of project files below the roots plus ``glob_cost`` for every
+    glob.
+
+    >>> project_files = ["setup.cfg", "src/a.py", "src/b/c.py",
+    ...                  "tests/d.py"] + ["docs/%d.rst" % i for i in range(50)]
+    >>> get_rooted_file_globs(["src/a.py", "src/b/c.py", "tests/d.py"],
+    ...                       project_files, [".py"])
+    ['src/**.py', 'tests/**.py']
+    >>> get_rooted_file_globs(["src/a.py", "src/b/c.py", "tests/d.py"],
+    ...                       project_files, [".py"], glob_cost=100)
+    ['**.py']
+    >>> get_rooted_file_globs(["src/a.py", "src/b/c.py", "tests/d.py"],
+    ...                       project_files, [".py"], glob_cost=100,
+    ...                       excluded_files=["src/lib/e.py"])
+    ['src/*.py', 'src/b/**.py', 'tests/**.py']
+
+    :param file_paths:    The files to match, relative to the project
+                          directory.
+    :param project_files: All files of the project, relative to the
+                          project directory.
+    :param extensions:    The extensions of the files to match.
+    :param glob_cost:     The cost of an additional glob.
+    :param excluded_files:
+        Files of the project that must not be matched, relative to the
+        project directory. The directories containing them only get
+        recursive globs if none of them has one of the extensions. They
+        must not be directly inside a directory containing files to match.
+    :param excluded_dirs:
+        Directories relative to the project directory whose files must not
+        be matched. Neither they nor their parents get recursive globs.
+    :param project_counts:
+        The counts of the ``project_files`` as returned by
+        ``count_project_files``, to reuse them for several calls. The
+        ``project_files`` aren't used then.
+    :return:              A sorted list of glob expressions relative to the
+                          project directory.
+    """
+    extensions = sorted(set(extensions))
+    if not extensions:
+        return []
+
+    scope, direct_count = (project_counts if project_counts is not None
+                           else count_project_files(project_files))
+
+    children = defaultdict(set)
+    direct_files = set()
+    for path in file_paths:
+        directory = _parent(path)
+        direct_files.add(directory)
+        while directory:
+            children[_parent(directory)].add(directory)
+            directory = _parent(directory)
+    if not direct_files:
+        return []
+
+    # Recursive globs can't be rooted above the excluded files
+    blocked = set()
+    for path in excluded_files:
+        if path.endswith(tuple(extensions)):
+            blocked.update(_ancestors(_parent(path)))
+    for directory in excluded_dirs:
+        blocked.update(_ancestors(directory))
+
+    glob_cost *= len(extensions)
+    # Directories are visited from the deepest one, so the costs of all
+    # subdirectories are known.
+    directories = sorted(set(children) | direct_files,
+                         key=lambda directory: -directory.count(os.sep) -
+                         bool(directory))
+    best = {}
+    for directory in directories:
+        recursive = (float("inf"), []) if directory in blocked else (
+            max(scope.get(directory, 0), directory in direct_files) +
+            glob_cost, [(directory, True)])
+        cost, roots = 0, []
+        if directory in direct_files:
+            cost, roots = direct_count.get(directory, 0) + glob_cost, [
+                (directory, False)]
+        for child in sorted(children[directory]):
+            child_cost, child_roots = best[child]
+            cost += child_cost
+            roots = roots + child_roots
+        best[directory] = min(recursive, (cost, roots),
+                              key=lambda option: (option[0], len(option[1])))
+
+    return sorted(
+        (glob_escape(directory) + os.sep if directory else "") +
+        ("**" if recursive else "*") + glob_escape(extension)
+        for directory, recursive in best[""][1]
+        for extension in extensions)
@@ -0,0 +1,449 @@
+import os
+import re
+
+from coalib.parsing.Globbing import _iter_alternatives, translate
+
+# Key used in the path trie to mark the end of an anchored pattern
+_TERMINAL = None
+
+
+def _split_path(relpath):
+    return relpath.replace(os.sep, "/").strip("/").split("/")
+
+
+def is_literal_pattern(pattern):
+    """
+    Checks whether a ``.gitignore`` pattern contains no wildcards or escapes,
+    so it can be matched by plain string comparison.
+
+    >>> is_literal_pattern("build/main.c")
+    True
+    >>> is_literal_pattern("*.pyc")
+    False
+    >>> is_literal_pattern("file\\\\?")
+    False
+
+    :param pattern: A pattern from a ``.gitignore`` file.
+    :return:        True if the pattern contains no special characters.
+    """
+    return not any(char in pattern for char in "*?[\\")
+
+
+def translate_gitignore_pattern(pattern):
+    """
+    Translates a ``.gitignore`` pattern to a regular expression matching
+    ``/`` separated paths relative to the directory of the ``.gitignore``.
+
+    >>> translate_gitignore_pattern("*.py")
+    '[^/]*\\\\.py'
+    >>> translate_gitignore_pattern("**/docs/**")
+    '(?:.*/)?docs/.*'
+
+    :param pattern: A pattern from a ``.gitignore`` file, without the
+                    leading slash, trailing slash and negation prefix.
+    :return:        The regular expression, without anchors.
+    """
+    regex = ""
+    index, length = 0, len(pattern)
+    while index < length:
+        char = pattern[index]
+        index += 1
+        if char == "*":
+            if index < length and pattern[index] == "*":
+                # ``**`` is special only as a whole path component, other
+                # consecutive asterisks are regular asterisks.
+                start = index - 1
+                index += 1
+                if ((start == 0 or pattern[start - 1] == "/") and
+                        (index == length or pattern[index] == "/")):
+                    if index == length:
+                        regex += ".*"
+                    else:
+                        regex += "(?:.*/)?"
+                        index += 1
+                    continue
+            regex += "[^/]*"
+        elif char == "?":
+            regex += "[^/]"
+        elif char == "[":
+            closing_index = pattern.find("]", index + 1)
+            if closing_index < 0:
+                regex += "\\["
+            else:
+                sequence = pattern[index:closing_index].replace("\\", "\\\\")
+                index = closing_index + 1
+                if sequence[0] in "!^":
+                    sequence = "^/" + sequence[1:]
+                regex += "[" + sequence + "]"
+        elif char == "/":
+            regex += "/"
+        elif char == "\\" and index < length:
+            regex += re.escape(pattern[index])
+            index += 1
+        else:
+            regex += re.escape(char)
+    return regex
+
+
+def compile_globs(globs):
+    """
+    Compiles a list of coala glob expressions into one regular expression,
+    so a path is tested against all of them with a single match.
+
+    >>> match = compile_globs(["/repo/**.pyc", "/repo/(build|dist)/**"])
+    >>> bool(match("/repo/src/main.pyc")), bool(match("/repo/dist/a.c"))
+    (True, True)
+    >>> bool(match("/repo/src/main.py"))
+    False
+
+    :param globs: A list of glob expressions.
+    :return:      The ``match`` method of the compiled regular expression,
+                  or None if there are no globs.
+    """
+    regexes = ["(?:" + translate(os.path.normcase(os.path.expanduser(pat)))
+               .replace("(?ms)", "") + ")"
+               for glob in globs
+               for pat in _iter_alternatives(glob)]
+    if not regexes:
+        return None
+    return re.compile("(?ms)" + "|".join(regexes)).match
+
+
+class IgnoreMatcher:
+    """
+    The compiled form of the patterns of a ``.gitignore`` file.
+
+    Instead of testing a path against every pattern, the patterns are
+    sorted into three structures, each answering in roughly constant
+    time:
+
+    - Literal names (``__pycache__``, ``build/``) are kept in a dict and
+      looked up by the base name of the path.
+    - Anchored literal paths (``/docs/build``) are kept in a prefix trie
+      keyed by path components.
+    - Patterns with wildcards are merged into one regular expression for
+      base names and one for relative paths.
+
+    Every structure remembers the position of the patterns it holds, so
+    like in git the last matching pattern decides whether a path is
+    ignored, and negated patterns (``!keep.pyc``) re-include paths.
+
+    >>> matcher = IgnoreMatcher(["build/", "/docs/_build", "*.pyc",
+    ...                          "!keep.pyc"])
+    >>> matcher.match("src/build", is_dir=True)
+    True
+    >>> matcher.match("src/build") is None
+    True
+    >>> matcher.match("docs/_build", is_dir=True)
+    True
+    >>> matcher.is_ignored("docs/_build/index.html")
+    True
+    >>> matcher.is_ignored("src/docs/_build/index.html")
+    False
+    >>> matcher.match("lib/module.pyc")
+    True
+    >>> matcher.match("lib/keep.pyc")
+    False
+    """
+
+    def __init__(self, lines=()):
+        """
+        :param lines: The lines of a ``.gitignore`` file.
+        """
+        self.negated = []
+        self.names = {}
+        self.dir_names = {}
+        self.trie = {}
+        name_regexes = []
+        dir_name_regexes = []
+        path_regexes = []
+        dir_path_regexes = []
+
+        for line in lines:
+            parsed = self.parse_line(line)
+            if parsed is None:
+                continue
+            pattern, negated = parsed
+
+            dir_only = pattern.endswith("/")
+            pattern = pattern.rstrip("/")
+            anchored = "/" in pattern
+            pattern = pattern.lstrip("/")
+            if pattern.startswith("**/") and "/" not in pattern[3:]:
+                # ``**/name`` matches ``name`` at any level
+                pattern = pattern[3:]
+                anchored = False
+            if not pattern:
+                continue
+
+            index = len(self.negated)
+            self.negated.append(negated)
+
+            if is_literal_pattern(pattern):
+                if anchored:
+                    node = self.trie
+                    for component in pattern.split("/"):
+                        node = node.setdefault(component, {})
+                    any_index, dir_index = node.get(_TERMINAL, (-1, -1))
+                    node[_TERMINAL] = ((any_index, index) if dir_only
+                                       else (index, dir_index))
+                else:
+                    (self.dir_names if dir_only else self.names)[pattern] = (
+                        index)
+            else:
+                regex = translate_gitignore_pattern(pattern)
+                if anchored:
+                    (dir_path_regexes if dir_only else path_regexes).append(
+                        (index, regex))
+                else:
+                    (dir_name_regexes if dir_only else name_regexes).append(
+                        (index, regex))
+
+        self.name_regex = self._merge(name_regexes)
+        self.dir_name_regex = self._merge(dir_name_regexes)
+        self.path_regex = self._merge(path_regexes)
+        self.dir_path_regex = self._merge(dir_path_regexes)
+
+    @classmethod
+    def from_file(cls, path):
+        """
+        Compiles the patterns of the given ``.gitignore`` file.
+
+        :param path: The path to the ``.gitignore`` file.
+        :return:     An ``IgnoreMatcher`` object.
+        """
+        with open(path, "r") as file:
+            return cls(file)
+
+    @staticmethod
+    def parse_line(line):
+        """
+        Strips comments and unescaped trailing whitespace from a line of a
+        ``.gitignore`` file.
+
+        >>> IgnoreMatcher.parse_line("# comment")
+        >>> IgnoreMatcher.parse_line("build/   \\n")
+        ('build/', False)
+        >>> IgnoreMatcher.parse_line("!important.log")
+        ('important.log', True)
+        >>> IgnoreMatcher.parse_line("\\\\!file")
+        ('!file', False)
+
+        :param line: A line from a ``.gitignore`` file.
+        :return:     A tuple of the pattern and whether it is negated, or
+                     None if the line holds no pattern.
+        """
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("#"):
+            return None
+
+        cur = len(line) - 1
+        while cur >= 0 and line[cur] == " " and line[cur - 1] != "\\":
+            cur -= 1
+        line = line[:cur + 1]
+
+        negated = line.startswith("!")
+        if negated or line.startswith("\\#") or line.startswith("\\!"):
+            line = line[1:]
+
+        return (line, negated) if line else None
+
+    @staticmethod
+    def _merge(regexes):
+        """
+        Merges the regular expressions of several patterns into one. The
+        alternatives are ordered from the last pattern to the first, so the
+        group matched is the one of the last matching pattern.
+
+        :param regexes: A list of tuples of pattern index and regex.
+        :return:        A tuple of the ``match`` method of the merged regex
+                        and a list mapping group numbers to pattern indices,
+                        or None if there are no regexes.
+        """
+        if not regexes:
+            return None
+        regexes = list(reversed(regexes))
+        merged = re.compile("(?s)(?:" + "|".join(
+            "(" + regex + ")" for _, regex in regexes) + ")\\Z")
+        return merged.match, [None] + [index for index, _ in regexes]
+
+    def last_match(self, relpath, is_dir=False):
+        """
+        Finds the last pattern matching the given path itself. The parent
+        directories of the path are not checked.
+
+        :param relpath: The path relative to the directory containing the
+                        ``.gitignore`` file.
+        :param is_dir:  Whether the path is a directory.
+        :return:        The index of the pattern, or -1 if none matches.
+        """
+        components = _split_path(relpath)
+        name = components[-1]
+
+        result = self.names.get(name, -1)
+        if is_dir:
+            result = max(result, self.dir_names.get(name, -1))
+
+        node = self.trie
+        for component in components:
+            node = node.get(component)
+            if node is None:
+                break
+        else:
+            any_index, dir_index = node.get(_TERMINAL, (-1, -1))
+            result = max(result, dir_index if is_dir else -1, any_index)
+
+        path = "/".join(components)
+        for merged, target, dir_only in (
+                (self.name_regex, name, False),
+                (self.path_regex, path, False),
+                (self.dir_name_regex, name, True),
+                (self.dir_path_regex, path, True)):
+            if merged is None or (dir_only and not is_dir):
+                continue
+            regex_match, group_indices = merged
+            match = regex_match(target)
+            if match:
+                result = max(result, group_indices[match.lastindex])
+
+        return result
+
+    def match(self, relpath, is_dir=False):
+        """
+        Checks whether the given path itself is matched by a pattern. The
+        parent directories of the path are not checked.
+
+        :param relpath: The path relative to the directory containing the
+                        ``.gitignore`` file.
+        :param is_dir:  Whether the path is a directory.
+        :return:        True if the path is ignored, False if it is
+                        re-included by a negated pattern and None if no
+                        pattern matches.
+        """
+        index = self.last_match(relpath, is_dir)
+        return None if index < 0 else not self.negated[index]
+
+    def is_ignored(self, relpath, is_dir=False):
+        """
+        Checks whether the given path or any of its parent directories is
+        ignored. Like in git, a path inside an ignored directory can not be
+        re-included.
+
+        :param relpath: The path relative to the directory containing the
+                        ``.gitignore`` file.
+        :param is_dir:  Whether the path is a directory.
+        :return:        True if the path is ignored.
+        """
+        return _is_ignored(self.match, relpath, is_dir)
+
+
+def _is_ignored(match, relpath, is_dir):
+    components = _split_path(relpath)
+    for index in range(1, len(components)):
+        if match("/".join(components[:index]), is_dir=True):
+            return True
+    return bool(match("/".join(components), is_dir))
+
+
+class IgnoreResolver:
+    """
+    Resolves whether paths of a project are ignored by git, considering the
+    ``.gitignore`` files of all directories and ``.git/info/exclude``.
+
+    The ``.gitignore`` of a directory is only read and compiled when a path
+    inside that directory is checked for the first time, which happens when
+    the walker enters it. The compiled ``IgnoreMatcher`` objects are cached
+    per directory.
+
+    Like in git, the patterns of a ``.gitignore`` in a deeper directory take
+    precedence over the ones of its parents, and every ``.gitignore`` takes
+    precedence over ``.git/info/exclude``.
+    """
+
+    def __init__(self, root, filename=".gitignore"):
+        """
+        :param root:     The root directory of the project.
+        :param filename: The name of the files holding ignore patterns.
+        """
+        self.root = root
+        self.filename = filename
+        self.matchers = {}
+        self.exclude_file = os.path.join(root, ".git", "info", "exclude")
+        self.exclude_matcher = self._load(self.exclude_file)
+
+    @staticmethod
+    def _load(path):
+        try:
+            return IgnoreMatcher.from_file(path)
+        except (OSError, UnicodeDecodeError):
+            return None
+
+    def get_matcher(self, reldir):
+        """
+        Returns the compiled patterns of the ignore file in a directory,
+        loading them the first time.
+
+        :param reldir: The ``/`` separated directory relative to the root
+                       of the project, ``""`` for the root itself.
+        :return:       An ``IgnoreMatcher`` object, or None if the directory
+                       has no ignore file.
+        """
+        try:
+            return self.matchers[reldir]
+        except KeyError:
+            matcher = self._load(os.path.join(
+                self.root, reldir.replace("/", os.sep), self.filename))
+            self.matchers[reldir] = matcher
+            return matcher
+
+    def match(self, relpath, is_dir=False):
+        """
+        Checks whether the given path itself is ignored. The parent
+        directories of the path are not checked.
+
+        :param relpath: The path relative to the root of the project.
+        :param is_dir:  Whether the path is a directory.
+        :return:        True if the path is ignored, False if it is
+                        re-included by a negated pattern and None if no
+                        pattern matches.
+        """
+        components = _split_path(relpath)
+        for depth in range(len(components) - 1, -1, -1):
+            matcher = self.get_matcher("/".join(components[:depth]))
+            if matcher is not None:
+                result = matcher.match("/".join(components[depth:]), is_dir)
+                if result is not None:
+                    return result
+
+        if self.exclude_matcher is not None:
+            return self.exclude_matcher.match(relpath, is_dir)
+        return None
+
+    def is_ignored(self, relpath, is_dir=False):
+        """
+        Checks whether the given path or any of its parent directories is
+        ignored.
+
+        :param relpath: The path relative to the root of the project.
+        :param is_dir:  Whether the path is a directory.
+        :return:        True if the path is ignored.
+        """
+        return _is_ignored(self.match, relpath, is_dir)
+
+    def get_ignore_files(self):
+        """
+        Lists the ignore files loaded so far, from the lowest to the highest
+        precedence.
+
+        :return: A list of tuples of the absolute directory the patterns are
+                 relative to and the path of the file inside it.
+        """
+        ignore_files = [] if self.exclude_matcher is None else [
+            (self.root, os.path.relpath(self.exclude_file, self.root))]
+        ignore_files += [
+            (os.path.join(self.root, reldir.replace("/", os.sep))
+             if reldir else self.root,
+             self.filename)
+            for reldir, matcher in sorted(self.matchers.items())
+            if matcher is not None]
+        return ignore_files
@@ -1,3 +1,6 @@
+import os
+from collections import defaultdict
+
 from coala_quickstart.info_extractors.EditorconfigInfoExtractor import (
     EditorconfigInfoExtractor)
 from coala_quickstart.info_extractors.PackageJSONInfoExtractor import (
@@ -8,27 +11,70 @@ from coala_quickstart.info_extractors.GruntfileInfoExtractor import (
     GruntfileInfoExtractor)
 
 
-def collect_info(project_dir):
+def collect_info(project_dir, subtrees=None):
     """
     Collects information extracted by various ``InfoExtractor``
     classes and returns them as a dictionary.
+
+    :param project_dir: The project directory.
+    :param subtrees:    A list of directories relative to ``project_dir``.
+                        If given, the information is extracted from the
+                        files in them instead of the project directory.
+    """
+    directories = ([os.path.join(project_dir, subtree)
+                    for subtree in subtrees] if subtrees else [project_dir])
+
+    infos = []
+    for directory in directories:
+        infos += _extract_info(directory)
+
+    return aggregate_info(infos)
+
+
+def collect_subproject_info(project_dir, subprojects, subtrees=None):
     """
-    editorconfig_info = EditorconfigInfoExtractor(
-        [".editorconfig"], project_dir).extract_information()
+    Collects the information extracted by the ``InfoExtractor`` classes
+    for the project and each of its subprojects separately.
 
-    package_json_info = PackageJSONInfoExtractor(
-        ["package.json"], project_dir).extract_information()
+    :param project_dir: The project directory.
+    :param subprojects: A list of directories relative to ``project_dir``
+                        holding projects of their own.
+    :param subtrees:    A list of directories relative to ``project_dir``
+                        the information of the project is extracted from
+                        instead of the project directory.
+    :return:            A tuple of the information of the whole project,
+                        including the subprojects, and a dict with the
+                        subproject directories as keys, an empty string for
+                        the project itself, and their information as
+                        values.
+    """
+    directories = [("", os.path.join(project_dir, subtree))
+                   for subtree in subtrees or [""]]
+    directories += [(subproject, os.path.join(project_dir, subproject))
+                    for subproject in subprojects]
 
-    gemfile_info = GemfileInfoExtractor(
-        ["Gemfile"], project_dir).extract_information()
+    infos = []
+    subproject_infos = defaultdict(list)
+    for subproject, directory in directories:
+        extracted = _extract_info(directory)
+        infos += extracted
+        subproject_infos[subproject] += extracted
 
-    gruntfile_info = GruntfileInfoExtractor(
-        ["Gruntfile.js"], project_dir).extract_information()
+    return aggregate_info(infos), {
+        subproject: aggregate_info(extracted)
+        for subproject, extracted in subproject_infos.items()}
 
-    extracted_info = aggregate_info([
-        editorconfig_info, package_json_info, gemfile_info, gruntfile_info])
 
-    return extracted_info
+def _extract_info(directory):
+    return [
+        EditorconfigInfoExtractor(
+            [".editorconfig"], directory).extract_information(),
+        PackageJSONInfoExtractor(
+            ["package.json"], directory).extract_information(),
+        GemfileInfoExtractor(
+            ["Gemfile"], directory).extract_information(),
+        GruntfileInfoExtractor(
+            ["Gruntfile.js"], directory).extract_information()]
 
 
 def aggregate_info(infoextractors):
@@ -46,5 +92,5 @@ def aggregate_info(infoextractors):
                 if result.get(info_name):
                     result[info_name] += info_instances
                 else:
-                    result[info_name] = info_instances
+                    result[info_name] = list(info_instances)
     return result
@@ -0,0 +1,94 @@
+import re
+
+LARGE = "large"
+BINARY = "binary"
+
+# The number of bytes read from the start of a large file to sniff it
+MAX_READ_SIZE = 1024
+
+# The magic numbers at the start of common binary formats
+MAGIC_NUMBERS = (
+    b"\x7fELF",                 # ELF executables and libraries
+    b"MZ",                      # Windows executables
+    b"\xca\xfe\xba\xbe",        # Java classes and Mach-O universal binaries
+    b"\xcf\xfa\xed\xfe",        # Mach-O
+    b"\xce\xfa\xed\xfe",
+    b"\x00asm",                 # WebAssembly
+    b"\x89PNG",
+    b"\xff\xd8\xff",            # JPEG
+    b"GIF8",
+    b"%PDF",
+    b"PK\x03\x04",              # ZIP, JAR and office documents
+    b"\x1f\x8b",                # gzip
+    b"BZh",
+    b"\xfd7zXZ\x00",
+    b"7z\xbc\xaf\x27\x1c",
+    b"SQLite format 3\x00",
+)
+
+# Text encoded in UTF-16 or UTF-32 contains null bytes
+_UNICODE_BOMS = (b"\xff\xfe", b"\xfe\xff")
+
+_SIZE = re.compile(r"(\d+)\s*([kmg]?)(?:i?b)?", re.IGNORECASE)
+_SIZE_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30}
+
+
+def parse_size(value):
+    """
+    Parses a file size with an optional unit.
+
+    >>> parse_size("512")
+    512
+    >>> parse_size("2M")
+    2097152
+    >>> parse_size("64KiB")
+    65536
+
+    :param value: The size in bytes, or in kibibytes, mebibytes or
+                  gibibytes with a ``K``, ``M`` or ``G`` suffix.
+    :return:      The size in bytes.
+    :raises ValueError:
+        If the size can't be parsed.
+    """
+    match = _SIZE.fullmatch(value.strip())
+    if match is None:
+        raise ValueError("Invalid file size {!r}.".format(value))
+    return int(match.group(1)) * _SIZE_UNITS[match.group(2).lower()]
+
+
+def is_binary(data):
+    """
+    Checks whether the start of a file belongs to a binary file, by its
+    magic number or by a null byte like git does.
+
+    >>> is_binary(b"\\x7fELF\\x02\\x01\\x01")
+    True
+    >>> is_binary(b"id,name\\n1,a\\0")
+    True
+    >>> is_binary("print(1)\\n".encode("utf-16"))
+    False
+    >>> is_binary(b"print(1)\\n")
+    False
+
+    :param data: The first bytes of the file.
+    :return:     True if the file is binary.
+    """
+    if data.startswith(MAGIC_NUMBERS):
+        return True
+    return not data.startswith(_UNICODE_BOMS) and b"\0" in data
+
+
+def classify_large_file(path):
+    """
+    Sniffs the start of a file too large to be linted.
+
+    :param path: The path of the file.
+    :return:     ``BINARY`` if the file is binary, ``LARGE`` otherwise,
+                 including when it can't be read.
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read(MAX_READ_SIZE)
+    except OSError:
+        return LARGE
+    return BINARY if is_binary(data) else LARGE
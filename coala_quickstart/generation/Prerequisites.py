@@ -0,0 +1,232 @@
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+
+from coalib.misc.CachingUtilities import pickle_dump, pickle_load
+from coala_quickstart.generation.ExecutableResolver import (
+    get_executable_resolver)
+
+CACHE_IDENTIFIER = "coala_quickstart_prerequisites"
+# The number of seconds a bear may take to check its prerequisites
+DEFAULT_TIMEOUT = 10
+# The number of seconds the result of a check is reused in later runs
+DEFAULT_TTL = 60 * 60
+
+_checker = None
+
+
+def get_environment_key():
+    """
+    :return: A key of the environment the prerequisites are checked in,
+             the ``PATH`` and the Python interpreter.
+    """
+    return os.environ.get("PATH", ""), sys.executable, sys.version
+
+
+def get_bear_key(bear):
+    """
+    Bears of the same name can be defined in different modules, so they
+    are told apart by the module too.
+
+    >>> class Bear:
+    ...     pass
+    >>> get_bear_key(Bear) == __name__ + ".Bear"
+    True
+
+    :param bear: A bear class or ``BearInfo`` object.
+    :return:     The key the result of checking its prerequisites is kept
+                 under, the name of its module and its name.
+    """
+    return bear.__module__ + "." + bear.__name__
+
+
+class PrerequisiteChecker:
+    """
+    Checks the prerequisites of bears in parallel, every bear once. The
+    bears whose prerequisites are met are kept for ``ttl`` seconds as long
+    as the ``PATH`` and the interpreter don't change, and can be saved for
+    the next runs. Missing prerequisites, checks raising an exception and
+    checks taking longer than ``timeout`` seconds are only remembered for
+    the current process, so installing a prerequisite is noticed by the
+    next run. The checks run in daemon threads, which aren't waited for
+    after they timed out. Linter bears
+    only checking that their executable is on the ``PATH`` are answered by
+    the shared ``ExecutableResolver`` instead, without importing them.
+
+    >>> class Bear:
+    ...     name = "Bear"
+    ...     @staticmethod
+    ...     def check_prerequisites():
+    ...         return True
+    >>> PrerequisiteChecker().check(Bear)
+    True
+    """
+
+    def __init__(self,
+                 results=None,
+                 key=None,
+                 jobs=None,
+                 timeout=DEFAULT_TIMEOUT,
+                 ttl=DEFAULT_TTL):
+        """
+        :param results: A dict with the keys of bears as keys, see
+                        ``get_bear_key``, and tuples of the time of their
+                        check and its result as values, as saved by
+                        ``save``. Only the results of met prerequisites are
+                        used.
+        :param key:     The environment key the results were found in.
+        :param jobs:    The number of checks run at the same time, by
+                        default one per bear.
+        :param timeout: The number of seconds a single check may take.
+        :param ttl:     The number of seconds a result is valid.
+        """
+        self.key = get_environment_key()
+        self.results = ({name: entry
+                         for name, entry in (results or {}).items()
+                         if entry[1] is True}
+                        if key == self.key else {})
+        self.jobs = jobs
+        self.timeout = timeout
+        self.ttl = ttl
+        self._failed = {}
+
+    @classmethod
+    def load(cls, **kwargs):
+        """
+        Creates a checker using the results saved by the last run.
+        """
+        key, results = pickle_load(None, CACHE_IDENTIFIER, (None, {}))
+        return cls(results, key, **kwargs)
+
+    def save(self):
+        """
+        :return: True if the results were saved.
+        """
+        return pickle_dump(None, CACHE_IDENTIFIER, (self.key, self.results))
+
+    def _get_result(self, bear, now):
+        key = get_bear_key(bear)
+        entry = self.results.get(key)
+        if entry is not None and now - entry[0] < self.ttl:
+            return entry[1]
+        return self._failed.get(key)
+
+    def check_all(self, bears):
+        """
+        Checks the prerequisites of the bears not checked yet.
+
+        :param bears: A collection of bear classes or ``BearInfo`` objects.
+        :return:      A dict with the bears as keys and True or a string
+                      describing the missing prerequisites as values.
+        """
+        bears = list(bears)
+        key = get_environment_key()
+        if key != self.key:
+            self.key, self.results, self._failed = key, {}, {}
+
+        now = time.time()
+        results = {}
+        unchecked = {}
+        resolver = None
+        for bear in bears:
+            if getattr(bear, "checks_executable_only", lambda: False)():
+                resolver = resolver or get_executable_resolver()
+                results[bear] = bear.check_executable(resolver)
+                continue
+            result = self._get_result(bear, now)
+            if result is not None:
+                results[bear] = result
+            else:
+                unchecked.setdefault(get_bear_key(bear), bear)
+        if not unchecked:
+            return results
+
+        # The checks are taken from a queue by daemon threads, so checks
+        # that never return don't keep the process alive
+        todo = deque(unchecked.values())
+        finished = queue.Queue()
+        started = {}
+        lock = threading.Lock()
+
+        def worker():
+            while True:
+                with lock:
+                    if not todo:
+                        return
+                    bear = todo.popleft()
+                    started[get_bear_key(bear)] = time.monotonic()
+                try:
+                    finished.put((bear, bear.check_prerequisites(), None))
+                except Exception as exception:
+                    finished.put((bear, None, exception))
+
+        for _ in range(min(self.jobs or len(unchecked), len(unchecked))):
+            threading.Thread(target=worker, daemon=True).start()
+
+        pending = set(unchecked)
+        while pending:
+            with lock:
+                deadlines = [started[name] + self.timeout
+                             for name in pending if name in started]
+            try:
+                bear, result, exception = finished.get(
+                    timeout=(max(0, min(deadlines) - time.monotonic())
+                             if deadlines else self.timeout))
+            except queue.Empty:
+                done = False
+            else:
+                done = True
+                # Results of checks that timed out already are dropped
+                name = get_bear_key(bear)
+                if name in pending:
+                    pending.remove(name)
+                    if exception is not None:
+                        self._failed[name] = (
+                            "Checking the prerequisites failed: {}".format(
+                                exception))
+                    elif result is True:
+                        self.results[name] = now, result
+                    else:
+                        self._failed[name] = result
+
+            current = time.monotonic()
+            with lock:
+                for name in list(pending):
+                    # Checks which couldn't even start because the workers
+                    # are stuck in other checks time out too
+                    if (current - started.get(name, current) >=
+                            self.timeout or (not done and not deadlines)):
+                        self._failed[name] = (
+                            "Checking the prerequisites of {} timed out."
+                            .format(unchecked[name].name))
+                        pending.remove(name)
+                if not pending:
+                    # The workers stuck in checks don't start further ones
+                    todo.clear()
+
+        for bear in bears:
+            if bear not in results:
+                results[bear] = self._get_result(bear, now)
+        return results
+
+    def check(self, bear):
+        """
+        Checks the prerequisites of a bear, if it wasn't checked yet.
+
+        :return: True or a string describing the missing prerequisites.
+        """
+        return self.check_all([bear])[bear]
+
+
+def get_prerequisite_checker():
+    """
+    :return: The ``PrerequisiteChecker`` shared by the process, using the
+             results saved by the last run.
+    """
+    global _checker
+    if _checker is None:
+        _checker = PrerequisiteChecker.load()
+    return _checker
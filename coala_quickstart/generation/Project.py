@@ -1,9 +1,7 @@
 import os
-import operator
-from collections import defaultdict
 
 from coala_utils.string_processing.StringConverter import StringConverter
-from coala_utils.Extensions import exts
+from coala_quickstart.generation.ProjectIndex import ProjectIndex
 
 
 def valid_path(path: StringConverter):
@@ -39,17 +37,7 @@ def language_percentage(file_paths):
     :return:           A dict with file name as key and the percentage
                        of occurences as the value.
     """
-    if file_paths:
-        delta = 100 / len(file_paths)
-
-    results = defaultdict(lambda: 0)
-    for file_path in file_paths:
-        ext = os.path.splitext(file_path)[1]
-        if ext in exts:
-            for lang in exts[ext]:
-                results[lang] += delta
-
-    return results
+    return ProjectIndex(file_paths).language_percentage()
 
 
 def get_used_languages(file_paths):
@@ -63,13 +51,10 @@ def get_used_languages(file_paths):
         A tuple iterator containing a language name as the first value
         and percentage usage in the project as the second value.
     """
-    return sorted(
-        language_percentage(file_paths).items(),
-        key=operator.itemgetter(1),
-        reverse=True)
+    return ProjectIndex(file_paths).get_used_languages()
 
 
-def print_used_languages(printer, results):
+def print_used_languages(printer, results, error_bounds=None):
     """
     Prints the sorted list of used languages along with each language's
     percentage use.
@@ -79,10 +64,35 @@ def print_used_languages(printer, results):
     :param results:
         A list of tuples containing a language name as the first value
         and percentage usage in the project as the second value.
+    :param error_bounds:
+        A dict with language names as keys and the error bounds of their
+        percentages as values, if the percentages are estimated.
     """
     printer.print(
         "The following languages have been automatically detected:")
     for lang, percent in results:
         formatted_line = "{:>25}: {:>2}%".format(lang, int(percent))
+        if error_bounds is not None and lang in error_bounds:
+            formatted_line += " (+/- {:.1f}%)".format(error_bounds[lang])
         printer.print(formatted_line, color="cyan")
     printer.print()
+
+
+def print_excluded_files(printer, excluded_counts):
+    """
+    Prints the number of files left out of the languages because they are
+    vendored, generated, minified, binary or too large.
+
+    :param printer:
+        A ``ConsolePrinter`` object used for console interactions.
+    :param excluded_counts:
+        A dict with the reasons as keys and the number of files left out
+        for them as values.
+    """
+    if not excluded_counts:
+        return
+    printer.print("The following files have been automatically ignored:")
+    for reason, count in sorted(excluded_counts.items()):
+        printer.print("{:>25}: {} files".format(reason, count),
+                      color="cyan")
+    printer.print()
@@ -0,0 +1,499 @@
+import math
+import mmap
+import operator
+import os
+import sys
+from collections import Counter, OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+
+from coala_utils.Extensions import exts
+from coalib.parsing.Globbing import glob_escape
+from coala_quickstart.generation.LargeFiles import classify_large_file
+
+# The ways the files can be weighted for the language statistics
+WEIGHTINGS = ("files", "bytes", "lines")
+
+# The z-score of the confidence level of the error bounds of sampled
+# language statistics, 95%
+DEFAULT_Z_SCORE = 1.96
+DEFAULT_MIN_SAMPLE_SIZE = 500
+_SAMPLE_CHECK_INTERVAL = 100
+
+# The number of files whose lines are counted at the same time, before
+# adding further files waits for the oldest count
+_MAX_PENDING_LINE_COUNTS = 1024
+_CHUNK_SIZE = 1 << 20
+
+
+def count_lines(path):
+    """
+    Counts the lines of a file by counting the newlines in a memory map of
+    it, so the file isn't read into memory. A last line not ending with a
+    newline is counted as well.
+
+    :param path: The path of the file.
+    :return:     The number of lines, or 0 if the file can't be read.
+    """
+    try:
+        with open(path, "rb") as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return 0
+            with mmap.mmap(file.fileno(), 0,
+                           access=mmap.ACCESS_READ) as data:
+                size = len(data)
+                lines = sum(data[offset:offset + _CHUNK_SIZE].count(b"\n")
+                            for offset in range(0, size, _CHUNK_SIZE))
+                if data[size - 1:size] != b"\n":
+                    lines += 1
+                return lines
+    except (OSError, ValueError):
+        return 0
+
+
+def _get_size(path):
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return 0
+
+
+class ProjectIndex:
+    """
+    Collects everything needed about the files of a project in a single
+    pass over them, while they are discovered: the number of files per
+    extension, from which the languages, their extensions and their number
+    of files are derived, and optionally the paths themselves.
+
+    The extension of every path is computed once and interned. The paths
+    are stored once, grouped by extension, and only if ``keep_paths`` is
+    set, so the memory needed doesn't grow with the number of files
+    otherwise.
+
+    The language statistics weight every file equally by default. With the
+    ``bytes`` weighting the files are weighted by their size, which is
+    taken from the file system only if the discovery of the files didn't
+    provide it. With the ``lines`` weighting, the lines of the files of
+    known languages are counted by a thread pool while further files are
+    added.
+
+    Given a ``ContentDetector``, the languages of files without extension
+    are detected by their name or contents, in batches. They are counted
+    under a tuple of an empty extension and their language instead of
+    their extension, and their paths are always stored in
+    ``detected_files``.
+
+    Given a ``GeneratedFileClassifier``, vendored, generated and minified
+    files are left out. The files of known languages are classified by
+    their contents in batches as well. Instead of the files, the globs
+    matching them are collected in ``excluded_globs``, and their number in
+    ``excluded_counts``.
+
+    Given a ``max_file_size``, larger files are left out the same way, as
+    the bears can't handle them. Their start is sniffed to tell binary
+    files from large text files.
+
+    Files drawn as a random sample of the project are added with the
+    probability they were drawn with, and their weights are divided by it,
+    see ``get_error_bounds``.
+
+    >>> index = ProjectIndex(["setup.py", "src/main.py", "README"],
+    ...                      keep_paths=True)
+    >>> index.total
+    3
+    >>> index.get_used_languages()
+    [('Python', 66.66666666666667)]
+    >>> sorted(index.get_extensions()["python"])
+    ['.py']
+    >>> index.get_files([".py"])
+    ['setup.py', 'src/main.py']
+    """
+
+    def __init__(self,
+                 file_paths=(),
+                 keep_paths=False,
+                 weighting="files",
+                 jobs=None,
+                 detector=None,
+                 classifier=None,
+                 max_file_size=None):
+        """
+        :param file_paths: An iterable of file paths to add, see
+                           ``add_all``.
+        :param keep_paths: Whether to store the paths of the files.
+        :param weighting:  One of ``WEIGHTINGS``, the weight of a file in
+                           the language statistics.
+        :param jobs:       The number of threads counting lines for the
+                           ``lines`` weighting, by default the number of
+                           CPUs.
+        :param detector:   A ``ContentDetector`` object used for the files
+                           without extension.
+        :param classifier: A ``GeneratedFileClassifier`` object used to
+                           leave out the files not written by the authors
+                           of the project.
+        :param max_file_size:
+            The size in bytes above which files are left out, or None to
+            keep all files.
+        :raises ValueError:
+            If the weighting is unknown.
+        """
+        if weighting not in WEIGHTINGS:
+            raise ValueError("Unknown weighting {!r}, expected one of {}."
+                             .format(weighting, ", ".join(WEIGHTINGS)))
+
+        self.total = 0
+        self.extension_counts = Counter()
+        self.extension_weights = Counter()
+        self.extension_square_weights = Counter()
+        self.paths_by_extension = (defaultdict(list) if keep_paths
+                                   else None)
+        self.weighting = weighting
+        self.jobs = jobs or os.cpu_count() or 1
+        self._executor = None
+        self._line_counts = deque()
+        self.detector = detector
+        self.detected_files = defaultdict(list)
+        self._undetected = []
+        self.classifier = classifier
+        self.excluded_globs = OrderedDict()
+        self.excluded_counts = Counter()
+        self._unclassified = []
+        self.max_file_size = max_file_size
+        # The extensions and weights of the files drawn, None while they
+        # are pending or if they are left out, and the draws of files drawn
+        # before
+        self._sampled = {}
+        self._repeated_draws = []
+        self._complete = False
+        self.add_all(file_paths)
+
+    def add(self, file_path, size=None, probability=None):
+        """
+        Adds a single file.
+
+        :param file_path:   The path of the file.
+        :param size:        The size of the file if known, used for the
+                            ``bytes`` weighting.
+        :param probability: The probability the file was drawn with, if it
+                            is a draw of a random sample of the project.
+                            A file drawn again is only counted once, but its
+                            weight is added for every draw.
+        """
+        scale = None
+        if probability is not None:
+            scale = 1 / probability
+            if file_path in self._sampled:
+                self._repeated_draws.append((file_path, scale))
+                return
+            self._sampled[file_path] = None
+
+        ext = sys.intern(os.path.splitext(file_path)[1])
+        self.total += 1
+        if self.max_file_size is not None:
+            if size is None:
+                size = _get_size(file_path)
+            if size > self.max_file_size:
+                self._exclude(glob_escape(file_path),
+                              classify_large_file(file_path))
+                return
+
+        if self.classifier is not None:
+            excluded = self.classifier.classify_path(file_path)
+            if excluded is not None:
+                self._exclude(*excluded)
+                return
+            if ext in exts:
+                self._unclassified.append((file_path, ext, size, scale))
+                if (len(self._unclassified) >=
+                        self.classifier.batch_size * self.classifier.jobs):
+                    self._classify_files()
+                return
+
+        if not ext and self.detector is not None:
+            self._undetected.append((file_path, size, scale))
+            if (len(self._undetected) >=
+                    self.detector.batch_size * self.detector.jobs):
+                self._detect_languages()
+        else:
+            self._add_file(file_path, ext, size, scale)
+
+    @staticmethod
+    def _get_languages(key):
+        return (key[1],) if isinstance(key, tuple) else exts.get(key, ())
+
+    def _add_file(self, file_path, key, size, scale=None):
+        self.extension_counts[key] += 1
+        if self.paths_by_extension is not None:
+            self.paths_by_extension[key].append(file_path)
+
+        if self.weighting == "files":
+            self._add_file_weight(file_path, key, 1, scale)
+        elif self.weighting == "bytes":
+            if size is None:
+                size = _get_size(file_path)
+            self._add_file_weight(file_path, key, size, scale)
+        elif self._get_languages(key):
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.jobs)
+            self._line_counts.append(
+                (file_path, key, self._executor.submit(count_lines, file_path),
+                 scale))
+            while len(self._line_counts) > _MAX_PENDING_LINE_COUNTS:
+                self._add_line_count()
+        elif scale is not None:
+            self._sampled[file_path] = key, 0
+
+    def _exclude(self, glob, reason):
+        self.excluded_globs.setdefault(glob, reason)
+        self.excluded_counts[reason] += 1
+
+    def _classify_files(self):
+        reasons = self.classifier.classify_all(
+            [file_path for file_path, _, _, _ in self._unclassified])
+        for (file_path, ext, size, scale), reason in zip(self._unclassified,
+                                                         reasons):
+            if reason is None:
+                self._add_file(file_path, ext, size, scale)
+            else:
+                self._exclude(glob_escape(file_path), reason)
+        self._unclassified = []
+
+    def _detect_languages(self):
+        languages = self.detector.detect_all(
+            [file_path for file_path, _, _ in self._undetected])
+        for (file_path, size, scale), language in zip(self._undetected,
+                                                      languages):
+            if language is None:
+                self._add_file(file_path, "", size, scale)
+            else:
+                self.detected_files[language].append(file_path)
+                self._add_file(file_path, ("", language), size, scale)
+        self._undetected = []
+
+    def _add_weight(self, ext, weight):
+        self.extension_weights[ext] += weight
+        self.extension_square_weights[ext] += weight * weight
+
+    def _add_file_weight(self, file_path, key, weight, scale):
+        if scale is not None:
+            self._sampled[file_path] = key, weight
+            weight *= scale
+        self._add_weight(key, weight)
+
+    def _add_line_count(self):
+        file_path, key, future, scale = self._line_counts.popleft()
+        self._add_file_weight(file_path, key, future.result(), scale)
+
+    def _finish(self):
+        if self._unclassified:
+            self._classify_files()
+        if self._undetected:
+            self._detect_languages()
+        while self._line_counts:
+            self._add_line_count()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        for file_path, scale in self._repeated_draws:
+            if self._sampled[file_path] is not None:
+                key, weight = self._sampled[file_path]
+                self._add_weight(key, weight * scale)
+        self._repeated_draws = []
+
+    def add_all(self, file_paths):
+        """
+        Adds all files of an iterable.
+
+        :param file_paths: An iterable of file paths, or of tuples of the
+                           arguments of ``add``.
+        """
+        for file_path in file_paths:
+            self._add_item(file_path)
+
+    def _add_item(self, item):
+        if isinstance(item, tuple):
+            self.add(*item)
+        else:
+            self.add(item)
+
+    def add_until_confident(self,
+                            file_paths,
+                            margin,
+                            z_score=DEFAULT_Z_SCORE,
+                            min_files=DEFAULT_MIN_SAMPLE_SIZE):
+        """
+        Adds files of an iterable yielding a random sample of the project,
+        until the error bounds of all language percentages are within the
+        given margin. If the iterable is exhausted before, the files added
+        are taken to be all files of the project: the weights of the files
+        drawn replace the estimates, and the error bounds are 0.
+
+        :param file_paths: An iterable of file paths, or of tuples of the
+                           arguments of ``add``, drawn at random, like the
+                           draws of ``sample_walk_files``. Draws without a
+                           probability are taken to be equally likely.
+        :param margin:     The maximum error bound in percentage points.
+        :param z_score:    The z-score of the confidence level of the error
+                           bounds.
+        :param min_files:  The minimum number of files to add.
+        :return:           True if the error bounds are within the margin,
+                           False if the iterable was exhausted before.
+        """
+        for count, file_path in enumerate(file_paths, 1):
+            self._add_item(file_path)
+            if (count >= min_files and count % _SAMPLE_CHECK_INTERVAL == 0
+                    and max(self.get_error_bounds(z_score).values(),
+                            default=0) <= margin):
+                return True
+
+        if self._sampled:
+            self._finish()
+            self.extension_weights = Counter()
+            self.extension_square_weights = Counter()
+            for key, weight in filter(None, self._sampled.values()):
+                self._add_weight(key, weight)
+            self._complete = True
+        return False
+
+    def get_language_counts(self):
+        """
+        :return: An ``OrderedDict`` with the language names as keys and the
+                 number of files of the language as values, in the order
+                 the languages were first seen. Files with unknown
+                 extensions are left out.
+        """
+        self._finish()
+        counts = OrderedDict()
+        for ext, count in self.extension_counts.items():
+            for lang in self._get_languages(ext):
+                counts[lang] = counts.get(lang, 0) + count
+        return counts
+
+    def get_language_weights(self):
+        """
+        :return: An ``OrderedDict`` with the language names as keys and the
+                 total weight of the files of the language as values, in
+                 the order the languages were first seen.
+        """
+        self._finish()
+        weights = OrderedDict()
+        for ext, weight in self.extension_weights.items():
+            for lang in self._get_languages(ext):
+                weights[lang] = weights.get(lang, 0) + weight
+        return weights
+
+    def language_percentage(self):
+        """
+        Computes the percentage composition of each language, using the
+        weighting of the index.
+
+        :return: A dict with the language name as key and the percentage
+                 of the total weight as the value.
+        """
+        results = defaultdict(lambda: 0)
+        weights = self.get_language_weights()
+        total = sum(self.extension_weights.values())
+        for lang, weight in weights.items():
+            results[lang] = 100 * weight / total if total else 0
+        return results
+
+    def get_error_bounds(self, z_score=DEFAULT_Z_SCORE):
+        """
+        Estimates the error of the language percentages, assuming the files
+        added are independent random draws of the project.
+
+        The percentage of a language is the ratio of the total weight of its
+        files to the total weight of all files. Files added with the
+        probability they were drawn with are weighted by its inverse, so
+        the total weights are unbiased estimates of the totals of the
+        project even if the files are not equally likely (the
+        Hansen-Hurwitz estimator). The error bound is the half-width of the
+        confidence interval of the ratio of the estimates, using the
+        variance of the ratio estimator.
+
+        >>> index = ProjectIndex(["main.py"] * 3 + ["main.c"])
+        >>> round(index.get_error_bounds()["Python"], 1)
+        42.4
+
+        :param z_score: The z-score of the confidence level.
+        :return:        A dict with the language name as key and the error
+                        bound of its percentage in percentage points as the
+                        value.
+        """
+        self._finish()
+        if self._complete:
+            return {lang: 0.0 for lang in self.get_language_weights()}
+        total = sum(self.extension_weights.values())
+        square_total = sum(self.extension_square_weights.values())
+        weights = self.get_language_weights()
+        square_weights = {}
+        for ext, square_weight in self.extension_square_weights.items():
+            for lang in self._get_languages(ext):
+                square_weights[lang] = (square_weights.get(lang, 0) +
+                                        square_weight)
+
+        bounds = {}
+        for lang, weight in weights.items():
+            if not total:
+                bounds[lang] = 100.0
+                continue
+            share = weight / total
+            # The sum of the squared residuals weight * (in_lang - share) of
+            # the files, the standard error of the share is its square root
+            # divided by the total weight
+            residuals = ((1 - share) ** 2 * square_weights[lang] +
+                         share ** 2 * (square_total - square_weights[lang]))
+            bounds[lang] = 100 * z_score * math.sqrt(residuals) / total
+        return bounds
+
+    def get_used_languages(self):
+        """
+        :return: A list of tuples containing a language name as the first
+                 value and percentage usage in the project as the second
+                 value, sorted by usage.
+        """
+        return sorted(
+            self.language_percentage().items(),
+            key=operator.itemgetter(1),
+            reverse=True)
+
+    def get_extensions(self):
+        """
+        :return: A dict with the lowercase language names as keys and the
+                 set of extensions of the language used in the project as
+                 values.
+        """
+        self._finish()
+        extset = defaultdict(lambda: set())
+        for ext in self.extension_counts:
+            for lang in exts.get(ext, ()):
+                extset[lang.lower()].add(ext)
+        return extset
+
+    def get_excluded_globs(self):
+        """
+        :return: A list of absolute globs matching the files left out by the
+                 ``GeneratedFileClassifier`` or for their size, in the order
+                 they were found.
+        """
+        self._finish()
+        return list(self.excluded_globs)
+
+    def get_files(self, extensions=None):
+        """
+        Lists the stored paths of the files with the given extensions.
+
+        :param extensions: A collection of extensions, or None for all
+                           files.
+        :return:           A list of file paths, grouped by extension.
+        :raises ValueError:
+            If the index was created without ``keep_paths``.
+        """
+        if self.paths_by_extension is None:
+            raise ValueError("The project index doesn't store the paths.")
+        self._finish()
+
+        if extensions is None:
+            extensions = self.paths_by_extension
+        return [path
+                for ext in self.paths_by_extension if ext in extensions
+                for path in self.paths_by_extension[ext]]
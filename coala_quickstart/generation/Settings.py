@@ -1,18 +1,60 @@
 import os
-from collections import OrderedDict
+from collections import OrderedDict, defaultdict
 from datetime import date
 
-from coalib.settings.SectionFilling import fill_settings
+from coalib.parsing.Globbing import glob_escape
+from coala_quickstart.generation.BearCatalog import load_bears
 from coala_quickstart.generation.SettingsFilling import (
     fill_section, acquire_settings)
-from coala_quickstart.generation.Utilities import (
-    split_by_language, get_extensions)
+from coala_quickstart.generation.GlobMinimizer import (
+    count_project_files, get_rooted_file_globs, minimize_globs)
+from coala_quickstart.generation.ProjectIndex import ProjectIndex
+from coala_quickstart.generation.Subprojects import (
+    get_section_name, get_subproject)
 from coalib.settings.Section import Section
 from coalib.output.ConfWriter import ConfWriter
-from coalib.collecting.Collectors import collect_files
 
 
-def generate_section(section_name, extensions_used, bears):
+def _get_relative_paths(project_dir, paths):
+    prefix = os.path.join(project_dir, "") if project_dir else ""
+    return [path[len(prefix):] for path in paths if path.startswith(prefix)]
+
+
+def get_scoped_file_globs(extensions, subtrees=None, max_depth=None):
+    """
+    Generates the globs matching the files with the given extensions in
+    the part of the project that was walked.
+
+    >>> get_scoped_file_globs([".py", ".pyi"], ["src", "tests"])
+    ['src/**.py', 'src/**.pyi', 'tests/**.py', 'tests/**.pyi']
+    >>> get_scoped_file_globs([".py"], max_depth=1)
+    ['*.py', '*/*.py']
+    >>> get_scoped_file_globs([".c"], ["src/lib"], max_depth=3)
+    ['src/lib/*.c', 'src/lib/*/*.c']
+
+    :param extensions: A collection of extensions.
+    :param subtrees:   A list of directories relative to the project
+                       directory, or None for the whole project.
+    :param max_depth:  The maximum number of directory levels below the
+                       project directory, or None for no limit.
+    :return:           A list of globs relative to the project directory.
+    """
+    globs = []
+    for subtree in subtrees or [""]:
+        if max_depth is None:
+            patterns = ["**"]
+        else:
+            depth = subtree.count(os.sep) + 1 if subtree else 0
+            patterns = [os.path.join(*["*"] * (level + 1))
+                        for level in range(max_depth - depth + 1)]
+        for ext in sorted(set(extensions)):
+            for pattern in patterns:
+                globs.append(os.path.join(glob_escape(subtree),
+                                          pattern + ext))
+    return globs
+
+
+def generate_section(section_name, extensions_used, bears, file_globs=None):
     """
     Generates a section for a particular language (or default).
 
@@ -22,13 +64,18 @@ def generate_section(section_name, extensions_used, bears):
         A list of extensions associated with this section.
     :param bears:
         A list of bear classes.
+    :param file_globs:
+        A list of globs for the ``files`` field. By default a glob matching
+        each extension in the whole project is used.
     :return:
         A ``Section`` object containing the section.
     """
     section = Section(section_name, None)
 
     section["bears"] = ", ".join(bear.name for bear in bears)
-    section["files"] = ", ".join("**" + ext for ext in set(extensions_used))
+    if file_globs is None:
+        file_globs = ("**" + ext for ext in set(extensions_used))
+    section["files"] = ", ".join(file_globs)
 
     return section
 
@@ -41,6 +88,11 @@ def generate_ignore_field(project_dir,
     """
     Generate the ignore field for the ``default`` section.
 
+    The field is built from the ignore globs alone, the project directory
+    is not accessed again as ``get_project_files`` already applied them.
+    The globs are minimized with ``minimize_globs``, which checks that
+    the minimized globs match the same paths.
+
     :param project_dir:
         Full path of the user's project directory.
     :param languages:
@@ -48,22 +100,16 @@ def generate_ignore_field(project_dir,
     :param extset:
         A dict with language name as key and a set of extensions as
         value. This includes only those extensions used by the project.
+    :param ignore_globs:
+        The list of ignore glob expressions.
     :return:
         A comma-separated string containing the globs to ignore.
     """
-
-    all_files = set(collect_files(
-        "**",
-        null_printer,
-        ignored_file_paths=ignore_globs))
-
     ignores = []
     for glob in ignore_globs:
-        gitignore_files = {file
-                           for file in collect_files([glob], null_printer)}
         ignores.append(os.path.relpath(glob, project_dir))
 
-    return ", ".join(ignores)
+    return ", ".join(minimize_globs(ignores))
 
 
 def generate_settings(project_dir,
@@ -72,14 +118,21 @@ def generate_settings(project_dir,
                       relevant_bears,
                       extracted_info,
                       incomplete_sections=False,
-                      log_printer=None):
+                      log_printer=None,
+                      rooted_file_globs=False,
+                      project_index=None,
+                      subtrees=None,
+                      max_depth=None,
+                      subprojects=None,
+                      subproject_info=None):
     """
     Generates the settings for the given project.
 
     :param project_dir:
         Full path of the user's project directory.
     :param project_files:
-        A list of file paths matched in the user's project directory.
+        A list of file paths matched in the user's project directory. It
+        may be None if ``project_index`` is given.
     :param ignore_globs:
         The list of ignore glob expressions.
     :param relevant_bears:
@@ -98,39 +151,210 @@ def generate_settings(project_dir,
         In CI mode, bears with non optional setting are not added in coafile.
         But if incomplete_sections is set to ``True`` in CI mode, then those
         bears are also added in the coafile.
+    :param rooted_file_globs:
+        If set to ``True``, the ``files`` field of a section uses globs
+        rooted at the directories containing its files, computed by
+        ``get_rooted_file_globs``, so that coala walks less of the project
+        to collect them.
+    :param project_index:
+        A ``ProjectIndex`` object the project files were added to. If not
+        given, it is created from ``project_files``. The paths need to be
+        stored in it for ``rooted_file_globs``. The globs of the files it
+        left out as generated are added to the ignore globs.
+    :param subtrees:
+        A list of directories relative to ``project_dir`` the project files
+        were taken from. The ``files`` fields are scoped to them.
+    :param max_depth:
+        The maximum number of directory levels below ``project_dir`` the
+        project files were taken from. The ``files`` fields are scoped to
+        it, it can't be used with ``rooted_file_globs`` or ``subprojects``.
+    :param subprojects:
+        A list of directories relative to ``project_dir`` holding projects
+        of their own. Their files get sections of their own named after
+        them, like ``all.web.JavaScript``, and are left out of the sections
+        of the project. All ``files`` fields are rooted like with
+        ``rooted_file_globs``.
+    :param subproject_info:
+        A dict with the directories of ``subprojects`` as keys and the
+        information extracted from their files as values, used for the
+        settings of their sections instead of ``extracted_info``.
     :return:
         A dict with section name as key and a ``Section`` object as value.
     """
     lang_map = {lang.lower(): lang for lang in relevant_bears}
-    lang_files = split_by_language(project_files)
-    extset = get_extensions(project_files)
+    rooted_file_globs = rooted_file_globs or bool(subprojects)
+    if project_index is None:
+        project_files = list(project_files)
+        project_index = ProjectIndex(project_files,
+                                     keep_paths=rooted_file_globs)
+    languages = [lang.lower()
+                 for lang in project_index.get_language_counts()]
+    extset = project_index.get_extensions()
+
+    # The files are grouped by the subproject they belong to, None being
+    # the whole project and an empty string the project without its
+    # subprojects
+    subprojects = sorted(subprojects or [])
+    subproject_set = set(subprojects)
+    groups = [None] + ([""] + subprojects if subprojects else [])
+
+    def get_containers(subproject):
+        containers = [None]
+        if subprojects:
+            while True:
+                containers.append(subproject)
+                if not subproject:
+                    return containers
+                subproject = get_subproject(subproject, subproject_set)
+        return containers
+
+    # The subprojects by the directories of the files
+    subproject_cache = {}
+
+    def find_subproject(path):
+        directory = os.path.dirname(path)
+        if directory not in subproject_cache:
+            subproject_cache[directory] = get_subproject(path, subproject_set)
+        return subproject_cache[directory]
+
+    def get_relative_path(path, subproject):
+        return path[len(subproject) + 1:] if subproject else path
+
+    # Files detected by their content can't be matched by their extension
+    detected_files = {group: defaultdict(list) for group in groups}
+    for lang, files in project_index.detected_files.items():
+        for path in _get_relative_paths(project_dir, files):
+            for group in get_containers(find_subproject(path))[:2]:
+                detected_files[group][lang.lower()].append(path)
+                detected_files[group]["all"].append(path)
+
+    if rooted_file_globs:
+        # The paths are made relative and split by subproject and extension
+        # in a single pass. Every group gets the files below it, relative to
+        # it, for the scope of its globs, and its nested subprojects, whose
+        # files its globs must not match.
+        files_by_ext = {group: defaultdict(list) for group in groups}
+        files_below = {group: [] for group in groups}
+        for path in _get_relative_paths(project_dir,
+                                        project_index.get_files()):
+            containers = get_containers(find_subproject(path))
+            ext = os.path.splitext(path)[1]
+            for group in containers[:2]:
+                files_by_ext[group][ext].append(
+                    get_relative_path(path, group))
+            for group in containers:
+                files_below[group].append(get_relative_path(path, group))
+        nested = {group: [] for group in groups}
+        for subproject in subprojects:
+            for group in get_containers(subproject)[2:]:
+                nested[group].append((get_relative_path(subproject, group),
+                                      set(files_by_ext[subproject])))
+        project_counts = {}
+
+    def get_relative_dirs(root, directories):
+        return [path[:-1] for path in _get_relative_paths(
+            root, [os.path.join(directory, "")
+                   for directory in directories])]
+
+    def get_file_globs(lang, extensions, group=None):
+        detected_globs = [glob_escape(path)
+                          for path in detected_files[group].get(lang, ())]
+        if rooted_file_globs:
+            extensions = set(extensions)
+            file_paths = [path for ext in extensions
+                          for path in files_by_ext[group].get(ext, ())]
+            if not file_paths:
+                return detected_globs
+            excluded_dirs = [directory
+                             for directory, nested_extensions in nested[group]
+                             if nested_extensions & extensions]
+            globs = []
+            # The globs are rooted in the subtrees or subprojects, so they
+            # can't match files outside of them
+            for root in subtrees if not group and subtrees else [""]:
+                if (group, root) not in project_counts:
+                    project_counts[group, root] = count_project_files(
+                        _get_relative_paths(root, files_below[group]))
+                globs += [os.path.join(glob_escape(group or root), glob)
+                          for glob in get_rooted_file_globs(
+                              _get_relative_paths(root, file_paths),
+                              None,
+                              extensions,
+                              excluded_dirs=get_relative_dirs(
+                                  root, excluded_dirs),
+                              project_counts=project_counts[group, root])]
+        elif detected_globs or subtrees or max_depth is not None:
+            globs = get_scoped_file_globs(extensions, subtrees, max_depth)
+        else:
+            return None
+        return globs + detected_globs
 
     settings = OrderedDict()
 
+    all_extensions = [ext for lang in languages for ext in extset[lang]]
     settings["all"] = generate_section(
         "all",
-        [ext for lang in lang_files for ext in extset[lang]],
-        relevant_bears[lang_map["all"]])
+        all_extensions,
+        relevant_bears[lang_map["all"]],
+        get_file_globs("all", all_extensions))
 
-    ignored_files = generate_ignore_field(project_dir, lang_files.keys(),
+    ignore_globs = list(ignore_globs) + project_index.get_excluded_globs()
+    ignored_files = generate_ignore_field(project_dir, languages,
                                           extset, ignore_globs)
 
     if ignored_files:
         settings["all"]["ignore"] = ignored_files
 
-    for lang in lang_files:
-        if lang != "unknown" and lang != "all":
-            settings["all." + lang_map[lang]] = generate_section(
-                "all." + lang,
-                extset[lang],
-                relevant_bears[lang_map[lang]])
+    if not subprojects:
+        for lang in languages:
+            if lang != "unknown" and lang != "all":
+                settings["all." + lang_map[lang]] = generate_section(
+                    "all." + lang,
+                    extset[lang],
+                    relevant_bears[lang_map[lang]],
+                    get_file_globs(lang, extset[lang]))
+        groups = [("", settings)]
+    else:
+        groups = []
+        for subproject in [""] + subprojects:
+            prefix = ("all." + get_section_name(subproject) + "."
+                      if subproject else "all.")
+            sections = settings if not subproject else OrderedDict()
+            for lang in languages:
+                if lang == "unknown" or lang == "all":
+                    continue
+                globs = get_file_globs(lang, extset[lang], subproject)
+                # Languages without files in the subproject get no section
+                if globs:
+                    sections[prefix + lang_map[lang]] = generate_section(
+                        prefix + lang,
+                        extset[lang],
+                        relevant_bears[lang_map[lang]],
+                        globs)
+            groups.append((subproject, sections))
 
     if not incomplete_sections:
-        fill_settings(settings,
-                      acquire_settings,
-                      log_printer,
-                      fill_section_method=fill_section,
-                      extracted_info=extracted_info)
+        # The bears of a language are only imported once, instead of being
+        # collected again from the bear directories for every section. The
+        # last part of a section name is its language.
+        loaded_bears = {}
+        for subproject, sections in groups:
+            # The sections of every subproject are filled with the
+            # information extracted from its own files
+            info = (subproject_info or {}).get(subproject, extracted_info)
+            for section_name, section in sections.items():
+                lang = lang_map[section_name.rsplit(".", 1)[-1].lower()]
+                if lang not in loaded_bears:
+                    loaded_bears[lang] = load_bears(relevant_bears[lang])
+                fill_section(section,
+                             acquire_settings,
+                             log_printer,
+                             loaded_bears[lang],
+                             extracted_info=info)
+
+    for subproject, sections in groups:
+        if subproject:
+            settings.update(sections)
 
     return settings
 
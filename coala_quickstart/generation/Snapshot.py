@@ -0,0 +1,119 @@
+import os
+import threading
+
+from coalib.misc.CachingUtilities import pickle_dump, pickle_load
+from coala_quickstart.generation.FileWalker import list_directory
+
+CACHE_IDENTIFIER = "coala_quickstart_snapshot"
+
+
+class WalkSnapshot:
+    """
+    Keeps the listings of the directories of a project between runs, so a
+    walk only lists the directories changed since the last one. A directory
+    is listed again if its modification time changed, which happens when
+    entries are added, removed or renamed in it. Every other directory is
+    only stat'ed.
+
+    The sizes of the files are taken when their directory is listed, and
+    the languages detected from the contents of the files are kept with the
+    listing. Both are therefore assumed unchanged as long as the directory
+    is, even if a file is modified in place.
+
+    >>> snapshot = WalkSnapshot("/repo")
+    >>> snapshot.list_directory("/repo/missing") is None
+    True
+    """
+
+    def __init__(self, root, directories=None):
+        """
+        :param root:        The project directory.
+        :param directories: A dict with the entries of a previous run, as
+                            saved by ``save``.
+        """
+        self.root = root
+        self.directories = {} if directories is None else directories
+        # The entries of the directories seen in this run
+        self.used = {}
+        self.listed = 0
+        self.reused = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _get_identifier(root):
+        return CACHE_IDENTIFIER + ":" + root
+
+    @classmethod
+    def load(cls, root):
+        """
+        Creates a snapshot using the one saved by the last run for the
+        same project directory.
+        """
+        return cls(root, pickle_load(None, cls._get_identifier(root), {}))
+
+    def save(self):
+        """
+        Saves the entries of the directories seen in this run, so entries
+        of removed directories don't accumulate.
+
+        :return: True if the snapshot was saved.
+        """
+        return pickle_dump(None, self._get_identifier(self.root), self.used)
+
+    def list_directory(self, directory, follow_symlinks=False):
+        """
+        Lists a directory like ``list_directory`` with sizes, if it changed
+        since the snapshot was taken or was listed with another policy for
+        symbolic links.
+
+        :param directory:       The path of the directory.
+        :param follow_symlinks: Whether to list symbolic links as what they
+                                point to.
+        :return:                The listing, or None if the directory can't
+                                be listed.
+        """
+        try:
+            stamp = os.stat(directory).st_mtime_ns, follow_symlinks
+        except OSError:
+            return None
+
+        entry = self.directories.get(directory)
+        if entry is not None and entry[0] == stamp:
+            with self._lock:
+                self.reused += 1
+        else:
+            listing = list_directory(directory, True, follow_symlinks)
+            if listing is None:
+                return None
+            entry = stamp, listing, {}
+            with self._lock:
+                self.listed += 1
+
+        self.used[directory] = entry
+        return entry[1]
+
+    def get_language(self, path):
+        """
+        :param path: The path of a file in a directory listed by the
+                     snapshot.
+        :return:     A tuple of whether the language of the file is known
+                     and the language, which may be None.
+        """
+        directory, name = os.path.split(path)
+        entry = self.used.get(directory)
+        if entry is None or name not in entry[2]:
+            return False, None
+        return True, entry[2][name]
+
+    def set_language(self, path, language):
+        """
+        Records the language detected from the contents of a file, if its
+        directory was listed by the snapshot.
+
+        :param path:     The path of the file.
+        :param language: The language, or None if it's unknown.
+        """
+        directory, name = os.path.split(path)
+        entry = self.used.get(directory)
+        if entry is not None:
+            entry[2][name] = language
@@ -0,0 +1,90 @@
+import os
+
+# Files marking the directory containing them as the root of a project
+SUBPROJECT_MARKERS = frozenset((
+    "package.json",
+    "setup.py",
+    "pyproject.toml",
+    "Gemfile",
+    "pom.xml",
+    "build.gradle",
+    "Cargo.toml",
+    "go.mod",
+))
+
+
+def find_subprojects(file_paths):
+    """
+    Finds the roots of the projects nested in a project, like the packages
+    of a monorepo, by their marker files.
+
+    >>> find_subprojects(["setup.py", "web/package.json", "web/index.js",
+    ...                   "services/pay/pom.xml", "docs/setup.py.txt"])
+    ['services/pay', 'web']
+
+    :param file_paths: The files of the project, relative to the project
+                       directory.
+    :return:           A sorted list of the directories containing a
+                       marker, relative to the project directory. The
+                       project directory itself isn't included.
+    """
+    subprojects = set()
+    for path in file_paths:
+        directory, name = os.path.split(path)
+        if directory and name in SUBPROJECT_MARKERS:
+            subprojects.add(directory)
+    return sorted(subprojects)
+
+
+def get_subproject(path, subprojects):
+    """
+    Finds the innermost subproject a file belongs to.
+
+    >>> get_subproject("web/admin/app.js", {"web", "web/admin"})
+    'web/admin'
+    >>> get_subproject("webapp/app.js", {"web"})
+    ''
+
+    :param path:        The path of the file, relative to the project
+                        directory.
+    :param subprojects: A set of subproject directories.
+    :return:            The subproject directory, or an empty string if the
+                        file only belongs to the project itself.
+    """
+    directory = os.path.dirname(path)
+    while directory:
+        if directory in subprojects:
+            return directory
+        directory = os.path.dirname(directory)
+    return ""
+
+
+def get_section_name(subproject):
+    """
+    Generates the part of the section names for a subproject. The dots of
+    the directory are replaced, so coala doesn't take them as separators
+    of inherited sections.
+
+    >>> get_section_name(os.path.join("services", "pay.v2"))
+    'services/pay_v2'
+
+    :param subproject: The subproject directory.
+    :return:           The name of the subproject.
+    """
+    return subproject.replace(os.sep, "/").replace(".", "_")
+
+
+def print_subprojects(printer, subprojects):
+    """
+    Prints the subprojects found in the project.
+
+    :param printer:     A ``ConsolePrinter`` object used for console
+                        interactions.
+    :param subprojects: A list of subproject directories.
+    """
+    if subprojects:
+        printer.print("The following subprojects have been found and get "
+                      "their own sections:")
+        for subproject in subprojects:
+            printer.print("    " + subproject)
+        printer.print()
@@ -1,8 +1,8 @@
 import os
 from collections import defaultdict
 
-from coala_utils.Extensions import exts
 from coala_utils.string_processing import unescaped_search_for
+from coala_quickstart.generation.ProjectIndex import ProjectIndex
 
 
 def is_glob_exp(line):
@@ -21,6 +21,7 @@ def is_glob_exp(line):
 def parse_gitignore_line(line):
     """
     Parses the line from ``.gitignore`` and returns a list of globs.
+    Negated patterns give no globs, see ``is_negated_gitignore_line``.
 
     :param line: A line from the project's ``.gitignore`` file.
     :return:     A list of glob expressions translated to the
@@ -36,6 +37,11 @@ def parse_gitignore_line(line):
         cur -= 1
     line = line[:cur + 1]
 
+    if line.startswith("!"):
+        # Ignored files can't be included again with coala globs, so negated
+        # patterns are left out.
+        return
+
     if line.startswith("/"):
         if not is_glob_exp(line[1:]):
             # /build should map to ./build/** and ./build
@@ -57,13 +63,33 @@ def parse_gitignore_line(line):
             yield line
 
 
-def get_gitignore_glob(project_dir, filename=".gitignore"):
+def is_negated_gitignore_line(line):
+    """
+    Checks whether a line from ``.gitignore`` includes files ignored by
+    the lines before it again. coala globs can't express that, so the files
+    stay ignored by the globs of the lines before.
+
+    >>> is_negated_gitignore_line("!important.log")
+    True
+    >>> is_negated_gitignore_line("important.log")
+    False
+
+    :param line: A line from the project's ``.gitignore`` file.
+    :return:     True if the line is a negated pattern.
+    """
+    return line.startswith("!") and bool(line[1:].strip())
+
+
+def get_gitignore_glob(project_dir, filename=".gitignore", negated=None):
     """
     Generates a list of glob expressions equivalent to the
     contents of the user's project's ``.gitignore`` file.
 
     :param project_dir:
         The user's project directory.
+    :param negated:
+        A list the negated patterns of the file are appended to, as they
+        give no globs.
     :return:
         A list generator of glob expressions generated from the
         ``.gitignore`` file.
@@ -72,6 +98,8 @@ def get_gitignore_glob(project_dir, filename=".gitignore"):
 
     with open(gitignore, "r") as file:
         for line in file:
+            if negated is not None and is_negated_gitignore_line(line):
+                negated.append(line.strip())
             for glob in parse_gitignore_line(line):
                 yield os.path.join(project_dir, glob)
 
@@ -84,13 +112,11 @@ def split_by_language(project_files):
     :return:              A dict with language name as keys and a list of
                           files coming under that language as values.
     """
+    project_index = ProjectIndex(project_files, keep_paths=True)
     lang_files = defaultdict(lambda: set())
-    for file in project_files:
-        name, ext = os.path.splitext(file)
-        if ext in exts:
-            for lang in exts[ext]:
-                lang_files[lang.lower()].add(file)
-                lang_files["all"].add(file)
+    for lang, extensions in project_index.get_extensions().items():
+        lang_files[lang] = set(project_index.get_files(extensions))
+        lang_files["all"] |= lang_files[lang]
 
     return lang_files
 
@@ -103,11 +129,4 @@ def get_extensions(project_files):
     :return:              The set of extensions used in the project_files
                           for which bears exist.
     """
-    extset = defaultdict(lambda: set())
-    for file in project_files:
-        ext = os.path.splitext(file)[1]
-        if ext in exts:
-            for lang in exts[ext]:
-                extset[lang.lower()].add(ext)
-
-    return extset
+    return ProjectIndex(project_files).get_extensions()
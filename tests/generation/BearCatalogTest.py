@@ -0,0 +1,192 @@
+import os
+import sys
+import tempfile
+import unittest
+from copy import deepcopy
+from unittest.mock import MagicMock, patch
+
+from coalib.bearlib.abstractions.Linter import linter
+from coalib.bears.LocalBear import LocalBear
+from coalib.parsing.Globbing import glob_escape
+from coala_quickstart.coala_quickstart import _get_arg_parser
+from coala_quickstart.generation import BearCatalog as catalog_module
+from coala_quickstart.generation.BearCatalog import (
+    SUPPORTED_COALA_VERSIONS, BearCatalog, BearInfo, Requirement,
+    _get_linter_options, get_catalog_key, get_coala_version,
+    get_executable_check, load_bears)
+from coala_quickstart.generation.Prerequisites import get_bear_key
+from tests.TestUtilities import bear_test_module
+
+
+def create_linter(**options):
+    @linter(executable="some_lint",
+            output_format="regex",
+            output_regex=r".+:(?P<line>\d+):(?P<message>.*)",
+            **options)
+    class SomeLintBear:
+
+        @staticmethod
+        def create_arguments(filename, file, config_file):
+            return ()
+
+    return SomeLintBear
+
+
+class BearCatalogTest(unittest.TestCase):
+
+    def setUp(self):
+        self.arg_parser = _get_arg_parser()
+        self.old_argv = deepcopy(sys.argv)
+        del sys.argv[1:]
+        self.saved = {}
+
+    def tearDown(self):
+        sys.argv = self.old_argv
+
+    def load(self):
+        def dump(log_printer, identifier, data):
+            self.saved[identifier] = data
+            return True
+
+        def load(log_printer, identifier, fallback=None):
+            return self.saved.get(identifier, fallback)
+
+        orig_collect = catalog_module.collect_all_bears_from_sections
+        with patch.object(catalog_module, "pickle_dump",
+                          side_effect=dump), \
+                patch.object(catalog_module, "pickle_load",
+                             side_effect=load), \
+                patch.object(catalog_module,
+                             "collect_all_bears_from_sections",
+                             side_effect=orig_collect) as collect:
+            catalog = BearCatalog.load(self.arg_parser)
+        return catalog, collect.called
+
+    def test_metadata(self):
+        with bear_test_module():
+            catalog, _ = self.load()
+        bears = {bear.name: bear for bear in catalog.bears}
+
+        linter = bears["SomeLinterBear"]
+        self.assertEqual(linter.get_executable(), "some_lint")
+        self.assertEqual(linter.CAN_DETECT, {"Syntax", "Security"})
+        self.assertEqual(linter.LANGUAGES, {"Javascript"})
+        self.assertTrue(linter.module_path.endswith("SomeLinterBear.py"))
+        self.assertTrue(linter.checks_executable_only())
+        self.assertIsNone(bears["SmellCapabilityBear"].get_executable())
+        self.assertFalse(bears["SmellCapabilityBear"].checks_executable_only())
+
+        settings_bear = bears["NonOptionalSettingBear"]
+        self.assertEqual(sorted(settings_bear.get_non_optional_settings()),
+                         ["another_setting", "non_optional_setting"])
+        self.assertEqual(settings_bear.REQUIREMENTS,
+                         {Requirement("npm", "some_linter", "2")})
+
+        self.assertEqual(bears["DependentBear"].BEAR_DEPS,
+                         {bears["SpaceConsistencyTestBear"]})
+        self.assertEqual(
+            {bear.name for bear in catalog.get_bears(["JavaScript"])},
+            {"SomeLinterBear", "NonOptionalSettingBear",
+             "SmellCapabilityBear", "LanguageSettingBear"})
+
+    def test_bears_are_not_imported_again(self):
+        with bear_test_module():
+            catalog, collected = self.load()
+            self.assertTrue(collected)
+            catalog, collected = self.load()
+            self.assertFalse(collected)
+        self.assertIn("SmellCapabilityBear",
+                      [bear.name for bear in catalog.bears])
+
+        # Other bear directories need another catalog
+        catalog, collected = self.load()
+        self.assertTrue(collected)
+
+    def test_load_bear(self):
+        with bear_test_module():
+            catalog, _ = self.load()
+        bear = [bear for bear in catalog.bears
+                if bear.name == "SmellCapabilityBear"][0]
+        self.assertEqual(bear.load().__name__, "SmellCapabilityBear")
+        # The results of checking its prerequisites are shared with the
+        # class
+        self.assertEqual(get_bear_key(bear), get_bear_key(bear.load()))
+        self.assertIs(bear.check_prerequisites(), True)
+
+    def test_load_bears(self):
+        with bear_test_module():
+            catalog, _ = self.load()
+        bears = {bear.name: bear for bear in catalog.bears}
+        with patch.object(catalog_module, "import_objects",
+                          wraps=catalog_module.import_objects) as imported:
+            classes = load_bears([bears["DependentBear"]])
+            self.assertEqual([bear.__name__ for bear in classes],
+                             ["SpaceConsistencyTestBear", "DependentBear"])
+            self.assertEqual(load_bears([bears["DependentBear"]]), classes)
+            self.assertEqual(imported.call_count, 1)
+
+    def test_get_catalog_key(self):
+        with tempfile.TemporaryDirectory() as bear_dir:
+            path = os.path.join(bear_dir, "SomeBear.py")
+            open(path, "w").close()
+            open(os.path.join(bear_dir, "README"), "w").close()
+            section = MagicMock()
+            section.bear_dirs.return_value = [
+                os.path.join(glob_escape(bear_dir), "**")]
+            sections = {"cli": section, "python": section}
+
+            key = get_catalog_key(sections)
+            self.assertEqual([file for file, _ in key[2]], [path])
+            self.assertEqual(get_catalog_key(sections), key)
+
+            stat = os.stat(path)
+            os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            self.assertNotEqual(get_catalog_key(sections), key)
+
+    def test_linter_options(self):
+        # Fails when coala is upgraded, so the layout _get_linter_options
+        # relies on is checked before the new version is added
+        self.assertIn(
+            get_coala_version(), SUPPORTED_COALA_VERSIONS,
+            "Check that _get_linter_options still finds the options of "
+            "linter bears with coala {}.".format(get_coala_version()))
+        options = _get_linter_options(create_linter(
+            executable_check_fail_info="Install it with npm."))
+        self.assertEqual(options["executable"], "some_lint")
+        self.assertEqual(options["executable_check_fail_info"],
+                         "Install it with npm.")
+        self.assertFalse(options["prerequisite_check_command"])
+
+        # Other coala versions check the prerequisites the usual way
+        with patch.object(catalog_module, "SUPPORTED_COALA_VERSIONS", ()):
+            self.assertIsNone(_get_linter_options(create_linter()))
+            info = BearInfo.from_bear(create_linter())
+        self.assertFalse(info.checks_executable_only())
+
+    def test_get_executable_check(self):
+        # Reads the options of the installed coala's linters, so a change of
+        # LinterClass turning the check off is noticed here
+        self.assertEqual(get_executable_check(create_linter()), "")
+        self.assertEqual(
+            get_executable_check(create_linter(
+                executable_check_fail_info="Install it with npm.")),
+            "Install it with npm.")
+        self.assertIsNone(get_executable_check(create_linter(
+            prerequisite_check_command=("some_lint", "--version"))))
+
+        class CheckingBear(create_linter()):
+
+            @classmethod
+            def check_prerequisites(cls):
+                return True
+
+        self.assertIsNone(get_executable_check(CheckingBear))
+        self.assertIsNone(get_executable_check(LocalBear))
+
+        with tempfile.TemporaryDirectory() as bin_dir, \
+                patch.dict("os.environ", {"PATH": bin_dir}):
+            bear = create_linter()
+            info = BearInfo.from_bear(bear)
+            self.assertTrue(info.checks_executable_only())
+            self.assertEqual(info.check_prerequisites(),
+                             bear.check_prerequisites())
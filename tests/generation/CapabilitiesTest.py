@@ -0,0 +1,68 @@
+import unittest
+
+from coala_quickstart.Constants import ALL_CAPABILITIES
+from coala_quickstart.generation.BearCatalog import BearInfo
+from coala_quickstart.generation.Bears import (
+    generate_capabilties_map, get_bears_capabilties,
+    get_bears_with_given_capabilities,
+    remove_bears_with_conflicting_capabilties)
+from coala_quickstart.generation.Capabilities import CapabilityIndex
+from coala_quickstart.generation.Prerequisites import PrerequisiteChecker
+
+
+class FakeBear(BearInfo):
+
+    def __init__(self, name, can_detect=(), can_fix=(), installed=False):
+        BearInfo.__init__(self, name, "", {"All"}, can_detect, can_fix)
+        self.installed = installed
+
+    def check_prerequisites(self):
+        return True if self.installed else "Not installed"
+
+
+class CapabilitiesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.syntax = FakeBear("SyntaxBear", can_detect={"Syntax"})
+        self.formatter = FakeBear("FormatBear", can_detect={"Syntax"},
+                                  can_fix={"Formatting"})
+        self.installed = FakeBear("InstalledBear", can_fix={"Formatting"},
+                                  installed=True)
+        self.custom = FakeBear("CustomBear", can_detect={"Naming"})
+
+    def test_index(self):
+        index = CapabilityIndex()
+        self.assertEqual(sorted(index.bits.values()),
+                         [1 << bit for bit in range(len(ALL_CAPABILITIES))])
+        self.assertEqual(index.get_bear_masks(self.formatter),
+                         (index.get_mask(["Syntax"]),
+                          index.get_mask(["Formatting"])))
+        mask = index.get_bear_mask(self.custom)
+        self.assertEqual(mask, 1 << len(ALL_CAPABILITIES))
+        self.assertEqual(index.get_capabilities(mask), {"Naming"})
+        self.assertEqual(list(index.iter_bits(0b1010)), [0b10, 0b1000])
+
+    def test_filtering(self):
+        bears = {self.syntax, self.formatter, self.installed, self.custom}
+        self.assertEqual(
+            get_bears_with_given_capabilities(bears, ["Formatting", "Smell"]),
+            {self.formatter, self.installed})
+        self.assertEqual(get_bears_with_given_capabilities(bears, []), set())
+        self.assertEqual(
+            get_bears_capabilties({"All": bears, "C": []}),
+            {"All": {"Syntax", "Formatting", "Naming"}, "C": set()})
+
+    def test_capabilities_map(self):
+        capabilities_map = generate_capabilties_map(
+            {"All": [self.syntax, self.formatter, self.installed]})
+        self.assertEqual(capabilities_map["Syntax"]["All"],
+                         {"DETECT": [self.formatter, self.syntax]})
+        self.assertEqual(capabilities_map["Formatting"]["All"],
+                         {"FIX": [self.formatter, self.installed]})
+
+    def test_conflicting_capabilities(self):
+        result = remove_bears_with_conflicting_capabilties(
+            {"All": [self.formatter, self.installed], "C": []},
+            PrerequisiteChecker())
+        self.assertIn(self.installed, result["All"])
+        self.assertEqual(result["C"], set())
@@ -0,0 +1,106 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from coala_quickstart.generation.ContentDetection import (
+    MAX_READ_SIZE, ContentDetector, detect_content)
+from coala_quickstart.generation.ProjectIndex import ProjectIndex
+
+
+class ContentDetectionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.contents = {
+            "deploy": "#!/usr/bin/env python\nprint(1)\n",
+            "run": "#!/bin/sh\necho 1\n",
+            "config": "# vim: set filetype=yaml :\na: 1\n",
+            "Dockerfile": "FROM python\n",
+            "README": "Read me\n",
+            "main.py": "print(1)\n",
+        }
+        self.paths = {}
+        for name, content in self.contents.items():
+            path = os.path.join(self.tempdir.name, name)
+            with open(path, "w") as file:
+                file.write(content)
+            self.paths[name] = path
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_detect_content(self):
+        self.assertEqual(detect_content(b"#!/usr/bin/ruby -w\n"), "Ruby")
+        self.assertEqual(detect_content(b"\xff\xfe\0\0binary"), None)
+        self.assertEqual(
+            detect_content(b"#!/bin/false\n# -*- mode: perl -*-\n"), "Perl")
+
+    def test_detect(self):
+        detector = ContentDetector()
+        self.assertEqual(detector.detect(self.paths["deploy"]), "Python")
+        self.assertEqual(detector.detect(self.paths["run"]), "sh")
+        self.assertEqual(detector.detect(self.paths["config"]), "YAML")
+        self.assertEqual(detector.detect(self.paths["Dockerfile"]),
+                         "Dockerfile")
+        self.assertIsNone(detector.detect(self.paths["README"]))
+        self.assertIsNone(detector.detect(
+            os.path.join(self.tempdir.name, "missing")))
+
+    def test_bounded_reads(self):
+        path = os.path.join(self.tempdir.name, "large")
+        with open(path, "w") as file:
+            file.write("#!/usr/bin/perl\n" + "x" * 100000)
+
+        read_sizes = []
+        orig_open = open
+
+        def recording_open(*args, **kwargs):
+            file = orig_open(*args, **kwargs)
+            orig_read = file.read
+
+            def read(size=-1):
+                read_sizes.append(size)
+                return orig_read(size)
+
+            file.read = read
+            return file
+
+        with patch("builtins.open", recording_open):
+            self.assertEqual(ContentDetector().detect(path), "Perl")
+        self.assertEqual(read_sizes, [MAX_READ_SIZE])
+
+    def test_cache(self):
+        detector = ContentDetector()
+        detector.detect(self.paths["deploy"])
+        detector.detect(self.paths["Dockerfile"])
+        self.assertEqual(list(detector.used_cache.values()), ["Python"])
+
+        detector = ContentDetector(cache=detector.used_cache)
+        with patch("builtins.open") as mock_open:
+            self.assertEqual(detector.detect(self.paths["deploy"]), "Python")
+            self.assertFalse(mock_open.called)
+
+        # A modified file is read again
+        with open(self.paths["deploy"], "a") as file:
+            file.write("print(2)\n")
+        detector.cache = {key: "Ruby" for key in detector.cache}
+        self.assertEqual(detector.detect(self.paths["deploy"]), "Python")
+
+    def test_detect_all(self):
+        names = sorted(self.paths) * 20
+        detector = ContentDetector(jobs=4, batch_size=7)
+        self.assertEqual(detector.detect_all([self.paths[name]
+                                              for name in names]),
+                         [ContentDetector().detect(self.paths[name])
+                          for name in names])
+
+    def test_project_index(self):
+        index = ProjectIndex(sorted(self.paths.values()),
+                             detector=ContentDetector(batch_size=2, jobs=1))
+        self.assertEqual(index.total, 6)
+        self.assertEqual(index.get_language_counts(),
+                         {"Dockerfile": 1, "Python": 2, "YAML": 1, "sh": 1})
+        self.assertEqual(index.detected_files["Python"],
+                         [self.paths["deploy"]])
+        self.assertEqual(index.get_extensions(), {"python": {".py"}})
@@ -0,0 +1,117 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from pyprint.ConsolePrinter import ConsolePrinter
+from coala_utils.ContextManagers import retrieve_stdout
+from coala_quickstart.generation.EnvironmentDirs import EnvironmentDetector
+from coala_quickstart.generation.FileGlobs import iter_project_files
+from coala_quickstart.generation.FileWalker import (
+    filter_files, parallel_walk_files, sample_walk_files, walk_files)
+
+
+class EnvironmentDirsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = self.tempdir.name
+        self.files = [os.path.join("src", "main.py"),
+                      os.path.join("src", "__pycache__", "main.pyc"),
+                      os.path.join("env", "pyvenv.cfg"),
+                      os.path.join("env", "lib", "six.py"),
+                      os.path.join("web", "node_modules", "pkg", "index.js"),
+                      os.path.join("vendor", "bundle", "ruby", "gem.rb"),
+                      os.path.join("vendor", "lib.rb"),
+                      os.path.join(".tox", "py36", "lib.py")]
+        for file in self.files:
+            path = os.path.join(self.root, file)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "w").close()
+
+        self.expected = [os.path.join(self.root, "src", "main.py"),
+                         os.path.join(self.root, "vendor", "lib.rb")]
+        self.found = {"env",
+                      ".tox",
+                      os.path.join("src", "__pycache__"),
+                      os.path.join("vendor", "bundle"),
+                      os.path.join("web", "node_modules")}
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_match_path(self):
+        detector = EnvironmentDetector()
+        self.assertTrue(detector.match_path(os.path.join("a", ".tox")))
+        self.assertTrue(detector.match_path(os.path.join("vendor", "bundle")))
+        self.assertFalse(detector.match_path("bundle"))
+        self.assertFalse(detector.match_path("vendor"))
+        self.assertEqual(detector.found,
+                         {os.path.join("a", ".tox"),
+                          os.path.join("vendor", "bundle")})
+
+    def test_walkers(self):
+        walkers = [walk_files,
+                   lambda *args, **kwargs: parallel_walk_files(
+                       *args, jobs=3, **kwargs),
+                   sample_walk_files]
+        for walker in walkers:
+            detector = EnvironmentDetector()
+            files = walker(self.root, environment_detector=detector)
+            self.assertEqual(sorted(files), self.expected)
+            self.assertEqual(detector.found, self.found)
+
+    def test_environments_are_not_descended(self):
+        listed = []
+        orig_scandir = os.scandir
+
+        def scandir(path):
+            listed.append(os.path.relpath(path, self.root))
+            return orig_scandir(path)
+
+        with patch("os.scandir", side_effect=scandir):
+            list(walk_files(self.root,
+                            environment_detector=EnvironmentDetector()))
+
+        # The virtualenv is listed to find its marker, but nothing in it
+        self.assertEqual(sorted(listed),
+                         [".", "env", "src", "vendor", "web"])
+
+    def test_filter_files(self):
+        detector = EnvironmentDetector()
+        relpaths = [file.replace(os.sep, "/") for file in self.files]
+        files = filter_files(self.root, relpaths,
+                             environment_detector=detector)
+        # The virtualenv is recognized by its marker among the paths
+        self.assertEqual(sorted(files), self.expected)
+        self.assertEqual(detector.found, self.found)
+
+        detector = EnvironmentDetector()
+        files = filter_files(self.root,
+                             [(relpath, 0) for relpath in relpaths] +
+                             [("conda/conda-meta/history", 0),
+                              ("conda/lib/six.py", 0)],
+                             with_sizes=True,
+                             environment_detector=detector)
+        self.assertEqual(sorted(path for path, _ in files), self.expected)
+        self.assertEqual(detector.found, self.found | {"conda"})
+
+    def test_iter_project_files(self):
+        with retrieve_stdout() as stdout:
+            files, ignore_globs = iter_project_files(
+                None, ConsolePrinter(), self.root, None,
+                non_interactive=True)
+            self.assertEqual(sorted(files), self.expected)
+            output = stdout.getvalue()
+
+        self.assertIn("    " + os.path.join("web", "node_modules") + "\n",
+                      output)
+        self.assertEqual(ignore_globs,
+                         [os.path.join(self.root, path, "**")
+                          for path in sorted(self.found)])
+
+        files, ignore_globs = iter_project_files(
+            None, ConsolePrinter(), self.root, None, non_interactive=True,
+            exclude_environments=False)
+        self.assertEqual(len(list(files)), len(self.files))
+        self.assertEqual(ignore_globs, [])
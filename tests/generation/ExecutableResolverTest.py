@@ -0,0 +1,75 @@
+import os
+import stat
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from coala_quickstart.generation.ExecutableResolver import (
+    ExecutableResolver)
+
+
+class ExecutableResolverTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.first = os.path.join(self.tempdir.name, "first")
+        self.second = os.path.join(self.tempdir.name, "second")
+        os.mkdir(self.first)
+        os.mkdir(self.second)
+        self.path = os.pathsep.join([self.first, self.second])
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def add_file(self, directory, name, executable=True):
+        path = os.path.join(directory, name)
+        open(path, "w").close()
+        if executable:
+            os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR)
+        return path
+
+    def touch(self, directory):
+        mtime = os.stat(directory).st_mtime_ns + 10**9
+        os.utime(directory, ns=(mtime, mtime))
+
+    def test_find_executable(self):
+        self.add_file(self.first, "lint", executable=False)
+        lint = self.add_file(self.second, "lint")
+        self.add_file(self.second, "notes.txt", executable=False)
+        os.mkdir(os.path.join(self.first, "tool"))
+
+        resolver = ExecutableResolver(self.path)
+        self.assertEqual(resolver.find_executable("lint"), lint)
+        self.assertFalse(resolver.has_executable("notes.txt"))
+        self.assertFalse(resolver.has_executable("tool"))
+        self.assertFalse(resolver.has_executable("missing"))
+        self.assertTrue(resolver.has_executable(lint))
+
+    def test_directories_are_scanned_once(self):
+        self.add_file(self.first, "lint")
+        resolver = ExecutableResolver(self.path)
+        with patch("os.scandir", wraps=os.scandir) as scandir:
+            self.assertTrue(resolver.update())
+            for name in ["lint", "other", "lint"]:
+                resolver.has_executable(name)
+            self.assertFalse(resolver.update())
+        self.assertEqual(scandir.call_count, 2)
+
+    def test_directory_changes(self):
+        resolver = ExecutableResolver(self.path)
+        self.assertFalse(resolver.has_executable("lint"))
+
+        self.add_file(self.second, "lint")
+        self.touch(self.second)
+        with patch("os.scandir", wraps=os.scandir) as scandir:
+            self.assertTrue(resolver.update())
+        scandir.assert_called_once_with(self.second)
+        self.assertTrue(resolver.has_executable("lint"))
+
+    def test_path_changes(self):
+        self.add_file(self.second, "lint")
+        resolver = ExecutableResolver()
+        with patch.dict(os.environ, {"PATH": self.first}):
+            self.assertFalse(resolver.has_executable("lint"))
+        with patch.dict(os.environ, {"PATH": self.path}):
+            self.assertTrue(resolver.has_executable("lint"))
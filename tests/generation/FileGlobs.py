@@ -1,13 +1,17 @@
 import os
+import tempfile
 import unittest
 
 from pyprint.ConsolePrinter import ConsolePrinter
 from coala_utils.ContextManagers import (
-    simulate_console_inputs, suppress_stdout)
+    retrieve_stdout, simulate_console_inputs, suppress_stdout)
 from coala_utils.FilePathCompleter import FilePathCompleter
-from coala_quickstart.generation.FileGlobs import get_project_files
+from coala_quickstart.generation.FileGlobs import (
+    get_project_files, iter_project_files)
 from coala_quickstart.generation.Utilities import get_gitignore_glob
+from coala_quickstart.generation.Snapshot import WalkSnapshot
 from coalib.collecting.Collectors import collect_files
+from tests.generation.GitIndexTest import build_index
 
 
 class TestQuestion(unittest.TestCase):
@@ -130,3 +134,152 @@ __pycache__
                 self.assertIn(os.path.normcase(path), res)
 
         os.chdir(orig_cwd)
+
+    def test_get_project_files_nested_gitignore(self):
+        with tempfile.TemporaryDirectory() as project_dir:
+            contents = {
+                ".gitignore": "*.log\n",
+                os.path.join("pkg", ".gitignore"): "!keep.log\nout/\n",
+                os.path.join("pkg", "keep.log"): "",
+                os.path.join("pkg", "debug.log"): "",
+                os.path.join("pkg", "out", "main.o"): "",
+                os.path.join("pkg", "main.c"): "",
+            }
+            for path, content in contents.items():
+                path = os.path.join(project_dir, path)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "w") as file:
+                    file.write(content)
+
+            with retrieve_stdout() as stdout:
+                res, ignore_globs = get_project_files(
+                    self.log_printer,
+                    self.printer,
+                    project_dir,
+                    self.file_path_completer,
+                    True)
+                # keep.log is walked, but ignored by the globs of *.log
+                self.assertIn("are not supported in the coafile",
+                              stdout.getvalue())
+                self.assertIn("    {}: !keep.log".format(
+                    os.path.join("pkg", ".gitignore")), stdout.getvalue())
+
+            self.assertEqual(sorted(res), sorted(
+                os.path.join(project_dir, path) for path in [
+                    ".gitignore",
+                    os.path.join("pkg", ".gitignore"),
+                    os.path.join("pkg", "keep.log"),
+                    os.path.join("pkg", "main.c")]))
+            self.assertIn(os.path.join(project_dir, "pkg", "**", "out", "**"),
+                          ignore_globs)
+
+            with suppress_stdout():
+                parallel_res, parallel_ignore_globs = get_project_files(
+                    self.log_printer,
+                    self.printer,
+                    project_dir,
+                    self.file_path_completer,
+                    True,
+                    walk_jobs=4)
+            self.assertEqual(parallel_res, res)
+            self.assertEqual(parallel_ignore_globs, ignore_globs)
+
+            with suppress_stdout():
+                file_paths, streamed_ignore_globs = iter_project_files(
+                    self.log_printer,
+                    self.printer,
+                    project_dir,
+                    self.file_path_completer,
+                    True)
+            self.assertEqual(streamed_ignore_globs, [])
+            self.assertEqual(next(file_paths), res[0])
+            self.assertEqual([res[0]] + list(file_paths), res)
+            self.assertEqual(streamed_ignore_globs, ignore_globs)
+
+            with suppress_stdout():
+                file_paths, sampled_ignore_globs = iter_project_files(
+                    self.log_printer,
+                    self.printer,
+                    project_dir,
+                    self.file_path_completer,
+                    True,
+                    sample=True)
+                # Random draws, with their probabilities
+                self.assertEqual(
+                    sorted(set(path for path, _, _ in file_paths)),
+                    sorted(res))
+            self.assertEqual(sampled_ignore_globs, ignore_globs)
+
+            with suppress_stdout():
+                file_paths, sampled_ignore_globs = iter_project_files(
+                    self.log_printer,
+                    self.printer,
+                    project_dir,
+                    self.file_path_completer,
+                    True,
+                    sample=True)
+            next(file_paths)
+            file_paths.close()
+            # The globs of the .gitignore in the root are always included
+            self.assertIn(os.path.join(project_dir, "**", "*.log"),
+                          sampled_ignore_globs)
+
+    def test_get_gitignore_glob_negated(self):
+        with tempfile.TemporaryDirectory() as project_dir:
+            with open(os.path.join(project_dir, ".gitignore"), "w") as file:
+                file.write("*.log\n!keep.log\n\\!bang.txt\n")
+            negated = []
+            globs = list(get_gitignore_glob(project_dir, negated=negated))
+            self.assertEqual(negated, ["!keep.log"])
+            self.assertNotIn(os.path.join(project_dir, "keep.log"), globs)
+            self.assertIn(os.path.join(project_dir, "**", "*.log"), globs)
+
+    def test_get_project_files_git_index(self):
+        with tempfile.TemporaryDirectory() as project_dir:
+            for path in ["tracked.c", "untracked.c", ".gitignore"]:
+                open(os.path.join(project_dir, path), "w").close()
+            os.makedirs(os.path.join(project_dir, ".git"))
+            with open(os.path.join(project_dir, ".gitignore"), "w") as file:
+                file.write("*.o\n")
+            with open(os.path.join(project_dir, ".git", "index"), "wb") as f:
+                f.write(build_index([".gitignore", "forced.o", "link.c",
+                                     "tracked.c"],
+                                    modes={"link.c": 0o120000}))
+
+            with retrieve_stdout() as stdout:
+                res, _ = get_project_files(self.log_printer,
+                                           self.printer,
+                                           project_dir,
+                                           self.file_path_completer,
+                                           True,
+                                           use_git_index=True)
+                self.assertIn("untracked files are left out",
+                              stdout.getvalue())
+            self.assertEqual(res, [os.path.join(project_dir, ".gitignore"),
+                                   os.path.join(project_dir, "tracked.c")])
+
+            with retrieve_stdout() as stdout:
+                file_paths, _ = iter_project_files(self.log_printer,
+                                                   self.printer,
+                                                   project_dir,
+                                                   self.file_path_completer,
+                                                   True,
+                                                   use_git_index=True,
+                                                   with_sizes=True,
+                                                   snapshot=WalkSnapshot(
+                                                       project_dir))
+                # The sizes are taken from the index
+                self.assertEqual(list(file_paths),
+                                 [(path, len(os.path.basename(path)))
+                                  for path in res])
+                self.assertIn("The snapshot is only used when walking",
+                              stdout.getvalue())
+
+            with suppress_stdout():
+                res, _ = get_project_files(self.log_printer,
+                                           self.printer,
+                                           project_dir,
+                                           self.file_path_completer,
+                                           True)
+            # The project directory is walked by default
+            self.assertIn(os.path.join(project_dir, "untracked.c"), res)
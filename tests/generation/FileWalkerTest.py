@@ -0,0 +1,279 @@
+import itertools
+import os
+import random
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from coalib.collecting.Collectors import collect_files
+from coala_quickstart.generation.FileWalker import (
+    filter_files, parallel_walk_files, sample_walk_files, walk_files)
+
+
+class FileWalkerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = self.tempdir.name
+        files = [os.path.join("src", "main.c"),
+                 os.path.join("src", "main.pyc"),
+                 os.path.join("src", "lib", "ssl.c"),
+                 os.path.join("src", "node_modules", "pkg", "index.js"),
+                 os.path.join("node_modules", "pkg", "index.js"),
+                 os.path.join("build", "out", "main.o"),
+                 ".hidden",
+                 "root.c"]
+        for file in files:
+            path = os.path.join(self.root, file)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            open(path, "w").close()
+
+        self.ignore_globs = [
+            os.path.join(self.root, "**", "node_modules", "**"),
+            os.path.join(self.root, "node_modules", "**"),
+            os.path.join(self.root, "build", "**"),
+            os.path.join(self.root, "**.pyc")]
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_same_files_as_collect_files(self):
+        expected = collect_files([os.path.join(self.root, "**")],
+                                 ignored_file_paths=self.ignore_globs)
+        self.assertEqual(sorted(walk_files(self.root, self.ignore_globs)),
+                         sorted(expected))
+
+        expected = collect_files([os.path.join(self.root, "**")])
+        self.assertEqual(sorted(walk_files(self.root)), sorted(expected))
+
+    def test_ignored_directories_are_not_listed(self):
+        listed = []
+        orig_scandir = os.scandir
+
+        def scandir(path):
+            listed.append(os.path.relpath(path, self.root))
+            return orig_scandir(path)
+
+        with patch("os.scandir", side_effect=scandir):
+            files = list(walk_files(self.root, self.ignore_globs))
+
+        self.assertIn(os.path.join(self.root, "src", "lib", "ssl.c"), files)
+        self.assertEqual(sorted(listed),
+                         [".", "src", os.path.join("src", "lib")])
+
+    def test_sorted_output(self):
+        files = list(walk_files(self.root))
+        self.assertEqual(files[:2], [os.path.join(self.root, ".hidden"),
+                                     os.path.join(self.root, "root.c")])
+
+    def test_filter_files(self):
+        relpaths = ["src/main.c", "src/main.pyc", "src/lib/ssl.c",
+                    "node_modules/pkg/index.js", "build/out/main.o",
+                    ".hidden", "root.c"]
+        self.assertEqual(
+            sorted(filter_files(self.root, relpaths, self.ignore_globs)),
+            sorted(walk_files(self.root, self.ignore_globs)))
+
+    def test_parallel_walk_files(self):
+        for index in range(20):
+            path = os.path.join(self.root, "src", "pkg" + str(index % 4),
+                                "sub" + str(index), "module.c")
+            os.makedirs(os.path.dirname(path))
+            open(path, "w").close()
+
+        for ignore_globs in ((), self.ignore_globs):
+            expected = list(walk_files(self.root, ignore_globs))
+            for jobs in (1, 2, 8):
+                self.assertEqual(
+                    list(parallel_walk_files(self.root, ignore_globs,
+                                             jobs=jobs)),
+                    expected)
+
+    def test_parallel_walk_files_error(self):
+        def scandir(path):
+            raise RuntimeError(path)
+
+        with patch("os.scandir", side_effect=scandir):
+            with self.assertRaises(RuntimeError):
+                list(parallel_walk_files(self.root, jobs=4))
+
+    def test_with_sizes(self):
+        with open(os.path.join(self.root, "root.c"), "w") as file:
+            file.write("int a;\n")
+
+        expected = [(path, os.stat(path).st_size)
+                    for path in walk_files(self.root, self.ignore_globs)]
+        self.assertIn((os.path.join(self.root, "root.c"), 7), expected)
+        self.assertEqual(list(walk_files(self.root, self.ignore_globs,
+                                         with_sizes=True)),
+                         expected)
+        self.assertEqual(list(parallel_walk_files(self.root,
+                                                  self.ignore_globs,
+                                                  with_sizes=True)),
+                         expected)
+        self.assertEqual(
+            list(filter_files(self.root, [("root.c", 7), ("build/a", 1)],
+                              self.ignore_globs, with_sizes=True)),
+            [(os.path.join(self.root, "root.c"), 7)])
+
+    def test_sample_walk_files(self):
+        big_dir = os.path.join(self.root, "fixtures")
+        os.makedirs(big_dir)
+        for index in range(200):
+            open(os.path.join(big_dir, "{}.json".format(index)), "w").close()
+
+        expected = list(walk_files(self.root, self.ignore_globs))
+        sampled = list(sample_walk_files(self.root, self.ignore_globs,
+                                         rng=random.Random(1)))
+        self.assertNotEqual(sampled, expected)
+        self.assertEqual(sorted(sampled), sorted(expected))
+
+        draws = list(sample_walk_files(self.root, self.ignore_globs,
+                                       with_sizes=True,
+                                       rng=random.Random(1),
+                                       with_probabilities=True))
+        self.assertEqual(sorted(set(path for path, _, _ in draws)),
+                         sorted(expected))
+        self.assertEqual(set(size for _, size, _ in draws), {0})
+        # The root has its files, src and fixtures to choose from, src its
+        # files and lib
+        probabilities = dict((path, probability)
+                             for path, _, probability in draws)
+        self.assertAlmostEqual(
+            probabilities[os.path.join(big_dir, "0.json")], 1 / 3 / 200)
+        self.assertAlmostEqual(
+            probabilities[os.path.join(self.root, "root.c")], 1 / 3 / 2)
+        self.assertAlmostEqual(
+            probabilities[os.path.join(self.root, "src", "lib", "ssl.c")],
+            1 / 3 / 2)
+
+        # Weighted by the inverse of their probabilities, the draws
+        # estimate the number of files
+        draws = sample_walk_files(self.root, self.ignore_globs,
+                                  rng=random.Random(2),
+                                  with_probabilities=True)
+        estimates = [1 / probability for _, _, probability
+                     in itertools.islice(draws, 3000)]
+        self.assertAlmostEqual(sum(estimates) / len(estimates),
+                               len(expected), delta=len(expected) * 0.1)
+
+    @unittest.skipIf(not hasattr(os, "symlink"), "needs symbolic links")
+    def test_symlinks(self):
+        os.makedirs(os.path.join(self.root, "pkg"))
+        open(os.path.join(self.root, "pkg", "lib.js"), "w").close()
+        os.symlink(os.path.join(self.root, "pkg"),
+                   os.path.join(self.root, "src", "pkg_link"))
+        # A loop back to the root and a link to a file
+        os.symlink(self.root, os.path.join(self.root, "pkg", "loop"))
+        os.symlink(os.path.join(self.root, "root.c"),
+                   os.path.join(self.root, "alias.c"))
+
+        expected = list(walk_files(self.root, self.ignore_globs))
+        self.assertNotIn(os.path.join(self.root, "alias.c"), expected)
+        self.assertIn(os.path.join(self.root, "pkg", "lib.js"), expected)
+
+        for walker in [walk_files, parallel_walk_files, sample_walk_files]:
+            followed = list(walker(self.root, self.ignore_globs,
+                                   follow_symlinks=True))
+            # Every file is found once, through one of its paths
+            self.assertEqual(len(followed), len(expected))
+            self.assertEqual(
+                sorted(os.path.realpath(path) for path in followed),
+                sorted(os.path.realpath(path) for path in expected))
+
+        # The paths not going through links are kept, whatever the order
+        followed = list(walk_files(self.root, self.ignore_globs,
+                                   follow_symlinks=True))
+        self.assertEqual(followed, expected)
+        for _ in range(5):
+            self.assertEqual(
+                list(parallel_walk_files(self.root, self.ignore_globs,
+                                         follow_symlinks=True, jobs=4)),
+                expected)
+
+    @unittest.skipIf(not hasattr(os, "symlink"), "needs symbolic links")
+    def test_symlinks_to_a_directory(self):
+        nested = os.path.join(self.root, "a", "b")
+        os.makedirs(nested)
+        open(os.path.join(nested, "f.py"), "w").close()
+        os.symlink(os.path.join(nested, "f.py"),
+                   os.path.join(self.root, "link.py"))
+        os.symlink(nested, os.path.join(self.root, "b_link"))
+        os.symlink(nested, os.path.join(self.root, "src", "b_link"))
+
+        for walker in [walk_files, parallel_walk_files]:
+            followed = list(walker(self.root, self.ignore_globs,
+                                   follow_symlinks=True))
+            self.assertIn(os.path.join(nested, "f.py"), followed)
+            self.assertEqual(
+                [path for path in followed if path.endswith(".py")],
+                [os.path.join(nested, "f.py")])
+
+    @unittest.skipIf(not hasattr(os, "symlink"), "needs symbolic links")
+    def test_symlink_diamonds(self):
+        # Every level links to the next one twice, so there are 2 ** levels
+        # paths to the last one
+        levels = 12
+        for level in range(levels):
+            directory = os.path.join(self.root, "d{}".format(level))
+            os.mkdir(directory)
+            open(os.path.join(directory, "f.c"), "w").close()
+        for level in range(levels - 1):
+            target = os.path.join(self.root, "d{}".format(level + 1))
+            for name in ["left", "right"]:
+                os.symlink(target, os.path.join(self.root,
+                                                "d{}".format(level), name))
+        expected = list(walk_files(self.root, self.ignore_globs))
+
+        orig_scandir = os.scandir
+        for walker in [walk_files, parallel_walk_files, sample_walk_files]:
+            listed = []
+
+            def scandir(path):
+                listed.append(os.path.realpath(path))
+                return orig_scandir(path)
+
+            with patch("os.scandir", side_effect=scandir):
+                followed = list(walker(self.root, self.ignore_globs,
+                                       follow_symlinks=True))
+            # Every directory is listed once
+            self.assertEqual(len(listed), len(set(listed)))
+            self.assertEqual(sorted(map(os.path.realpath, followed)),
+                             sorted(map(os.path.realpath, expected)))
+            if walker is not sample_walk_files:
+                # Through the paths not going through a link
+                self.assertEqual(followed, expected)
+
+    def test_subtrees_and_max_depth(self):
+        listed = []
+        orig_scandir = os.scandir
+
+        def scandir(path):
+            listed.append(os.path.relpath(path, self.root))
+            return orig_scandir(path)
+
+        subtrees = [os.path.join("src", "lib")]
+        with patch("os.scandir", side_effect=scandir):
+            files = list(walk_files(self.root, subtrees=subtrees))
+        self.assertEqual(files, [os.path.join(self.root, "src", "lib",
+                                              "ssl.c")])
+        self.assertEqual(sorted(listed), [".", "src", subtrees[0]])
+
+        self.assertEqual(
+            sorted(parallel_walk_files(self.root, self.ignore_globs,
+                                       max_depth=1)),
+            [os.path.join(self.root, ".hidden"),
+             os.path.join(self.root, "root.c"),
+             os.path.join(self.root, "src", "main.c")])
+        self.assertEqual(
+            sorted(sample_walk_files(self.root, max_depth=0)),
+            [os.path.join(self.root, ".hidden"),
+             os.path.join(self.root, "root.c")])
+
+        relpaths = ["root.c", "src/main.c", "src/lib/ssl.c",
+                    "src/lib/x/y.c"]
+        self.assertEqual(
+            list(filter_files(self.root, relpaths, subtrees=["src"],
+                              max_depth=2)),
+            [os.path.join(self.root, "src", "main.c"),
+             os.path.join(self.root, "src", "lib", "ssl.c")])
@@ -0,0 +1,94 @@
+import os
+import tempfile
+import unittest
+
+from coala_quickstart.generation.GeneratedFiles import (
+    GENERATED, MINIFIED, VENDORED, GeneratedFileClassifier, classify_content)
+from coala_quickstart.generation.ProjectIndex import ProjectIndex
+
+
+class GeneratedFilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = self.tempdir.name
+        self.contents = {
+            "main.py": "import os\n\nprint(os.getcwd())\n",
+            "api.go": "// Code generated by protoc-gen-go. DO NOT EDIT.\n"
+                      "package api\n",
+            "app.js": "var a=1;" * 1000,
+            "parser.py": "#!/usr/bin/env python\n# Copyright\n#\n"
+                         "# This file was generated by ply, version 3.\n",
+            "lib/vendor/six.py": "print(6)\n",
+            "static/jquery.min.js": "\n",
+            "README": "x" * 5000,
+        }
+        self.paths = {}
+        for name, content in self.contents.items():
+            path = os.path.join(self.root, *name.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as file:
+                file.write(content)
+            self.paths[name] = path
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_classify_content(self):
+        self.assertEqual(classify_content(b"/* @generated */\nint a;\n"),
+                         GENERATED)
+        self.assertEqual(classify_content(b"a{b:c}" * 500), MINIFIED)
+        self.assertIsNone(classify_content(b"import os\n" * 500))
+        # Markers are only searched in the header
+        self.assertIsNone(classify_content(b"a = 1\n" * 30 +
+                                           b"# DO NOT EDIT\n"))
+
+    def test_classify_path(self):
+        classifier = GeneratedFileClassifier(self.root)
+        self.assertEqual(
+            classifier.classify_path(self.paths["lib/vendor/six.py"]),
+            (os.path.join(self.root, "lib", "vendor", "**"), VENDORED))
+        self.assertEqual(
+            classifier.classify_path(self.paths["static/jquery.min.js"]),
+            (os.path.join(self.root, "**.min.js"), MINIFIED))
+        self.assertEqual(
+            classifier.classify_path(os.path.join(self.root, "a_pb2.py")),
+            (os.path.join(self.root, "**_pb2.py"), GENERATED))
+        self.assertIsNone(classifier.classify_path(self.paths["main.py"]))
+        # Only the directories below the project directory are checked
+        classifier = GeneratedFileClassifier(
+            os.path.join(self.root, "lib", "vendor"))
+        self.assertIsNone(
+            classifier.classify_path(self.paths["lib/vendor/six.py"]))
+
+    def test_classify_all(self):
+        names = sorted(self.paths) * 10
+        classifier = GeneratedFileClassifier(self.root, jobs=3, batch_size=4)
+        self.assertEqual(
+            classifier.classify_all([self.paths[name] for name in names]),
+            [classifier.classify(self.paths[name]) for name in names])
+        self.assertEqual(classifier.classify(self.paths["api.go"]),
+                         GENERATED)
+        self.assertEqual(classifier.classify(self.paths["parser.py"]),
+                         GENERATED)
+        self.assertEqual(classifier.classify(self.paths["app.js"]), MINIFIED)
+        self.assertIsNone(classifier.classify(self.paths["main.py"]))
+        self.assertIsNone(
+            classifier.classify(os.path.join(self.root, "missing")))
+
+    def test_project_index(self):
+        classifier = GeneratedFileClassifier(self.root, batch_size=2, jobs=1)
+        index = ProjectIndex(sorted(self.paths.values()), keep_paths=True,
+                             classifier=classifier)
+        self.assertEqual(index.total, 7)
+        self.assertEqual(index.get_language_counts(), {"Python": 1})
+        self.assertEqual(sorted(index.get_files()),
+                         [self.paths["README"], self.paths["main.py"]])
+        self.assertEqual(index.excluded_counts,
+                         {GENERATED: 2, MINIFIED: 2, VENDORED: 1})
+        self.assertEqual(
+            sorted(index.get_excluded_globs()),
+            sorted([self.paths["api.go"], self.paths["app.js"],
+                    self.paths["parser.py"],
+                    os.path.join(self.root, "lib", "vendor", "**"),
+                    os.path.join(self.root, "**.min.js")]))
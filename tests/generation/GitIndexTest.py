@@ -0,0 +1,104 @@
+import os
+import struct
+import tempfile
+import unittest
+
+from coala_quickstart.generation.GitIndex import (
+    get_git_dir, get_tracked_files, parse_git_index)
+
+
+def encode_offset(value):
+    result = [value & 0x7f]
+    value >>= 7
+    while value:
+        value -= 1
+        result.append(0x80 | (value & 0x7f))
+        value >>= 7
+    return bytes(reversed(result))
+
+
+def build_index(paths, version=2, skip_worktree=(), modes={}):
+    """
+    Builds the contents of a git index listing the given paths.
+    """
+    data = struct.pack(">4sII", b"DIRC", version, len(paths))
+    previous = b""
+    for path in paths:
+        name = path.encode("utf-8")
+        flags = min(len(name), 0xfff)
+        extended = path in skip_worktree
+        if extended:
+            flags |= 0x4000
+        entry = struct.pack(">IIIIIIIIII20sH", 0, 0, 1500000000, 0, 0, 0,
+                            modes.get(path, 0o100644), 0, 0, len(path),
+                            b"\0" * 20, flags)
+        if extended:
+            entry += struct.pack(">H", 0x4000)
+        if version == 4:
+            common = len(os.path.commonprefix([previous, name]))
+            entry += (encode_offset(len(previous) - common) +
+                      name[common:] + b"\0")
+        else:
+            entry += name + b"\0"
+            entry += b"\0" * (-len(entry) % 8)
+        data += entry
+        previous = name
+    return data + b"TREE" + struct.pack(">I", 0) + b"\0" * 20
+
+
+class GitIndexTest(unittest.TestCase):
+
+    paths = [".gitignore", "src/lib/ssl.c", "src/lib/ssl.h",
+             "src/main.c", "src/sub", "z" * 300]
+
+    def test_versions(self):
+        for version in (2, 3, 4):
+            entries = parse_git_index(build_index(self.paths, version))
+            self.assertEqual([entry.path for entry in entries], self.paths)
+            self.assertEqual(entries[1].size, len("src/lib/ssl.c"))
+            self.assertEqual(entries[1].mtime, 1500000000)
+
+    def test_skipped_entries(self):
+        data = build_index(self.paths, 3,
+                           skip_worktree=["src/main.c"],
+                           modes={"src/sub": 0o160000})
+        self.assertEqual([entry.path for entry in parse_git_index(data)],
+                         [".gitignore", "src/lib/ssl.c", "src/lib/ssl.h",
+                          "z" * 300])
+
+    def test_invalid_index(self):
+        with self.assertRaisesRegex(ValueError, "not a git index"):
+            parse_git_index(b"XXXX" + b"\0" * 20)
+        with self.assertRaisesRegex(ValueError, "version 5"):
+            parse_git_index(struct.pack(">4sII", b"DIRC", 5, 0))
+        with self.assertRaisesRegex(ValueError, "truncated"):
+            parse_git_index(build_index(self.paths)[:50])
+        with self.assertRaisesRegex(ValueError, "Split"):
+            parse_git_index(build_index([])[:-28] +
+                            b"link" + struct.pack(">I", 0) + b"\0" * 20)
+
+    def test_get_tracked_files(self):
+        with tempfile.TemporaryDirectory() as project_dir:
+            self.assertIsNone(get_git_dir(project_dir))
+            self.assertIsNone(get_tracked_files(project_dir))
+
+            os.makedirs(os.path.join(project_dir, ".git"))
+            self.assertIsNone(get_tracked_files(project_dir))
+
+            with open(os.path.join(project_dir, ".git", "index"), "wb") as f:
+                f.write(build_index(self.paths, 4))
+            self.assertEqual(
+                [entry.path for entry in get_tracked_files(project_dir)],
+                self.paths)
+
+    def test_gitdir_file(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            project_dir = os.path.join(tempdir, "worktree")
+            git_dir = os.path.join(tempdir, "git_dir")
+            os.makedirs(project_dir)
+            os.makedirs(git_dir)
+            with open(os.path.join(project_dir, ".git"), "w") as file:
+                file.write("gitdir: ../git_dir\n")
+
+            self.assertEqual(os.path.realpath(get_git_dir(project_dir)),
+                             os.path.realpath(git_dir))
@@ -0,0 +1,157 @@
+import os
+import unittest
+from unittest.mock import patch
+
+from coala_quickstart.generation import GlobMinimizer
+from coala_quickstart.generation.GlobMinimizer import (
+    count_project_files, covers, covers_all, get_rooted_file_globs,
+    merge_optional_parts, merge_sibling_globs, minimize_globs,
+    remove_covered_globs)
+from coala_quickstart.generation.IgnoreMatcher import compile_globs
+from coala_quickstart.generation.Utilities import parse_gitignore_line
+
+
+class GlobMinimizerTest(unittest.TestCase):
+
+    def test_covers(self):
+        self.assertTrue(covers("**", "src/*.c"))
+        self.assertTrue(covers("**.c", "src/*.c"))
+        self.assertTrue(covers("src/**", "src/?"))
+        # ``?`` matches separators in coala globs
+        self.assertFalse(covers("src/*", "src/?"))
+        self.assertTrue(covers("src/*", "src/*.c"))
+        self.assertFalse(covers("src/*", "src/**"))
+        self.assertFalse(covers("*/main.c", "src/*/main.c"))
+        self.assertFalse(covers("src/?", "src/*"))
+        self.assertFalse(covers("src/[ab].c", "src/a.c"))
+        self.assertFalse(covers("src/**", "(src|lib)/main.c"))
+
+    def test_remove_covered_globs(self):
+        self.assertEqual(remove_covered_globs(["a/**", "a/b/**", "a/**"]),
+                         ["a/**"])
+        self.assertEqual(remove_covered_globs(["**/a", "b"]), ["**/a", "b"])
+
+    def test_remove_covered_globs_compiles_once(self):
+        globs = ["**/build{}/**".format(i) for i in range(200)]
+        globs += ["**/*.ext{}".format(i) for i in range(200)]
+        globs += ["(src|lib)/build1/**", "src/build1/*.ext1", "*.ext2"]
+        with patch.object(GlobMinimizer, "_placeholder_regex",
+                          wraps=GlobMinimizer._placeholder_regex) as compile:
+            result = remove_covered_globs(globs)
+        self.assertEqual(compile.call_count, len(globs) + 1)
+        self.assertEqual(result, globs[:400] + ["(src|lib)/build1/**",
+                                                "*.ext2"])
+
+    def test_merge_sibling_globs(self):
+        self.assertEqual(
+            merge_sibling_globs(["src/a/**", "src/b/**", "src/c/**",
+                                 "lib/a/**"]),
+            ["src/(a|b|c)/**", "lib/a/**"])
+        self.assertEqual(
+            merge_sibling_globs(["(a|b)/**", "c/**"]), ["(a|b|c)/**"])
+
+    def test_merge_sibling_globs_per_file(self):
+        # Excluded files give a glob each
+        globs = [os.path.join("pkg{}".format(i), "src",
+                              "file{}.py".format(j))
+                 for i in range(40) for j in range(100)]
+        with patch.object(GlobMinimizer, "_split_components",
+                          wraps=GlobMinimizer._split_components) as split:
+            result = merge_sibling_globs(globs)
+        # The files of every directory are merged in the first round, the
+        # directories in the second one
+        self.assertEqual(split.call_count, len(globs) + 40 + 1)
+        self.assertEqual(result, [os.path.join(
+            "(" + "|".join(sorted("pkg{}".format(i) for i in range(40))) +
+            ")", "src",
+            "(" + "|".join(sorted("file{}.py".format(j)
+                                  for j in range(100))) + ")")])
+
+        match = compile_globs(result)
+        self.assertTrue(all(match(glob) for glob in globs))
+        self.assertFalse(match(os.path.join("pkg1", "src", "file100.py")))
+
+    def test_merge_optional_parts(self):
+        self.assertEqual(merge_optional_parts(["**/a", "a/**", "b/**"]),
+                         ["**/a", "a/**", "b/**"])
+        self.assertEqual(merge_optional_parts(["a/**", "b", "a"]),
+                         ["a(/**|)", "b"])
+
+    def test_minimize_gitignore_globs(self):
+        lines = ["build", "dist", "node_modules", "*.pyc", "*.pyo",
+                 "/coverage", "__pycache__", "*.pyc"]
+        globs = [glob for line in lines
+                 for glob in parse_gitignore_line(line)]
+        minimized = minimize_globs(globs)
+        self.assertLess(len(minimized), len(globs) / 4)
+
+        paths = ["build/a.c", "src/build/a.c", "build", "src/a.pyc",
+                 "a.pyo", "coverage/index.html", "src/coverage/index.html",
+                 "src/main.py", "src/__pycache__/a.pyc", "distro/a.c",
+                 "node_modules/a/b/c.js", "src/dist"]
+        paths = [os.path.join(*path.split("/")) for path in paths]
+        original_match = compile_globs(globs)
+        minimized_match = compile_globs(minimized)
+        for path in paths:
+            self.assertEqual(bool(original_match(path)),
+                             bool(minimized_match(path)), path)
+
+    def test_covers_all(self):
+        self.assertTrue(covers_all(["(a|b)/**"], ["a/**", "b/*.c"]))
+        self.assertFalse(covers_all(["a/**"], ["(a|b)/**"]))
+        # Character sets are only covered by the same alternative
+        self.assertTrue(covers_all(["(**/|)[ab].c"], ["[ab].c"]))
+        self.assertFalse(covers_all(["**"], ["[ab].c"]))
+
+    def test_minimize_checks_coverage(self):
+        globs = ["a/**", "b/**"]
+        self.assertEqual(minimize_globs(globs), ["(a|b)/**"])
+
+        # Globs matching fewer or more paths are both detected
+        for merged in (["a/**"], ["(a|b|c)/**"]):
+            with patch.object(GlobMinimizer, "merge_sibling_globs",
+                              return_value=merged):
+                self.assertEqual(minimize_globs(globs + globs), globs)
+
+    def test_get_rooted_file_globs(self):
+        project_files = [os.path.join(*path.split("/")) for path in [
+            "setup.py", "src/main.py", "src/lib/a.py", "src/lib/b.pyi",
+            "src/lib/data/x.json", "src/lib/data/y.json",
+            "src/lib/data/z.py"] +
+            ["assets/{}.png".format(i) for i in range(30)]]
+        files = [path for path in project_files
+                 if path.endswith((".py", ".pyi"))]
+
+        self.assertEqual(get_rooted_file_globs([], project_files, [".py"]),
+                         [])
+        self.assertEqual(get_rooted_file_globs(files, project_files, []), [])
+        self.assertEqual(
+            get_rooted_file_globs(files, project_files, [".py", ".pyi"],
+                                  glob_cost=2),
+            ["*.py", "*.pyi",
+             os.path.join("src", "**.py"), os.path.join("src", "**.pyi")])
+        self.assertEqual(
+            get_rooted_file_globs(files, project_files, [".py", ".pyi"],
+                                  glob_cost=50),
+            ["**.py", "**.pyi"])
+
+        globs = get_rooted_file_globs(files, project_files, [".py", ".pyi"],
+                                      glob_cost=0)
+        match = compile_globs(globs)
+        self.assertEqual([path for path in project_files if match(path)],
+                         files)
+
+    def test_get_rooted_file_globs_excluded_dirs(self):
+        project_files = ["a.py", os.path.join("src", "b.py"),
+                         os.path.join("src", "web", "c.py")]
+        counts = count_project_files(project_files)
+        self.assertEqual(
+            get_rooted_file_globs(project_files[:2], None, [".py"],
+                                  glob_cost=100, project_counts=counts),
+            ["**.py"])
+        self.assertEqual(
+            get_rooted_file_globs(project_files[:2], None, [".py"],
+                                  glob_cost=100,
+                                  excluded_dirs=[os.path.join("src", "web")],
+                                  project_counts=counts),
+            ["*.py", os.path.join("src", "*.py")])
@@ -0,0 +1,138 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from coala_quickstart.generation.IgnoreMatcher import (
+    IgnoreMatcher, IgnoreResolver, compile_globs)
+
+
+class IgnoreMatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.matcher = IgnoreMatcher("""
+# Start of gitignore
+build
+ignore.c
+/tests
+/upload.c
+/*.py
+*.pyc
+__pycache__/
+docs/**/*.html
+**/logs
+a?c[0-9]
+# End of gitignore""".splitlines())
+
+    def test_literal_names(self):
+        self.assertTrue(self.matcher.match("build", is_dir=True))
+        self.assertTrue(self.matcher.match("src/build"))
+        self.assertTrue(self.matcher.match("src/ignore.c"))
+        self.assertTrue(self.matcher.match("logs", is_dir=True))
+        self.assertTrue(self.matcher.match("src/__pycache__", is_dir=True))
+        self.assertFalse(self.matcher.match("src/__pycache__"))
+        self.assertFalse(self.matcher.match("src/builds"))
+
+    def test_anchored_paths(self):
+        self.assertTrue(self.matcher.match("tests", is_dir=True))
+        self.assertTrue(self.matcher.match("upload.c"))
+        self.assertFalse(self.matcher.match("src/tests", is_dir=True))
+        self.assertFalse(self.matcher.match("src/upload.c"))
+
+    def test_wildcards(self):
+        self.assertTrue(self.matcher.match("setup.py"))
+        self.assertFalse(self.matcher.match("src/main.py"))
+        self.assertTrue(self.matcher.match("src/main.pyc"))
+        self.assertTrue(self.matcher.match("docs/index.html"))
+        self.assertTrue(self.matcher.match("docs/api/v1/index.html"))
+        self.assertFalse(self.matcher.match("src/docs/index.html"))
+        self.assertTrue(self.matcher.match("src/abc1"))
+        self.assertFalse(self.matcher.match("src/abcd"))
+
+    def test_is_ignored(self):
+        self.assertTrue(self.matcher.is_ignored("build/main.c"))
+        self.assertTrue(self.matcher.is_ignored("tests/run.c"))
+        self.assertTrue(self.matcher.is_ignored("src/build/lib/main.c"))
+        self.assertFalse(self.matcher.is_ignored("src/tests/main.c"))
+        self.assertFalse(self.matcher.is_ignored("src/main.c"))
+
+    def test_empty(self):
+        matcher = IgnoreMatcher()
+        self.assertFalse(matcher.match("main.c"))
+        self.assertFalse(matcher.is_ignored("src/main.c"))
+
+    def test_compile_globs(self):
+        self.assertIsNone(compile_globs([]))
+        match = compile_globs(["/repo/**/build/**", "/repo/*.c"])
+        self.assertTrue(match("/repo/src/build/main.c"))
+        self.assertTrue(match("/repo/main.c"))
+        self.assertFalse(match("/repo/src/main.c"))
+
+    def test_negation(self):
+        matcher = IgnoreMatcher(["*.log", "!important.log", "logs/",
+                                 "!/logs/", "\\!bang"])
+        self.assertTrue(matcher.match("debug.log"))
+        self.assertFalse(matcher.match("src/important.log"))
+        self.assertIsNone(matcher.match("main.c"))
+        self.assertTrue(matcher.match("src/logs", is_dir=True))
+        self.assertFalse(matcher.match("logs", is_dir=True))
+        self.assertTrue(matcher.match("!bang"))
+
+        # Later patterns take precedence
+        matcher = IgnoreMatcher(["!important.log", "*.log"])
+        self.assertTrue(matcher.match("important.log"))
+
+        # Files inside ignored directories can't be re-included
+        matcher = IgnoreMatcher(["build/", "!build/keep.c"])
+        self.assertTrue(matcher.is_ignored("build/keep.c"))
+
+
+class IgnoreResolverTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = self.tempdir.name
+        ignore_files = {
+            ".gitignore": "*.log\n/dist\n",
+            os.path.join("pkg", ".gitignore"): "!keep.log\ngenerated/\n",
+            os.path.join(".git", "info", "exclude"): "*.tmp\n!keep.log\n",
+        }
+        for path, content in ignore_files.items():
+            path = os.path.join(self.root, path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as file:
+                file.write(content)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_precedence(self):
+        resolver = IgnoreResolver(self.root)
+        self.assertTrue(resolver.match("debug.log"))
+        self.assertTrue(resolver.match("keep.log"))
+        self.assertFalse(resolver.match(os.path.join("pkg", "keep.log")))
+        self.assertTrue(resolver.match(os.path.join("pkg", "debug.log")))
+        self.assertTrue(resolver.match("dist", is_dir=True))
+        self.assertIsNone(resolver.match(os.path.join("pkg", "dist"),
+                                         is_dir=True))
+        self.assertTrue(resolver.match("a.tmp"))
+        self.assertIsNone(resolver.match("generated", is_dir=True))
+        self.assertTrue(resolver.is_ignored(
+            os.path.join("pkg", "generated", "main.c")))
+
+    def test_lazy_loading(self):
+        resolver = IgnoreResolver(self.root)
+        self.assertEqual(resolver.get_ignore_files(),
+                         [(self.root, os.path.join(".git", "info",
+                                                   "exclude"))])
+
+        resolver.match(os.path.join("pkg", "main.c"))
+        with patch.object(IgnoreMatcher, "from_file") as from_file:
+            resolver.match(os.path.join("pkg", "other.c"))
+            self.assertFalse(from_file.called)
+
+        self.assertEqual(resolver.get_ignore_files(),
+                         [(self.root, os.path.join(".git", "info",
+                                                   "exclude")),
+                          (self.root, ".gitignore"),
+                          (os.path.join(self.root, "pkg"), ".gitignore")])
@@ -1,8 +1,9 @@
 import os
+import tempfile
 import unittest
 
 from coala_quickstart.generation.InfoCollector import (
-    collect_info)
+    collect_info, collect_subproject_info)
 from tests.TestUtilities import generate_files
 
 
@@ -98,3 +99,40 @@ class InfoCollectorTest(unittest.TestCase):
                 isources = [os.path.normcase(i) for i in isources]
                 for info in collected_info[iname]:
                     self.assertIn(info.source, isources)
+
+    def test_subtrees(self):
+        with tempfile.TemporaryDirectory() as project_dir:
+            os.makedirs(os.path.join(project_dir, "web"))
+            with open(os.path.join(project_dir, "package.json"), "w") as f:
+                f.write(package_json)
+            with open(os.path.join(project_dir, "web", "Gemfile"), "w") as f:
+                f.write(gemfile)
+
+            collected_info = self.uut(project_dir, ["web"])
+            self.assertEqual(list(collected_info), ["ProjectDependencyInfo"])
+            self.assertEqual(
+                {info.source
+                 for info in collected_info["ProjectDependencyInfo"]},
+                {"Gemfile"})
+
+    def test_subprojects(self):
+        with tempfile.TemporaryDirectory() as project_dir:
+            os.makedirs(os.path.join(project_dir, "web"))
+            with open(os.path.join(project_dir, "package.json"), "w") as f:
+                f.write(package_json)
+            with open(os.path.join(project_dir, "web", "Gemfile"), "w") as f:
+                f.write(gemfile)
+
+            collected_info, subproject_info = collect_subproject_info(
+                project_dir, ["web"])
+            self.assertEqual(sorted(subproject_info), ["", "web"])
+            sources = {
+                subproject: {info.source
+                             for info in info["ProjectDependencyInfo"]}
+                for subproject, info in subproject_info.items()}
+            self.assertEqual(sources, {"": {"package.json"},
+                                       "web": {"Gemfile"}})
+            self.assertEqual(
+                len(collected_info["ProjectDependencyInfo"]),
+                len(subproject_info[""]["ProjectDependencyInfo"]) +
+                len(subproject_info["web"]["ProjectDependencyInfo"]))
@@ -0,0 +1,70 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from coala_quickstart.generation.LargeFiles import (
+    BINARY, LARGE, classify_large_file, is_binary, parse_size)
+from coala_quickstart.generation.ProjectIndex import ProjectIndex
+
+
+class LargeFilesTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.contents = {
+            "main.py": b"print(1)\n",
+            "data.json": b'{"a": 1}\n' * 1000,
+            "model.py": b"\x89PNG\r\n\x1a\n" + b"\0" * 10000,
+            "table.c": b"int a;\n" * 200 + b"\0\1\2" * 1000,
+        }
+        self.paths = {}
+        for name, content in self.contents.items():
+            path = os.path.join(self.tempdir.name, name)
+            with open(path, "wb") as file:
+                file.write(content)
+            self.paths[name] = path
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_parse_size(self):
+        self.assertEqual(parse_size("1g"), 1 << 30)
+        self.assertEqual(parse_size(" 10 KB "), 10240)
+        for value in ["", "M", "1.5M", "-1", "1T"]:
+            with self.assertRaises(ValueError):
+                parse_size(value)
+
+    def test_is_binary(self):
+        self.assertTrue(is_binary(b"PK\x03\x04"))
+        self.assertTrue(is_binary(b"MZ\x90\x00"))
+        self.assertFalse(is_binary(b""))
+        self.assertFalse(is_binary("\ufeffa".encode("utf-16-le")))
+
+    def test_classify_large_file(self):
+        self.assertEqual(classify_large_file(self.paths["data.json"]), LARGE)
+        self.assertEqual(classify_large_file(self.paths["model.py"]), BINARY)
+        # Binary data after the start isn't found
+        self.assertEqual(classify_large_file(self.paths["table.c"]), LARGE)
+        self.assertEqual(classify_large_file(
+            os.path.join(self.tempdir.name, "missing")), LARGE)
+
+    def test_project_index(self):
+        index = ProjectIndex(sorted(self.paths.values()), max_file_size=1000)
+        self.assertEqual(index.total, 4)
+        self.assertEqual(index.get_language_counts(), {"Python": 1})
+        self.assertEqual(index.excluded_counts, {LARGE: 2, BINARY: 1})
+        self.assertEqual(sorted(index.get_excluded_globs()),
+                         [self.paths[name] for name in
+                          ["data.json", "model.py", "table.c"]])
+
+    def test_sizes_given(self):
+        with patch("os.stat") as stat:
+            index = ProjectIndex([(self.paths["main.py"], 10),
+                                  (self.paths["model.py"], 10),
+                                  (self.paths["data.json"], 2000)],
+                                 max_file_size=1000)
+            self.assertFalse(stat.called)
+        self.assertEqual(index.get_language_counts(), {"Python": 2})
+        self.assertEqual(index.get_excluded_globs(),
+                         [self.paths["data.json"]])
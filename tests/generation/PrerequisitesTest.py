@@ -0,0 +1,151 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+from coala_quickstart.generation import Prerequisites
+from coala_quickstart.generation.BearCatalog import BearInfo
+from coala_quickstart.generation.Prerequisites import (
+    PrerequisiteChecker, get_bear_key, get_environment_key)
+
+
+class FakeBear:
+
+    def __init__(self, name, result=True, wait_for=None, module=None):
+        self.name = self.__name__ = name
+        if module is not None:
+            self.__module__ = module
+        self.result = result
+        self.wait_for = wait_for
+        self.checks = 0
+
+    def check_prerequisites(self):
+        self.checks += 1
+        if self.wait_for is not None:
+            self.wait_for()
+        if isinstance(self.result, Exception):
+            raise self.result
+        return self.result
+
+
+class PrerequisitesTest(unittest.TestCase):
+
+    def test_checks_are_cached(self):
+        checker = PrerequisiteChecker()
+        bears = [FakeBear("ABear"), FakeBear("BBear", "Install b")]
+        self.assertEqual(checker.check_all(bears),
+                         {bears[0]: True, bears[1]: "Install b"})
+        self.assertEqual(checker.check(bears[1]), "Install b")
+        self.assertEqual([bear.checks for bear in bears], [1, 1])
+
+    def test_checks_run_in_parallel(self):
+        barrier = threading.Barrier(3, timeout=5)
+        bears = [FakeBear(name, wait_for=barrier.wait)
+                 for name in ["ABear", "BBear", "CBear"]]
+        results = PrerequisiteChecker().check_all(bears)
+        self.assertEqual(set(results.values()), {True})
+
+    def test_executable_checks(self):
+        with tempfile.TemporaryDirectory() as bin_dir:
+            path = os.path.join(bin_dir, "lint")
+            open(path, "w").close()
+            os.chmod(path, 0o755)
+            installed = BearInfo("LintBear", "", {"All"}, executable="lint",
+                                 executable_check="")
+            missing = BearInfo("OtherLintBear", "", {"All"},
+                               executable="other_lint",
+                               executable_check="Use npm.")
+            checker = PrerequisiteChecker()
+            with patch.dict("os.environ", {"PATH": bin_dir}):
+                results = checker.check_all([installed, missing])
+        # The bears aren't imported, which would fail without a module
+        self.assertEqual(results, {
+            installed: True,
+            missing: "'other_lint' is not installed. Use npm."})
+        self.assertEqual(checker.results, {})
+
+    def test_timeout(self):
+        event = threading.Event()
+        slow = FakeBear("SlowBear", wait_for=event.wait)
+        checker = PrerequisiteChecker(timeout=0.1)
+        try:
+            results = checker.check_all([slow, FakeBear("FastBear")])
+            # The stuck check doesn't keep the process from exiting
+            self.assertTrue(all(
+                thread.daemon for thread in threading.enumerate()
+                if thread is not threading.main_thread()))
+        finally:
+            event.set()
+        self.assertEqual(results[slow],
+                         "Checking the prerequisites of SlowBear timed out.")
+        self.assertNotIn(get_bear_key(slow), checker.results)
+        # The failure is remembered for the process
+        self.assertEqual(checker.check(slow), results[slow])
+        self.assertEqual(slow.checks, 1)
+
+    def test_exception(self):
+        bear = FakeBear("BrokenBear", RuntimeError("broken"))
+        self.assertEqual(PrerequisiteChecker().check(bear),
+                         "Checking the prerequisites failed: broken")
+
+    def test_same_name_in_other_modules(self):
+        bears = [FakeBear("ABear", module="first"),
+                 FakeBear("ABear", "Install a", module="second")]
+        checker = PrerequisiteChecker()
+        self.assertEqual(checker.check_all(bears),
+                         {bears[0]: True, bears[1]: "Install a"})
+        self.assertEqual(checker.check(bears[1]), "Install a")
+        self.assertEqual(list(checker.results), ["first.ABear"])
+
+    def test_ttl_and_environment(self):
+        bear = FakeBear("ABear", "missing")
+        key = get_environment_key()
+        name = get_bear_key(bear)
+        checker = PrerequisiteChecker({name: (time.time(), True)}, key)
+        self.assertIs(checker.check(bear), True)
+
+        checker = PrerequisiteChecker({name: (time.time() - 10, True)},
+                                      key, ttl=5)
+        self.assertEqual(checker.check(bear), "missing")
+
+        checker = PrerequisiteChecker({name: (time.time(), True)},
+                                      ("/other/bin",) + key[1:])
+        self.assertEqual(checker.check(bear), "missing")
+
+        # Missing prerequisites aren't reused from other runs
+        checker = PrerequisiteChecker({name: (time.time(), "missing")},
+                                      key)
+        self.assertEqual(checker.check(FakeBear("ABear")), True)
+
+        checker = PrerequisiteChecker({name: (time.time(), True)}, key)
+        with patch.dict("os.environ", {"PATH": "/changed/bin"}):
+            self.assertEqual(checker.check(FakeBear("ABear", "changed")),
+                             "changed")
+        self.assertEqual(bear.checks, 2)
+
+    def test_load_and_save(self):
+        saved = {}
+
+        def dump(log_printer, identifier, data):
+            saved[identifier] = data
+            return True
+
+        def load(log_printer, identifier, fallback=None):
+            return saved.get(identifier, fallback)
+
+        with patch.object(Prerequisites, "pickle_dump", side_effect=dump), \
+                patch.object(Prerequisites, "pickle_load", side_effect=load):
+            checker = PrerequisiteChecker.load()
+            self.assertEqual(checker.results, {})
+            checker.check_all([FakeBear("ABear"),
+                               FakeBear("BBear", "Install b")])
+            self.assertEqual(list(checker.results), [__name__ + ".ABear"])
+            self.assertTrue(checker.save())
+
+            bears = [FakeBear("ABear", "changed"), FakeBear("BBear")]
+            self.assertEqual(
+                PrerequisiteChecker.load().check_all(bears),
+                {bears[0]: True, bears[1]: True})
+            self.assertEqual([bear.checks for bear in bears], [0, 1])
@@ -3,7 +3,7 @@ import unittest
 from pyprint.ConsolePrinter import ConsolePrinter
 from coala_utils.ContextManagers import retrieve_stdout
 from coala_quickstart.generation.Project import (
-    get_used_languages, print_used_languages)
+    get_used_languages, print_excluded_files, print_used_languages)
 
 
 class TestPopularLanguages(unittest.TestCase):
@@ -40,7 +40,22 @@ class TestPopularLanguages(unittest.TestCase):
             print_used_languages(self.printer, [('Python', 75), ('C++', 25)])
             self.assertIn("75%\n", custom_stdout.getvalue())
 
+    def test_print_error_bounds(self):
+        with retrieve_stdout() as custom_stdout:
+            print_used_languages(self.printer, [('Python', 75), ('C++', 25)],
+                                 {'Python': 2.04, 'C++': 2.04})
+            self.assertIn("75% (+/- 2.0%)\n", custom_stdout.getvalue())
+
     def test_no_results(self):
         with retrieve_stdout() as custom_stdout:
             print_used_languages(self.printer, [])
             self.assertNotIn("following langauges", custom_stdout.getvalue())
+
+    def test_print_excluded_files(self):
+        with retrieve_stdout() as custom_stdout:
+            print_excluded_files(self.printer, {"vendored": 3})
+            self.assertIn("vendored: 3 files", custom_stdout.getvalue())
+
+        with retrieve_stdout() as custom_stdout:
+            print_excluded_files(self.printer, {})
+            self.assertEqual("", custom_stdout.getvalue())
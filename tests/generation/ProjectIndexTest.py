@@ -0,0 +1,165 @@
+import os
+import random
+import tempfile
+import unittest
+
+from coala_quickstart.generation.ProjectIndex import (
+    ProjectIndex, count_lines)
+from coala_quickstart.generation.Project import language_percentage
+from coala_quickstart.generation.Utilities import (
+    get_extensions, split_by_language)
+
+
+class ProjectIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.file_paths = ["/repo/setup.py", "/repo/src/main.py",
+                           "/repo/src/main.c", "/repo/src/main.h",
+                           "/repo/README", "/repo/index.html"]
+
+    def test_statistics(self):
+        index = ProjectIndex(self.file_paths)
+        self.assertEqual(index.total, 6)
+        self.assertEqual(index.extension_counts[".py"], 2)
+        self.assertEqual(index.get_language_counts()["Python"], 2)
+        self.assertEqual(index.get_language_counts()["C"], 2)
+        self.assertEqual(index.get_language_counts()["C++"], 1)
+        self.assertEqual(index.get_extensions()["c"], {".c", ".h"})
+        self.assertEqual(index.get_used_languages()[:2],
+                         [("Python", 100 * 2 / 6), ("C", 100 * 2 / 6)])
+
+    def test_same_as_list_functions(self):
+        index = ProjectIndex(self.file_paths)
+        self.assertEqual(index.language_percentage(),
+                         language_percentage(self.file_paths))
+        self.assertEqual(index.get_extensions(),
+                         get_extensions(self.file_paths))
+
+    def test_files(self):
+        index = ProjectIndex(self.file_paths)
+        with self.assertRaisesRegex(ValueError, "doesn't store the paths"):
+            index.get_files()
+
+        index = ProjectIndex(self.file_paths, keep_paths=True)
+        self.assertEqual(sorted(index.get_files()), sorted(self.file_paths))
+        self.assertEqual(index.get_files([".c", ".h"]),
+                         ["/repo/src/main.c", "/repo/src/main.h"])
+        self.assertEqual(split_by_language(self.file_paths)["c++"],
+                         {"/repo/src/main.h"})
+        self.assertEqual(len(split_by_language(self.file_paths)["all"]), 5)
+
+    def test_error_bounds(self):
+        index = ProjectIndex(["main.py"] * 50 + ["main.c"] * 50)
+        bounds = index.get_error_bounds()
+        self.assertAlmostEqual(bounds["Python"],
+                               100 * 1.96 * (0.25 / 100) ** 0.5)
+        self.assertEqual(bounds["Python"], bounds["C"])
+        self.assertLess(ProjectIndex(["main.py"] * 500 + ["main.c"] * 500)
+                        .get_error_bounds()["Python"], bounds["Python"])
+
+    def test_add_until_confident(self):
+        rng = random.Random(1)
+        paths = ("main.py" if rng.random() < 0.7 else "main.c"
+                 for _ in range(100000))
+        index = ProjectIndex()
+        self.assertTrue(index.add_until_confident(paths, 3))
+        self.assertLess(index.total, 2000)
+        self.assertLessEqual(max(index.get_error_bounds().values()), 3)
+        self.assertAlmostEqual(index.language_percentage()["Python"], 70,
+                               delta=3 * 1.5)
+
+        index = ProjectIndex()
+        self.assertFalse(index.add_until_confident(["main.py"] * 10, 3))
+        self.assertEqual(index.total, 10)
+
+    def test_add_until_confident_weighted(self):
+        # One of three choices each: the root's main.c, a directory with a
+        # Python file and one with 300 JSON files
+        def draws(rng):
+            while True:
+                choice = rng.randrange(3)
+                if choice == 0:
+                    yield "/repo/main.c", None, 1 / 3
+                elif choice == 1:
+                    yield "/repo/src/main.py", None, 1 / 3
+                else:
+                    yield ("/repo/data/{}.json".format(rng.randrange(300)),
+                           None, 1 / 3 / 300)
+
+        index = ProjectIndex()
+        self.assertTrue(index.add_until_confident(draws(random.Random(1)),
+                                                  5))
+        percentages = index.language_percentage()
+        bounds = index.get_error_bounds()
+        # Unweighted, every language would get a third of the draws
+        self.assertAlmostEqual(percentages["JSON"], 100 * 300 / 302,
+                               delta=bounds["JSON"])
+        self.assertAlmostEqual(percentages["Python"], 100 / 302,
+                               delta=bounds["Python"])
+        # Files drawn again are counted once
+        self.assertEqual(index.total, len(index._sampled))
+        self.assertLessEqual(index.extension_counts[".json"], 300)
+
+    def test_add_until_confident_complete(self):
+        draws = [("/repo/main.py", None, 0.5), ("/repo/main.c", None, 0.25),
+                 ("/repo/main.py", None, 0.5), ("/repo/main.h", None, 0.25)]
+        index = ProjectIndex()
+        self.assertFalse(index.add_until_confident(draws, 1))
+        # All files were drawn, their weights replace the estimates
+        self.assertEqual(index.total, 3)
+        self.assertEqual(index.language_percentage()["C"], 100 * 2 / 3)
+        self.assertEqual(index.language_percentage()["Python"], 100 / 3)
+        self.assertEqual(index.get_error_bounds(),
+                         {"Python": 0.0, "C": 0.0, "C++": 0.0})
+
+    def test_empty(self):
+        index = ProjectIndex()
+        self.assertEqual(index.get_used_languages(), [])
+        self.assertEqual(index.get_extensions(), {})
+
+
+class WeightingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        contents = {"main.cpp": "int main() {\n" * 1000 + "}",
+                    "data.json": "{}\n",
+                    "other.json": "{}\n",
+                    "empty.json": "",
+                    "README": "Read me\n" * 5000}
+        self.file_paths = []
+        for name, content in sorted(contents.items()):
+            path = os.path.join(self.tempdir.name, name)
+            with open(path, "w") as file:
+                file.write(content)
+            self.file_paths.append(path)
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_count_lines(self):
+        lines = [count_lines(path) for path in self.file_paths]
+        self.assertEqual(lines, [5000, 1, 0, 1001, 1])
+        self.assertEqual(
+            count_lines(os.path.join(self.tempdir.name, "missing")), 0)
+
+    def test_weightings(self):
+        index = ProjectIndex(self.file_paths)
+        self.assertEqual(index.get_used_languages()[0][0], "JSON")
+
+        index = ProjectIndex(self.file_paths, weighting="lines", jobs=2)
+        self.assertEqual(index.get_used_languages(),
+                         [("C++", 100 * 1001 / 1003),
+                          ("JSON", 100 * 2 / 1003)])
+
+        index = ProjectIndex(self.file_paths, weighting="bytes")
+        self.assertEqual(index.get_language_weights(),
+                         {"JSON": 6, "C++": 13001})
+
+        index = ProjectIndex([(path, 1) for path in self.file_paths],
+                             weighting="bytes")
+        self.assertEqual(index.get_language_weights(),
+                         {"JSON": 3, "C++": 1})
+
+        with self.assertRaisesRegex(ValueError, "Unknown weighting"):
+            ProjectIndex(weighting="words")
@@ -4,13 +4,20 @@ import tempfile
 import unittest
 from datetime import date
 from copy import deepcopy
+from unittest.mock import patch
 
 from pyprint.ConsolePrinter import ConsolePrinter
 
 from coalib.output.ConfWriter import ConfWriter
 from coala_quickstart.coala_quickstart import _get_arg_parser
-from coala_quickstart.generation.Settings import write_info, generate_settings
+from coala_quickstart.generation.Settings import (
+    generate_ignore_field, generate_settings, write_info)
 from coala_quickstart.generation.Bears import filter_relevant_bears
+from coala_quickstart.generation.ContentDetection import ContentDetector
+from coala_quickstart.generation.GeneratedFiles import (
+    GeneratedFileClassifier)
+from coala_quickstart.generation.GlobMinimizer import count_project_files
+from coala_quickstart.generation.ProjectIndex import ProjectIndex
 from coala_quickstart.generation.Project import get_used_languages
 
 
@@ -98,3 +105,199 @@ class SettingsTest(unittest.TestCase):
             bears_list.sort())
 
         self.assertEqual(['**.html'], files_list)
+
+    def test_generate_ignore_field_without_file_system_access(self):
+        ignore_globs = ["/repo/**/build/**", "/repo/*.pyc"]
+        with patch("os.scandir") as scandir, \
+                patch("os.listdir") as listdir, \
+                patch("os.stat") as stat:
+            res = generate_ignore_field("/repo", [], {}, ignore_globs)
+            self.assertFalse(scandir.called)
+            self.assertFalse(listdir.called)
+            self.assertFalse(stat.called)
+
+        self.assertEqual(res, os.path.join("**", "build", "**") + ", *.pyc")
+
+    def test_rooted_file_globs(self):
+        project_dir = "/repo"
+        project_files = ["/repo/setup.py", "/repo/src/main.py",
+                         "/repo/src/lib/util.py", "/repo/src/index.html",
+                         "/repo/tests/main_test.py"]
+        project_files += ["/repo/docs/{}.rst".format(i) for i in range(50)]
+        used_languages = list(get_used_languages(project_files))
+        relevant_bears = filter_relevant_bears(
+            used_languages, self.printer, self.arg_parser, {})
+
+        res = generate_settings(
+            project_dir, project_files, [], relevant_bears, {}, True,
+            rooted_file_globs=True)
+
+        self.assertEqual(res["all.Python"]["files"].value,
+                         "*.py, src/**.py, tests/**.py")
+        self.assertEqual(res["all.HTML"]["files"].value, "src/*.html")
+
+        res = generate_settings(
+            project_dir, project_files, [], relevant_bears, {}, True)
+        self.assertEqual(res["all.Python"]["files"].value, "**.py")
+
+    def test_project_index(self):
+        project_files = ["/repo/setup.py", "/repo/src/index.html"]
+        used_languages = list(get_used_languages(project_files))
+        relevant_bears = filter_relevant_bears(
+            used_languages, self.printer, self.arg_parser, {})
+
+        expected = generate_settings(
+            "/repo", project_files, [], relevant_bears, {}, True)
+        res = generate_settings(
+            "/repo", None, [], relevant_bears, {}, True,
+            project_index=ProjectIndex(project_files))
+
+        self.assertEqual(list(res), list(expected))
+        for name in res:
+            self.assertEqual(str(res[name]), str(expected[name]))
+
+        res = generate_settings(
+            "/repo", None, [], relevant_bears, {}, True,
+            rooted_file_globs=True,
+            project_index=ProjectIndex(project_files, keep_paths=True))
+        self.assertEqual(res["all.Python"]["files"].value, "*.py")
+
+    def test_detected_files(self):
+        project_files = ["/repo/setup.py", "/repo/bin/deploy"]
+        project_index = ProjectIndex(project_files, detector=ContentDetector(
+            cache={}))
+        with patch.object(ContentDetector, "detect",
+                          side_effect=["Python"]):
+            used_languages = list(project_index.get_used_languages())
+        relevant_bears = filter_relevant_bears(
+            used_languages, self.printer, self.arg_parser, {})
+
+        res = generate_settings(
+            "/repo", None, [], relevant_bears, {}, True,
+            project_index=project_index)
+        self.assertEqual(res["all.Python"]["files"].value,
+                         "**.py, " + os.path.join("bin", "deploy"))
+
+    def test_excluded_files(self):
+        project_files = ["/repo/setup.py", "/repo/vendor/six.py",
+                         "/repo/static/app.min.js"]
+        project_index = ProjectIndex(
+            project_files, classifier=GeneratedFileClassifier("/repo"))
+        used_languages = list(project_index.get_used_languages())
+        self.assertEqual(used_languages, [("Python", 100)])
+        relevant_bears = filter_relevant_bears(
+            used_languages, self.printer, self.arg_parser, {})
+
+        with patch.object(GeneratedFileClassifier, "classify",
+                          return_value=None):
+            res = generate_settings(
+                "/repo", None, ["/repo/build/**"], relevant_bears, {}, True,
+                project_index=project_index)
+        self.assertEqual(res["all"]["ignore"].value,
+                         os.path.join("(build|vendor)", "**") + ", **.min.js")
+
+    def test_subtrees_and_max_depth(self):
+        project_files = ["/repo/setup.py", "/repo/src/main.py",
+                         "/repo/src/lib/util.py", "/repo/docs/index.rst"]
+        used_languages = list(get_used_languages(project_files))
+        relevant_bears = filter_relevant_bears(
+            used_languages, self.printer, self.arg_parser, {})
+
+        res = generate_settings(
+            "/repo", project_files, [], relevant_bears, {}, True,
+            subtrees=["src", "docs"])
+        self.assertEqual(res["all.Python"]["files"].value,
+                         ", ".join([os.path.join("src", "**.py"),
+                                    os.path.join("docs", "**.py")]))
+
+        res = generate_settings(
+            "/repo", project_files, [], relevant_bears, {}, True,
+            max_depth=1)
+        self.assertEqual(res["all.Python"]["files"].value,
+                         "*.py, " + os.path.join("*", "*.py"))
+
+        project_index = ProjectIndex(project_files[1:3], keep_paths=True)
+        res = generate_settings(
+            "/repo", None, [], relevant_bears, {}, True,
+            rooted_file_globs=True, project_index=project_index,
+            subtrees=["src"])
+        self.assertEqual(res["all.Python"]["files"].value,
+                         os.path.join("src", "**.py"))
+
+    def test_subprojects(self):
+        project_files = ["/repo/setup.py", "/repo/tools/build.py",
+                         "/repo/web/package.json", "/repo/web/src/app.js",
+                         "/repo/web/admin/setup.py",
+                         "/repo/web/admin/admin.py",
+                         "/repo/web/scripts/deploy.py"]
+        used_languages = list(get_used_languages(project_files))
+        relevant_bears = filter_relevant_bears(
+            used_languages, self.printer, self.arg_parser, {})
+        project_index = ProjectIndex(project_files, keep_paths=True)
+        admin = os.path.join("web", "admin")
+
+        # The files below every group are only counted once for all of
+        # its languages
+        with patch("coala_quickstart.generation.Settings."
+                   "count_project_files",
+                   wraps=count_project_files) as count:
+            res = generate_settings(
+                "/repo", None, [], relevant_bears, {}, True,
+                project_index=project_index,
+                subprojects=["web", admin])
+        self.assertEqual(count.call_count, 4)
+        self.assertEqual(
+            list(res),
+            ["all", "all.Python",
+             "all.web.Python", "all.web.JSON", "all.web.JavaScript",
+             "all.web/admin.Python"])
+        self.assertEqual(res["all.Python"]["files"].value,
+                         "*.py, " + os.path.join("tools", "**.py"))
+        self.assertEqual(res["all.web.Python"]["files"].value,
+                         os.path.join("web", "scripts", "**.py"))
+        self.assertEqual(res["all.web.JavaScript"]["files"].value,
+                         os.path.join("web", "src", "**.js"))
+        self.assertEqual(res["all.web/admin.Python"]["files"].value,
+                         os.path.join(admin, "**.py"))
+
+    def test_subproject_info(self):
+        project_files = ["/repo/setup.py", "/repo/web/package.json",
+                         "/repo/web/app.js"]
+        used_languages = list(get_used_languages(project_files))
+        relevant_bears = filter_relevant_bears(
+            used_languages, self.printer, self.arg_parser, {})
+        infos = []
+
+        def fill_section(section, acquire_settings, log_printer, bears,
+                         extracted_info):
+            infos.append((section.name, extracted_info))
+            return section
+
+        with patch("coala_quickstart.generation.Settings.fill_section",
+                   side_effect=fill_section):
+            generate_settings(
+                "/repo", None, [], relevant_bears, {"root": 1},
+                project_index=ProjectIndex(project_files, keep_paths=True),
+                subprojects=["web"],
+                subproject_info={"web": {"web": 1}})
+        self.assertIn(("all.python", {"root": 1}), infos)
+        self.assertIn(("all.web.javascript", {"web": 1}), infos)
+
+    def test_bears_are_loaded_once(self):
+        project_files = ["/repo/setup.py", "/repo/web/package.json",
+                         "/repo/web/app.py"]
+        used_languages = list(get_used_languages(project_files))
+        relevant_bears = filter_relevant_bears(
+            used_languages, self.printer, self.arg_parser, {})
+
+        with patch("coala_quickstart.generation.Settings.load_bears",
+                   return_value=[]) as load_bears, \
+                patch("coala_quickstart.generation.Settings.fill_section"):
+            res = generate_settings(
+                "/repo", None, [], relevant_bears, {},
+                project_index=ProjectIndex(project_files, keep_paths=True),
+                subprojects=["web"])
+        self.assertEqual(list(res), ["all", "all.Python",
+                                     "all.web.Python", "all.web.JSON"])
+        # The Python bears are loaded for both of their sections at once
+        self.assertEqual(load_bears.call_count, 3)
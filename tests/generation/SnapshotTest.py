@@ -0,0 +1,113 @@
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from coala_quickstart.generation.ContentDetection import ContentDetector
+from coala_quickstart.generation.FileWalker import (
+    parallel_walk_files, walk_files)
+from coala_quickstart.generation.Snapshot import WalkSnapshot
+
+
+class SnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.root = self.tempdir.name
+        self.files = [os.path.join("src", "main.c"),
+                      os.path.join("src", "lib", "ssl.c"),
+                      os.path.join("bin", "deploy"),
+                      "setup.py"]
+        for file in self.files:
+            path = os.path.join(self.root, file)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write("#!/usr/bin/env python\n")
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def walk(self, snapshot, **kwargs):
+        listed = []
+        orig_scandir = os.scandir
+
+        def scandir(path):
+            listed.append(os.path.relpath(path, self.root))
+            return orig_scandir(path)
+
+        with patch("os.scandir", side_effect=scandir):
+            files = list(walk_files(self.root, snapshot=snapshot, **kwargs))
+        return files, sorted(listed)
+
+    def test_unchanged_directories_are_not_listed(self):
+        snapshot = WalkSnapshot(self.root)
+        files, listed = self.walk(snapshot, with_sizes=True)
+        self.assertEqual(files, list(walk_files(self.root, with_sizes=True)))
+        self.assertEqual(listed,
+                         [".", "bin", "src", os.path.join("src", "lib")])
+        self.assertEqual((snapshot.listed, snapshot.reused), (4, 0))
+
+        open(os.path.join(self.root, "src", "util.c"), "w").close()
+        snapshot = WalkSnapshot(self.root, snapshot.used)
+        files, listed = self.walk(snapshot, with_sizes=True)
+        self.assertEqual(files, list(walk_files(self.root, with_sizes=True)))
+        self.assertEqual(listed, ["src"])
+        self.assertEqual((snapshot.listed, snapshot.reused), (1, 3))
+
+    def test_ignore_globs_are_applied(self):
+        snapshot = WalkSnapshot(self.root)
+        self.walk(snapshot)
+
+        snapshot = WalkSnapshot(self.root, snapshot.used)
+        ignore_globs = [os.path.join(self.root, "src", "**")]
+        files, listed = self.walk(snapshot, ignore_globs=ignore_globs)
+        self.assertEqual(files, list(walk_files(self.root, ignore_globs)))
+        self.assertEqual(listed, [])
+
+    def test_removed_directories_are_dropped(self):
+        snapshot = WalkSnapshot(self.root)
+        list(parallel_walk_files(self.root, jobs=2, snapshot=snapshot))
+        self.assertEqual(len(snapshot.used), 4)
+
+        os.remove(os.path.join(self.root, "bin", "deploy"))
+        os.rmdir(os.path.join(self.root, "bin"))
+        snapshot = WalkSnapshot(self.root, snapshot.used)
+        self.walk(snapshot)
+        self.assertNotIn(os.path.join(self.root, "bin"), snapshot.used)
+
+    def test_languages(self):
+        path = os.path.join(self.root, "bin", "deploy")
+        snapshot = WalkSnapshot(self.root)
+        self.walk(snapshot)
+        self.assertEqual(ContentDetector(snapshot=snapshot).detect(path),
+                         "Python")
+
+        snapshot = WalkSnapshot(self.root, snapshot.used)
+        self.walk(snapshot)
+        with patch("builtins.open") as mock_open, \
+                patch("os.stat") as mock_stat:
+            self.assertEqual(
+                ContentDetector(snapshot=snapshot).detect(path), "Python")
+            self.assertFalse(mock_open.called)
+            self.assertFalse(mock_stat.called)
+
+    def test_load_and_save(self):
+        snapshot = WalkSnapshot(self.root)
+        self.walk(snapshot)
+        saved = {}
+
+        def dump(log_printer, identifier, data):
+            saved[identifier] = data
+            return True
+
+        def load(log_printer, identifier, fallback=None):
+            return saved.get(identifier, fallback)
+
+        with patch("coala_quickstart.generation.Snapshot.pickle_dump",
+                   side_effect=dump), \
+                patch("coala_quickstart.generation.Snapshot.pickle_load",
+                      side_effect=load):
+            self.assertTrue(snapshot.save())
+            self.assertEqual(WalkSnapshot.load(self.root).directories,
+                             snapshot.used)
+            self.assertEqual(WalkSnapshot.load("/other").directories, {})
@@ -0,0 +1,43 @@
+import os
+import unittest
+
+from pyprint.ConsolePrinter import ConsolePrinter
+from coala_utils.ContextManagers import retrieve_stdout
+from coala_quickstart.generation.Subprojects import (
+    find_subprojects, get_section_name, get_subproject, print_subprojects)
+
+
+class SubprojectsTest(unittest.TestCase):
+
+    def setUp(self):
+        self.files = ["setup.py",
+                      os.path.join("web", "package.json"),
+                      os.path.join("web", "src", "app.js"),
+                      os.path.join("web", "admin", "Gemfile"),
+                      os.path.join("web", "admin", "app.rb"),
+                      os.path.join("webapp", "index.js"),
+                      os.path.join("docs", "pom.xml.in")]
+
+    def test_find_subprojects(self):
+        self.assertEqual(find_subprojects(self.files),
+                         ["web", os.path.join("web", "admin")])
+        self.assertEqual(find_subprojects(["setup.py", "main.py"]), [])
+
+    def test_get_subproject(self):
+        admin = os.path.join("web", "admin")
+        subprojects = {"web", admin}
+        self.assertEqual(
+            [get_subproject(path, subprojects) for path in self.files],
+            ["", "web", "web", admin, admin, "", ""])
+
+    def test_get_section_name(self):
+        self.assertEqual(get_section_name("web"), "web")
+        self.assertEqual(get_section_name(os.path.join("a", "b.c")), "a/b_c")
+
+    def test_print_subprojects(self):
+        with retrieve_stdout() as stdout:
+            print_subprojects(ConsolePrinter(), ["web"])
+            self.assertIn("    web\n", stdout.getvalue())
+        with retrieve_stdout() as stdout:
+            print_subprojects(ConsolePrinter(), [])
+            self.assertEqual(stdout.getvalue(), "")